@@ -1,18 +1,15 @@
 import argparse
-import base64
-import cv2
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
+import atexit
+import json
 from dotenv import load_dotenv
 import firebase_admin
-from flask import Flask, render_template, request, send_from_directory, redirect
+from flask import Flask, jsonify, render_template, request, send_from_directory, redirect
 from flask_cors import CORS
 import os
 from firebase_admin import credentials
 import socket
 
-from flask_socketio import SocketIO, emit, send
+from flask_socketio import SocketIO, emit, join_room, leave_room, send
 import numpy as np
 import socketio
 
@@ -43,13 +40,24 @@ if not firebase_admin._apps:
     firebase_admin.initialize_app(cred)
 
 from controller.openvidu_controller import openvidu_blueprint
-from controller.api_controller import api_blueprint
+from controller.api_controller import ai, api_blueprint, jobs, live_transcriber
 from controller.line_controller import line_blueprint
+from libs.gesture import GestureDebouncer, GestureFrameMailbox, GestureInferenceEngine, classify_hands
 
 app = Flask(__name__,static_folder="templates/assets/", template_folder="templates")
 socketio = SocketIO(app, cors_allowed_origins="*")  # 允許跨域請求
 CORS(app)
 
+# 手勢推論服務 (GESTURE_WORKERS 個程序，各自持有已預熱的模型)，於第一幀時啟動
+gesture_engine = GestureInferenceEngine()
+atexit.register(gesture_engine.close)
+
+# 聊天機器人的 embeddings 與向量數據庫在背景載入，伺服器不必等待即可開始接受請求
+# (debug 模式的重新載入監看程序不會處理請求，不需預熱；AI_WARMUP=false 時改為第一次使用時才載入)
+if os.environ.get("AI_WARMUP", "true").lower() != "false" and \
+        not (__name__ == "__main__" and os.environ.get("WERKZEUG_RUN_MAIN") != "true"):
+    ai.warmup()
+
 # Register the blueprints with appropriate URL prefixes
 app.register_blueprint(api_blueprint, url_prefix='/api')
 app.register_blueprint(openvidu_blueprint, url_prefix='/api/openvidu')
@@ -71,65 +79,114 @@ def frontend_routes(path):
         # 如果文件不存在，回傳 index.html，交由前端處理
         return render_template('index.html')
 
+def process_gesture_frame(username, frame):
+    room_name, landmarks, image = frame
+    if landmarks is not None:
+        # 前端已計算好 landmarks，伺服器只需分類手勢
+        gestures = classify_hands(landmarks)
+    else:
+        # 解碼與推論交由獨立的推論程序執行，不佔用 Flask/Socket.IO 工作者
+        gestures = gesture_engine.recognize(image)
+    # 只在手勢改變或持續一段時間時通知；已知會議室時只發送給同一會議室的成員，否則廣播
+    for gesture_label in gesture_debouncer.update(username, gestures):
+        socketio.emit("gestureDetection", {"username":username,"gesture":gesture_label}, to=room_name)
+
+# 每位使用者只保留最新一幀，推論較慢時直接丟棄舊影格，避免延遲累積
+gesture_mailbox = GestureFrameMailbox(process_gesture_frame, spawn=socketio.start_background_task, sleep=socketio.sleep)
+gesture_debouncer = GestureDebouncer()
+
+# 每個連線所在的 LiveKit 會議室 (sid -> roomName) 與送出手勢影格的使用者 (sid -> username)
+socket_rooms = {}
+socket_users = {}
+
+def forget_gesture_user(username):
+    gesture_debouncer.forget(username)
+    gesture_mailbox.forget(username)
+
+@socketio.on("joinRoom")
+def handle_join_room(data):
+    if isinstance(data, str):
+        data = json.loads(data)
+    room_name = data.get("roomName") if data else None
+    if not room_name:
+        return
+    # 切換會議室時先離開原本的會議室，避免繼續收到舊會議室的事件
+    previous_room = socket_rooms.get(request.sid)
+    if previous_room and previous_room != room_name:
+        leave_room(previous_room)
+    join_room(room_name)
+    socket_rooms[request.sid] = room_name
+
+@socketio.on("leaveRoom")
+def handle_leave_room(data):
+    room_name = socket_rooms.pop(request.sid, None)
+    if room_name:
+        leave_room(room_name)
+    username = (data.get("username") if data else None) or socket_users.pop(request.sid, None)
+    if username:
+        forget_gesture_user(username)
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    socket_rooms.pop(request.sid, None)
+    username = socket_users.pop(request.sid, None)
+    if username:
+        forget_gesture_user(username)
+    live_transcriber.release(request.sid)
+
 @socketio.on("message")
-def handle_message(data):
-    def base64_to_cv2(base64_string):
-        # 移除 Base64 字首 (data:image/jpeg;base64, ...)
-        base64_data = base64_string.split(",")[1] if "," in base64_string else base64_string
-        
-        # 解碼 Base64
-        img_data = base64.b64decode(base64_data)
-        
-        # 轉換為 numpy 陣列
-        np_arr = np.frombuffer(img_data, np.uint8)
-        
-        # 轉換為 OpenCV 影像
-        img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        
-        return img
+def handle_message(data, image=None):
     try:
         # 解析 JSON 資料
         if isinstance(data, str):
-            import json
             data = json.loads(data)
         username = data["username"]
-        img = base64_to_cv2(data["image"])
-        if img is None:
-            print("❌ Base64 解碼失敗")
-            return 
-        
-        print(f"影像尺寸: {img.shape}")  # 確保影像正確讀取
-        base_options = python.BaseOptions(model_asset_path='gesture_recognizer.task')
-        options = vision.GestureRecognizerOptions(base_options=base_options)
-        recognizer = vision.GestureRecognizer.create_from_options(options)
-        # 初始化 MediaPipe Hands
-        mp_hands = mp.solutions.hands
-        mp_drawing = mp.solutions.drawing_utils
-
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-        with mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.5) as hands:
-            results = hands.process(img_rgb)
-
-            if results.multi_hand_landmarks:
-                for landmarks in results.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(img, landmarks, mp_hands.HAND_CONNECTIONS)
-                    
-                # Display the gesture label on the image (if any gesture is recognized)
-                # Recognize gestures
-                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb)
-                recognition_result = recognizer.recognize(mp_image)
-
-                if recognition_result.gestures:
-                    for gesture in recognition_result.gestures:
-                        # Get the top gesture and its category name
-                        top_gesture = gesture[0]
-                        gesture_label = top_gesture.category_name
-                        socketio.emit("gestureDetection", {"username":username,"gesture":gesture_label})
-       
+        socket_users[request.sid] = username
+        # 未加入會議室的連線 (目前內建的前端只送 username 與 image) 沿用原本的廣播給所有連線
+        room_name = data.get("roomName") or socket_rooms.get(request.sid)
+        landmarks = data.get("landmarks")
+        if landmarks is None and image is None:
+            image = data["image"]
+        # 可傳送 landmarks，或影像 (獨立的二進位附件、JSON 內的 bytes 或舊版 Base64 字串)
+        gesture_mailbox.submit(username, (room_name, landmarks, image))
+
     except Exception as e:
         print("影像處理錯誤:", e)
 
+# 摘要工作進度：客戶端以 subscribeJob 訂閱後推送 summarizeProgress
+jobs.add_listener(lambda job: socketio.emit("summarizeProgress", job.to_dict(), to=job.id))
+
+@socketio.on("subscribeJob")
+def handle_subscribe_job(data):
+    job_id = data.get("jobId")
+    if job_id:
+        join_room(job_id)
+
+# 即時轉錄：會議室中的一個客戶端 (例如主持人) 每隔數秒以 liveAudio 送出一段可獨立解碼的音訊
+# ({"roomName": ..., "format": "s16le" (16 kHz 單聲道 PCM，可省略)} 加上二進位附件)，轉錄後以 liveTranscript 推送給會議室
+live_transcriber.add_listener(
+    lambda room_name, segments: socketio.emit("liveTranscript", {"roomName": room_name, "segments": segments},
+                                              to=room_name))
+
+@socketio.on("liveAudio")
+def handle_live_audio(data, audio=None):
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+        room_name = data.get("roomName") or socket_rooms.get(request.sid)
+        audio = audio if audio is not None else data.get("audio")
+        if not room_name or not audio:
+            return
+        # 每個會議室只接受一個音訊來源，其他來源的音訊會被拒絕
+        if not live_transcriber.submit(room_name, audio, data.get("format"), source=request.sid):
+            emit("liveAudioRejected", {"roomName": room_name, "errorMessage": "Another client is sending live audio"})
+    except Exception as e:
+        print("即時轉錄錯誤:", e)
+
+@app.route('/api/gesture/stats')
+def gesture_stats():
+    return jsonify(gesture_mailbox.stats())
+
 # 單一入口路由
 @app.route('/')
 def index():
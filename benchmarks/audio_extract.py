@@ -0,0 +1,75 @@
+# 音軌抽取比較：舊版 pydub AudioSegment 完整解碼 + mp3 匯出 vs. ffmpeg 串流轉為 16 kHz 單聲道語音格式
+# 執行方式 (於專案根目錄)：python -m benchmarks.audio_extract --minutes 30
+# 每種方式在獨立的子程序中執行，回報耗時與峰值 RSS (含 ffmpeg 子程序)
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def make_synthetic_video(path, minutes):
+    # 產生含雙聲道 AAC 音軌的 mp4 (小尺寸黑畫面)，模擬 LiveKit egress 錄影
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"color=c=black:s=320x240:r=5:d={minutes * 60}",
+        "-f", "lavfi", "-i", f"anoisesrc=d={minutes * 60}:c=pink:r=48000:a=0.2",
+        "-ac", "2", "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", path,
+    ], check=True)
+
+
+def run_pydub(source, output_dir):
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(source, format="mp4")
+    output_path = os.path.join(output_dir, "pydub.mp3")
+    audio.export(output_path, format="mp3")
+    return output_path
+
+
+def run_ffmpeg(source, output_dir):
+    from libs.audio import extract_audio, extract_format
+    output_path = os.path.join(output_dir, f"ffmpeg.{extract_format()[2]}")
+    return extract_audio(source, output_path)
+
+
+def child(mode, source):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        output_path = (run_pydub if mode == "pydub" else run_ffmpeg)(source, output_dir)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(output_path)
+    # Linux 上 ru_maxrss 單位為 KB
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024, "output_mb": size / 1024 / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio extraction benchmark")
+    parser.add_argument("--minutes", type=int, default=30)
+    parser.add_argument("--source", help="existing recording to use instead of a synthetic one")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SOURCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = args.source
+        if not source:
+            source = os.path.join(work_dir, "synthetic.mp4")
+            make_synthetic_video(source, args.minutes)
+        for mode in ("pydub", "ffmpeg"):
+            output = subprocess.run([sys.executable, "-m", "benchmarks.audio_extract", "--child", mode, source],
+                                    stdout=subprocess.PIPE, check=True).stdout
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print(f"{result['mode']:<7} {result['seconds']:.2f}s  peak RSS {result['peak_rss_mb']:.0f} MB  "
+                  f"output {result['output_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# 以 replay / fake 後端離線壓測轉錄 + 摘要與聊天機器人的吞吐量 (不需網路與 Groq 額度)
+# 執行方式 (於專案根目錄)：
+#   python -m benchmarks.backend_throughput --backend fake --audio temp_audio/sample.ogg --requests 20 --concurrency 4
+#   先以 AI_BACKEND=groq AI_RECORD_DIR=recordings/replay 實際跑一次錄下回應，再以 --backend replay 重播
+# 模擬延遲由 AI_SIMULATED_LATENCY_MS / AI_SIMULATED_MS_PER_TOKEN / AI_SIMULATED_MS_PER_AUDIO_SECOND 設定
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from libs.ai import AI, RateLimits
+from libs.cache import SemanticAnswerCache
+
+CHATBOT_QUESTIONS = [
+    "要怎麼上傳會議錄音？",
+    "摘要大概多久會完成？",
+    "可以下載會議紀錄嗎？",
+]
+
+
+def run(name, fn, requests, concurrency):
+    latencies = []
+
+    def timed(index):
+        start = time.perf_counter()
+        fn(index)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{name:<10} {requests / elapsed:6.2f} req/s  p50={statistics.median(latencies) * 1000:.0f}ms  "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms  concurrency={concurrency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline AI backend throughput benchmark")
+    parser.add_argument("--backend", choices=["fake", "replay"], default="fake")
+    parser.add_argument("--audio", help="extract_audio 輸出的音檔，用於轉錄 + 摘要")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-chatbot", action="store_true")
+    parser.add_argument("--chatbot-cache", action="store_true", help="啟用聊天機器人的語意回答快取")
+    args = parser.parse_args()
+
+    # replay 的轉錄鍵包含模型名稱，需與錄製時相同；離線後端不需限流，否則量到的是限流器而非後端
+    ai = AI(api_key=None, chat_model=os.environ.get("CHAT_MODEL", "benchmark"),
+            audio_model=os.environ.get("AUDIO_MODEL", "whisper-large-v3"), backend=args.backend,
+            limits=RateLimits(limits={}, default_rpm=0, default_tpm=0),
+            chatbot_cache=SemanticAnswerCache() if args.chatbot_cache else None)
+
+    if args.audio:
+        def summarize(_):
+            transcription = ai.transcribe_long_audio(args.audio)
+            ai.get_summary(transcription.text, segments=transcription.segments)
+
+        run("summarize", summarize, args.requests, args.concurrency)
+
+    if not args.skip_chatbot:
+        def chatbot(index):
+            question = CHATBOT_QUESTIONS[index % len(CHATBOT_QUESTIONS)]
+            ai.get_chatbot_message(question, question=question, first_turn=True)
+
+        run("chatbot", chatbot, args.requests, args.concurrency)
+        if args.chatbot_cache:
+            print(ai.chatbot_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
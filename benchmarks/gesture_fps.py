@@ -0,0 +1,65 @@
+# 手勢辨識每秒幀數 (FPS) 比較：舊版每幀載入模型 vs. 常駐 recognizer 池
+# 執行方式 (於專案根目錄)：python -m benchmarks.gesture_fps --frames 50
+import argparse
+import time
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks import python
+from mediapipe.tasks.python import vision
+
+from libs.gesture import GESTURE_MODEL_PATH, GestureRecognizerPool
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def legacy_recognize(img):
+    # 與舊版 handle_message 相同：每幀建立 recognizer 與 Hands，並繪製 landmarks
+    base_options = python.BaseOptions(model_asset_path=GESTURE_MODEL_PATH)
+    options = vision.GestureRecognizerOptions(base_options=base_options)
+    recognizer = vision.GestureRecognizer.create_from_options(options)
+    mp_hands = mp.solutions.hands
+    mp_drawing = mp.solutions.drawing_utils
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    labels = []
+    with mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.5) as hands:
+        results = hands.process(img_rgb)
+        if results.multi_hand_landmarks:
+            for landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(img, landmarks, mp_hands.HAND_CONNECTIONS)
+            recognition_result = recognizer.recognize(mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb))
+            labels = [gesture[0].category_name for gesture in recognition_result.gestures]
+    recognizer.close()
+    return labels
+
+
+def measure(name, frames, fn):
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {len(frames)} frames in {elapsed:.2f}s -> {len(frames) / elapsed:.1f} fps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gesture recognition FPS benchmark")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.frames, args.width, args.height)
+
+    measure("legacy", frames, legacy_recognize)
+
+    pool = GestureRecognizerPool(size=1)
+    pool.warmup()
+    measure("pooled", frames, lambda img: pool.recognize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)))
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
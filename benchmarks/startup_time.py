@@ -0,0 +1,55 @@
+# 量測伺服器啟動時間：匯入 libs.ai 與建立 AI 物件的耗時，比較延遲載入與啟動時即載入聊天機器人元件
+# 每次量測皆在新的子程序中執行，避免模組快取影響結果
+# 執行方式 (於專案根目錄)：
+#   python -m benchmarks.startup_time --runs 3
+#   python -m benchmarks.startup_time --runs 3 --skip-eager   # 未安裝 sentence-transformers 或沒有 chroma_db 時
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from libs.ai import AI
+imported = time.perf_counter()
+ai = AI(api_key=None, chat_model="benchmark", backend="fake")
+constructed = time.perf_counter()
+if sys.argv[1] == "eager":
+    ai.qa_chain
+ready = time.perf_counter()
+print(json.dumps({
+    "importMs": (imported - start) * 1000,
+    "constructMs": (constructed - imported) * 1000,
+    "readyMs": (ready - start) * 1000,
+    "loadMs": ai.readiness()["loadMs"],
+}))
+"""
+
+
+def measure(mode):
+    output = subprocess.run([sys.executable, "-c", CHILD_SCRIPT, mode], check=True, capture_output=True, text=True,
+                            cwd=os.getcwd()).stdout
+    # 子程序可能輸出其他日誌，結果在最後一行
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server startup time benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--skip-eager", action="store_true")
+    args = parser.parse_args()
+
+    modes = ["lazy"] if args.skip_eager else ["lazy", "eager"]
+    for mode in modes:
+        results = [measure(mode) for _ in range(args.runs)]
+        print(f"{mode:<6} import={statistics.median(r['importMs'] for r in results):.0f}ms  "
+              f"construct={statistics.median(r['constructMs'] for r in results):.0f}ms  "
+              f"ready={statistics.median(r['readyMs'] for r in results):.0f}ms  "
+              f"components={results[-1]['loadMs']}  runs={args.runs}")
+
+
+if __name__ == "__main__":
+    main()
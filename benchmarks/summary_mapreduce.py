@@ -0,0 +1,99 @@
+# 長逐字稿摘要比較：單次呼叫 vs. map-reduce (以模擬延遲的假 LLM 取代 Groq，不需網路)
+# 執行方式 (於專案根目錄)：python -m benchmarks.summary_mapreduce --minutes 120
+# 假 LLM 延遲 = 固定延遲 + 輸入 token 數 × 每 token 處理時間 + 輸出 token 數 × 每 token 生成時間
+import argparse
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from libs.ai import AI, RateLimits, estimate_tokens
+
+SAMPLE_SENTENCES = [
+    "我們下週要完成登入頁面的改版",
+    "預算的部分需要再跟財務確認",
+    "測試環境目前還有兩個已知問題",
+    "客戶希望在月底前看到第一版的展示",
+    "這個功能先延後到下一個版本",
+    "請大家在週五前回覆自己的進度",
+]
+
+
+class StubLLM:
+    def __init__(self, base_latency, prefill_per_token, decode_per_token, context_tokens):
+        self.base_latency = base_latency
+        self.prefill_per_token = prefill_per_token
+        self.decode_per_token = decode_per_token
+        self.context_tokens = context_tokens
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        input_tokens = sum(estimate_tokens(content) for _, content in messages)
+        if input_tokens > self.context_tokens:
+            raise ValueError(f"context length exceeded: {input_tokens} > {self.context_tokens}")
+        output_tokens = min(800, input_tokens // 4)
+        time.sleep(self.base_latency + input_tokens * self.prefill_per_token + output_tokens * self.decode_per_token)
+        content = json.dumps({"tags": [], "atmosphere": [], "title": "會議", "content": "摘要" * (output_tokens // 2)},
+                             ensure_ascii=False)
+        return SimpleNamespace(content=content)
+
+
+def synthetic_segments(minutes, seed=0):
+    # 約每 5 秒一個 segment
+    rng = random.Random(seed)
+    segments = []
+    for index in range(minutes * 12):
+        text = "，".join(rng.choice(SAMPLE_SENTENCES) for _ in range(2)) + "。"
+        segments.append({"id": index, "start": index * 5, "end": index * 5 + 5, "text": text})
+    return segments
+
+
+def make_ai(llm, window_tokens, concurrency):
+    # 不經過 __init__，避免載入 embeddings 與建立 Groq 客戶端
+    ai = AI.__new__(AI)
+    ai.llm = llm
+    ai.summary_cache = None
+    ai.chat_model = "stub"
+    ai.temperature = 0
+    ai.summary_window_tokens = window_tokens
+    ai.summary_concurrency = concurrency
+    ai.limits = RateLimits(limits={}, default_rpm=0, default_tpm=0)
+    return ai
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map-reduce summary benchmark")
+    parser.add_argument("--minutes", type=int, default=120)
+    parser.add_argument("--window-tokens", type=int, default=6000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--context-tokens", type=int, default=32768)
+    parser.add_argument("--base-latency", type=float, default=0.3)
+    parser.add_argument("--prefill-per-token", type=float, default=0.00002)
+    parser.add_argument("--decode-per-token", type=float, default=0.004)
+    args = parser.parse_args()
+
+    segments = synthetic_segments(args.minutes)
+    text = "".join(segment["text"] for segment in segments)
+    print(f"transcript: {len(segments)} segments, ~{estimate_tokens(text)} tokens")
+
+    def new_llm():
+        return StubLLM(args.base_latency, args.prefill_per_token, args.decode_per_token, args.context_tokens)
+
+    single = new_llm()
+    start = time.perf_counter()
+    try:
+        make_ai(single, float("inf"), 1).get_summary(text)
+        print(f"single     {time.perf_counter() - start:.2f}s  calls={single.calls}")
+    except ValueError as e:
+        print(f"single     failed: {e}")
+
+    mapped = new_llm()
+    start = time.perf_counter()
+    make_ai(mapped, args.window_tokens, args.concurrency).get_summary(text, segments=segments)
+    print(f"map-reduce {time.perf_counter() - start:.2f}s  calls={mapped.calls}  "
+          f"window={args.window_tokens} concurrency={args.concurrency}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from io import BytesIO
+import json
 import math
 import os
-from urllib.parse import quote
+import queue
+from urllib.parse import quote, unquote
 import zipfile
-import cv2
 from docx import Document
-import numpy as np
-from pydub import AudioSegment
 import random
 import string
 from tempfile import NamedTemporaryFile
+import threading
+import time
 import uuid
 from firebase_admin import firestore, credentials
 from flask import Blueprint, Response, jsonify, make_response, request, send_file
 import requests
 
-from controller.line_controller import send_message_to_line
-from libs.ai import AI
+from controller.line_controller import send_meetings_to_line, send_message_to_line
+from libs.ai import AI, RateLimitTimeout
+from libs.audio import extract_audio, extract_format
+from libs.cache import CHATBOT_CACHE_ENABLED, SemanticAnswerCache, SummaryCache, TranscriptionCache
+from libs.jobs import Job, QueueFullError, create_job_queue
+from libs.live import LiveTranscriber
+from libs.pipeline import Pipeline, PipelineContext, PipelineMetrics, Stage
 from libs.s3 import S3
+from libs.thumbnail import create_thumbnails
+from libs.transcript import TranscriptStore, inline_segments, slice_segments
 
 api_blueprint = Blueprint('api', __name__)
 
@@ -67,6 +76,10 @@ RECORDINGS_PATH = os.environ.get("RECORDINGS_PATH", "recordings/")
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 CHAT_MODEL = os.environ.get("CHAT_MODEL")
 AUDIO_MODEL = os.environ.get("AUDIO_MODEL")
+SSE_KEEPALIVE_SECONDS = 15
+# 批次摘要：同時處理的錄音檔數與單一批次的上限
+SUMMARIZE_BATCH_CONCURRENCY = int(os.environ.get("SUMMARIZE_BATCH_CONCURRENCY", 3))
+SUMMARIZE_BATCH_MAX_ITEMS = 20
 
 # 初始化firestore
 db = firestore.client()
@@ -75,8 +88,23 @@ s3 = S3()
 
 allowed_file_types = {'mp3', 'mp4', 'm4a', 'wav', 'webm'}  # 許可的檔案擴展名
 
+# 轉錄快取 (本機 LRU + S3) 與摘要快取
+transcription_cache = TranscriptionCache(s3)
+summary_cache = SummaryCache()
+# 聊天機器人的語意回答快取 (CHATBOT_CACHE_ENABLED / CHATBOT_SIMILARITY_THRESHOLD)，預設關閉
+chatbot_cache = SemanticAnswerCache() if CHATBOT_CACHE_ENABLED else None
+# 逐字稿 segments 的 S3 存放 (Firestore 只存指標)
+transcript_store = TranscriptStore(s3)
+
 ai = AI(api_key=GROQ_API_KEY, chat_model=CHAT_MODEL,
-        audio_model=AUDIO_MODEL, temperature=0.2)
+        audio_model=AUDIO_MODEL, temperature=0.2,
+        transcription_cache=transcription_cache, summary_cache=summary_cache, chatbot_cache=chatbot_cache)
+
+# 摘要工作佇列 (JOB_BACKEND / JOB_WORKERS / JOB_QUEUE_SIZE)
+jobs = create_job_queue()
+
+# 會議進行中的即時轉錄 (Socket.IO liveAudio)，錄影結束時的摘要直接使用
+live_transcriber = LiveTranscriber(ai)
 
 # 檢查檔案擴展名是否有效
 
@@ -90,171 +118,503 @@ def generate_random_code(length=12):
     return ''.join(random.choices(characters, k=length))
 
 
-@api_blueprint.route('/summarize', methods=['POST'])
-def summarize():
-    # 檢查是否有上傳音訊檔案
-    if 'file' not in request.files and 's3_file_name' not in request.form:
-        return jsonify({
-            "errorMessage": "No file found",
-        }), 400
-
-    uid = request.form.get('uid')
-    key = ''
-    file_name = ''
-    file_type = ''
-    summary_id = request.form.get('summary_id', str(uuid.uuid4()))
-    s3_file_name = request.form.get('s3_file_name')
+def recording_params(s3_file_name):
+    # 已在 S3 上的錄音檔
+    return {
+        "key": RECORDINGS_PATH + s3_file_name,
+        "s3_file_name": s3_file_name,
+        "file_type": s3_file_name.split('.')[1],
+        "local_path": None,
+        "content_sha256": None,
+    }
+
+
+def upload_recording(filename, stream):
+    # 上傳錄音檔，回傳 (錄音檔參數, None) 或 (None, 錯誤回應)
+    file_name = filename.split('.')[0]
+    file_type = filename.split('.')[1]
+    if file_name == '':
+        return None, (jsonify({'errorMessage': 'No selected file'}), 400)
+    # 獲取當前時間
+    now = datetime.now()
+    # 格式化為指定格式
+    formatted_time = now.strftime("%Y-%m-%dT%H%M%S")
+    s3_file_name = f"{file_name}-{generate_random_code()}-{formatted_time}.{file_type}"
+    key = f"{RECORDINGS_PATH}{s3_file_name}"
+    # 上傳時同步寫一份本機副本並計算雜湊，後續抽音訊直接讀本機檔案，不必再從 S3 下載
+    local_file = NamedTemporaryFile(suffix=f".{file_type}", delete=False)
+    try:
+        with local_file:
+            content_sha256, size = s3.upload_stream(key, stream, tee=local_file)
+        print(f"Uploaded {key}: {size} bytes, sha256 {content_sha256}")
+    except Exception as e:
+        os.remove(local_file.name)
+        error_message = f"Error uploading file: {str(e)}"
+        print(error_message)
+        return None, (jsonify({'errorMessage': f'Error uploading file: {str(error_message)}'}), 500)
+    return dict(recording_params(s3_file_name), local_path=local_file.name, content_sha256=content_sha256), None
+
+
+def request_options(values=None):
+    # 單筆與批次摘要共用的請求參數
+    values = values if values is not None else request.values
+    return {
+        "uid": values.get('uid'),
+        "origin": request.origin,
+        # bypass_cache=true 時強制重新生成摘要
+        "bypass_cache": values.get("bypass_cache", "").lower() in ("1", "true"),
+        # timings=true 時回應中附上各階段耗時
+        "timings": values.get("timings", "").lower() in ("1", "true"),
+    }
+
+
+def enqueue_recording_summary(uid, s3_file_name, summary_id, origin, job_id=None, live_room=None,
+                              live_started_at=None):
+    # 供 webhook 等伺服器端流程直接排入已在 S3 上的錄影檔；live_room 有即時轉錄結果時直接使用，不再轉錄錄影檔
+    # live_started_at 為錄影檔開始的 epoch 秒，即時逐字稿依此平移到錄影檔的時間軸
+    params = dict(recording_params(s3_file_name), uid=uid, summary_id=summary_id, origin=origin,
+                  bypass_cache=False, timings=False, live_room=live_room, live_started_at=live_started_at)
+    return jobs.submit(run_summarize, params, kind="summarize", job_id=job_id)
+
+
+def prepare_summarize_params():
+    # 驗證請求並上傳檔案，回傳 (工作參數, None) 或 (None, 錯誤回應)
+    # 除 multipart 表單外，也可直接以請求 body 傳送檔案 (標頭 X-File-Name，其餘欄位放在 query string)，
+    # 此時不經 Werkzeug 暫存，邊接收邊分段上傳至 S3
+    raw_file_name = unquote(request.headers.get('X-File-Name', ''))
+    if raw_file_name:
+        # body 必須是 application/octet-stream，其他類型 (例如 curl 預設的表單編碼) 會被 Werkzeug 當成表單解析
+        if request.mimetype != 'application/octet-stream':
+            return None, (jsonify({
+                "errorMessage": "Content-Type must be application/octet-stream",
+            }), 415)
+        # 只讀取 query string，不觸發表單解析
+        values = request.args
+    else:
+        values = request.values
+        if 'file' not in request.files and 's3_file_name' not in values:
+            return None, (jsonify({
+                "errorMessage": "No file found",
+            }), 400)
+
+    summary_id = values.get('summary_id', str(uuid.uuid4()))
+    s3_file_name = values.get('s3_file_name')
     if s3_file_name and allowed_file(s3_file_name):
-        file_name = s3_file_name.split('.')[0]
-        file_type = s3_file_name.split('.')[1]
-        key = RECORDINGS_PATH + s3_file_name
+        recording = recording_params(s3_file_name)
     else:
-        file = request.files['file']
-        if file and allowed_file(file.filename):
-            file_name = file.filename.split('.')[0]
-            file_type = file.filename.split('.')[1]
-            if file_name == '':
-                return jsonify({'errorMessage': 'No selected file'}), 400
-            # 獲取當前時間
-            now = datetime.now()
-            # 格式化為指定格式
-            formatted_time = now.strftime("%Y-%m-%dT%H%M%S")
-            s3_file_name = f"{file_name}-{generate_random_code()}-{formatted_time}.{file_type}"
-            key = f"{RECORDINGS_PATH}{s3_file_name}"
-            try:
-                s3.upload_object(key, file)
-            except Exception as e:
-                error_message = f"Error uploading file: {str(e)}"
-                print(error_message)
-                return jsonify({'errorMessage': f'Error uploading file: {str(error_message)}'}), 500
+        if raw_file_name:
+            filename, stream = raw_file_name, request.stream
         else:
-            error_message = str(e)
-            return jsonify({'errorMessage': 'File type not allowed'}), 400
+            file = request.files['file']
+            filename, stream = file.filename, file.stream
+        if not (filename and allowed_file(filename)):
+            return None, (jsonify({'errorMessage': 'File type not allowed'}), 400)
+        recording, error = upload_recording(filename, stream)
+        if error:
+            return None, error
+
+    params = dict(request_options(values), summary_id=summary_id, **recording)
+    return params, None
+
+
+@api_blueprint.route('/summarize', methods=['POST'])
+def summarize():
+    params, error = prepare_summarize_params()
+    if error:
+        return error
 
     try:
-        user_profile_ref = db.collection("user").document(uid)
-        user_profile = user_profile_ref.get().to_dict()
-        line_notification = user_profile.get("preferences", {}).get("lineNotification", {})
-        line_id = line_notification.get("uid") if line_notification else None
-        line_notification_enabled = line_notification.get("enabled") if line_notification else None
-        if (file_type == 'mp4'):
-            with NamedTemporaryFile(suffix=".mp4") as temp_video_file:
-                s3.download_object(key, temp_video_file)
-                temp_video_file_path = temp_video_file.name  # 獲取臨時文件路徑
-
-                # 提取影片第一幀
-                video = cv2.VideoCapture(temp_video_file_path)
-
-                # 設置到指定的幀數
-                video.set(cv2.CAP_PROP_POS_FRAMES, 24)
-
-                success, frame = video.read()
-
-                if success:
-                    thumbnail_name = f"{key.split('/')[-1].split('.')[0]}_thumbnail.jpg"
-                    temp_thumbnail_file_path = f"/tmp/{key.split('/')[-1].split('.')[0]}_thumbnail.jpg"
-                    cv2.imwrite(temp_thumbnail_file_path, frame)
-                    with open(temp_thumbnail_file_path, "rb") as image_file:
-                        s3.upload_object(
-                            f"{RECORDINGS_PATH}{thumbnail_name}", image_file)
-
-                    video.release()
-
-                    # 使用 pydub 加載音頻流
-                    audio = AudioSegment.from_file(
-                        temp_video_file_path, format=file_type)
-
-                    # 將音頻保存為臨時文件
-                    with NamedTemporaryFile(suffix=".mp3") as temp_audio_file:
-                        audio.export(temp_audio_file.name, format="mp3")
-                        temp_audio_file_path = temp_audio_file.name  # 獲取臨時文件路徑
-                        print(temp_audio_file_path)
-                        with open(temp_audio_file_path, "rb") as audio_file:
-                            transcription = ai.transcribe_audio(audio_file)
-
-                    # print(transcription)
-                    mapped_segments = list(map(
-                        lambda segment:
-                            {
-                                "id": segment["id"],
-                                "startTime": math.floor(segment["start"]),
-                                "endTime": math.floor(segment["end"]),
-                                "text": segment["text"]
-                            },
-                        transcription.segments))
-
-                    # 使用 getSummary 生成會議摘要
-                    summary = ai.get_summary(transcription.text)
-                    date = datetime.now(timezone.utc).isoformat()
-                    # 構建返回的 JSON 格式
-                    response = {
-                        "summary": {
-                            "id": summary_id,
-                            "date": date,
-                            "summary": summary,
-                            "transcription": {
-                                "duration": transcription.duration,
-                                "segments": mapped_segments  # 傳遞時間段的轉錄內容
-                            },
-                            "srcUrl": f"{request.origin}/api/openvidu/recordings/{s3_file_name}",
-                            "thumbnailUrl":  f"{request.origin}/api/openvidu/recordings/thumbnails/{thumbnail_name}",
-                        }
-                    }
+        job = jobs.submit(run_summarize, params, kind="summarize")
+    except QueueFullError as e:
+        return jsonify({"errorMessage": str(e)}), 503
 
-                    doc_ref = db.collection("user").document(
-                        uid).collection("summaries").document(summary_id)
+    # 非同步模式：立即回傳工作 id，之後以 GET /api/summarize/jobs/<id> 或 Socket.IO 查詢進度
+    if wants_async():
+        return jsonify({
+            "jobId": job.id,
+            "status": job.status,
+            "statusUrl": f"/api/summarize/jobs/{job.id}",
+        }), 202
+
+    # 同步模式 (既有前端)：等待工作完成後回傳摘要
+    job.wait()
+    if job.status == "failed":
+        return jsonify({
+            "errorMessage": job.error
+        }), 500
+    return jsonify(job.result)
+
+
+@api_blueprint.route('/summarize/batch', methods=['POST'])
+def summarize_batch():
+    # 一次提交多個錄音檔 (多個 file 欄位及/或多個 s3_file_name 欄位)，回傳每個檔案各自的結果
+    s3_file_names = request.values.getlist('s3_file_name')
+    files = [file for file in request.files.getlist('file') if file.filename]
+    if not s3_file_names and not files:
+        return jsonify({"errorMessage": "No file found"}), 400
+    if len(s3_file_names) + len(files) > SUMMARIZE_BATCH_MAX_ITEMS:
+        return jsonify({"errorMessage": f"At most {SUMMARIZE_BATCH_MAX_ITEMS} files per batch"}), 400
+    if not all(allowed_file(name) for name in s3_file_names + [file.filename for file in files]):
+        return jsonify({'errorMessage': 'File type not allowed'}), 400
+
+    recordings = [recording_params(name) for name in s3_file_names]
+    for file in files:
+        recording, error = upload_recording(file.filename, file.stream)
+        if error:
+            for uploaded in recordings:
+                if uploaded["local_path"]:
+                    os.remove(uploaded["local_path"])
+            return error
+        recordings.append(recording)
+
+    options = request_options()
+    batch = {
+        "uid": options["uid"],
+        "items": [dict(options, summary_id=str(uuid.uuid4()), **recording) for recording in recordings],
+    }
+    try:
+        job = jobs.submit(run_summarize_batch, batch, kind="summarize_batch")
+    except QueueFullError as e:
+        for recording in recordings:
+            if recording["local_path"]:
+                os.remove(recording["local_path"])
+        return jsonify({"errorMessage": str(e)}), 503
+
+    if wants_async():
+        return jsonify({
+            "jobId": job.id,
+            "status": job.status,
+            "statusUrl": f"/api/summarize/jobs/{job.id}",
+        }), 202
 
-                    doc_ref.set(response["summary"])
+    job.wait()
+    if job.status == "failed":
+        return jsonify({
+            "errorMessage": job.error
+        }), 500
+    return jsonify(job.result)
 
-                    if line_id and line_notification_enabled:
-                        send_message_to_line(line_id, response["summary"])
-                    return jsonify(response)
-                else:
-                    video.release()
-                    return jsonify({"error": "Failed to extract frame from video"}), 500
-        else:
-            with NamedTemporaryFile(suffix=".mp3") as temp_audio_file:
-                s3.download_object(key, temp_audio_file)
-                with open(temp_audio_file.name, "rb") as audio_file:
-                    transcription = ai.transcribe_audio(audio_file)
-                # print(transcription)
-                mapped_segments = list(map(
-                    lambda segment:
-                        {
-                            "id": segment["id"],
-                            "startTime": math.floor(segment["start"]),
-                            "endTime": math.floor(segment["end"]),
-                            "text": segment["text"]
-                        },
-                    transcription.segments))
-
-                # 使用 getSummary 生成會議摘要
-                summary = ai.get_summary(transcription.text)
-                date = datetime.now(timezone.utc).isoformat()
-                # 構建返回的 JSON 格式
-                response = {
-                    "summary": {
-                        "id": summary_id,
-                        "date": date,
-                        "summary": summary,
-                        "transcription": {
-                            "duration": transcription.duration,
-                            "segments": mapped_segments  # 傳遞時間段的轉錄內容
-                        },
-                        "srcUrl": f"{request.origin}/api/openvidu/recordings/{s3_file_name}",
-                        "thumbnailUrl":  f"{request.origin}/api/openvidu/recordings/thumbnails/default.png",
-                    }
-                }
 
-                doc_ref = db.collection("user").document(
-                    uid).collection("summaries").document(summary_id)
+@api_blueprint.route('/summarize/stream', methods=['POST'])
+def summarize_stream():
+    """
+    以 Server-Sent Events 回傳摘要：先推送各階段進度 (progress)，摘要生成時逐段推送模型輸出 (token)，
+    最後以 done 事件回傳完整解析後的結果 (與 /summarize 相同格式)，失敗時為 failed 事件。
+    """
+    params, error = prepare_summarize_params()
+    if error:
+        return error
+    params["stream"] = True
 
-                doc_ref.set(response["summary"])
+    events = queue.Queue()
+    try:
+        job = jobs.submit(run_summarize, params, kind="summarize",
+                          subscriber=lambda event, data: events.put((event, data)))
+    except QueueFullError as e:
+        return jsonify({"errorMessage": str(e)}), 503
+
+    def generate():
+        yield sse_event("job", {"jobId": job.id, "statusUrl": f"/api/summarize/jobs/{job.id}"})
+        while True:
+            try:
+                event, data = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                # 轉錄等較久的階段沒有事件時送出註解行，避免代理伺服器斷線
+                yield ": keep-alive\n\n"
+                continue
+            yield sse_event(event, data)
+            if event in ("done", "failed"):
+                break
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # 關閉 nginx 緩衝，事件才能即時送達
+        "X-Accel-Buffering": "no",
+    })
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@api_blueprint.route('/summarize/jobs/<job_id>', methods=['GET'])
+def get_summarize_job(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"errorMessage": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+def wants_async():
+    prefer = request.headers.get("Prefer", "")
+    # 以 body 直接傳送檔案時欄位只在 query string
+    values = request.args if request.headers.get('X-File-Name') else request.values
+    return "respond-async" in prefer or values.get("async", "").lower() in ("1", "true")
+
+
+def get_line_settings(uid):
+    # 回傳 (LINE 使用者 id, 是否啟用通知)
+    user_profile = db.collection("user").document(uid).get().to_dict()
+    line_notification = user_profile.get("preferences", {}).get("lineNotification", {})
+    line_id = line_notification.get("uid") if line_notification else None
+    line_notification_enabled = line_notification.get("enabled") if line_notification else None
+    return line_id, line_notification_enabled
+
+
+def new_pipeline_context(job, params):
+    ctx = PipelineContext(job, params)
+    # 剛上傳的檔案保留了本機副本，流程結束後移除
+    if params.get("local_path"):
+        ctx.on_cleanup(lambda: os.remove(params["local_path"]))
+    return ctx
 
-                if line_id and line_notification_enabled:
-                    send_message_to_line(line_id, response["summary"])
-                return jsonify(response)
 
+def load_profile(ctx):
+    ctx.data["line_id"], ctx.data["line_notification_enabled"] = get_line_settings(ctx.params["uid"])
+
+
+def make_thumbnail(ctx):
+    origin = ctx.params["origin"]
+    if ctx.params["file_type"] == 'mp4':
+        # 只以 range 請求讀取 moov 與開頭的視訊 sample 產生縮圖，不下載整部影片
+        thumbnail_name = create_thumbnails(s3, ctx.params["key"], RECORDINGS_PATH,
+                                           local_path=ctx.params.get("local_path"))
+        ctx.data["thumbnail_url"] = f"{origin}/api/openvidu/recordings/thumbnails/{thumbnail_name}"
+    else:
+        ctx.data["thumbnail_url"] = f"{origin}/api/openvidu/recordings/thumbnails/default.png"
+
+
+def take_live_transcription(ctx):
+    transcription = live_transcriber.finish(ctx.params["live_room"], ctx.params["live_started_at"])
+    if transcription:
+        ctx.data["transcription"] = transcription
+    return {"live": transcription is not None}
+
+
+def lookup_uploaded_transcription(ctx):
+    # 相同內容的檔案重新上傳時，直接使用先前的轉錄結果
+    transcription = ai.get_cached_transcription(ctx.params["content_sha256"])
+    if transcription:
+        ctx.data["transcription"] = transcription
+    return {"cached": transcription is not None}
+
+
+def transcode_audio(ctx):
+    temp_audio_file = NamedTemporaryFile(suffix=f".{extract_format()[2]}")
+    ctx.on_cleanup(temp_audio_file.close)
+    local_path = ctx.params.get("local_path")
+    # 剛上傳的檔案直接讀本機副本；否則 ffmpeg 從 S3 串流讀取並轉為精簡的語音格式，不需先完整下載
+    extract_audio(local_path or s3.generate_presigned_url(ctx.params["key"]), temp_audio_file.name)
+    ctx.data["audio_path"] = temp_audio_file.name
+    return {
+        "bytesIn": os.path.getsize(local_path) if local_path else None,
+        "bytesOut": os.path.getsize(temp_audio_file.name),
+    }
+
+
+def transcribe(ctx):
+    stats = {}
+    # 依靜音切段後並行轉錄
+    transcription = ai.transcribe_long_audio(ctx.data["audio_path"], stats=stats,
+                                             content_sha256=ctx.params.get("content_sha256"))
+    ctx.data["transcription"] = transcription
+    return {"bytesIn": os.path.getsize(ctx.data["audio_path"]), "bytesOut": len(transcription.text.encode("utf-8")),
+            **stats}
+
+
+def summarize_transcription(ctx):
+    transcription = ctx.data["transcription"]
+    job = ctx.job
+    stats = {}
+    # 串流模式下將模型輸出逐段推送給訂閱者
+    on_token = (lambda text: job.publish("token", {"text": text})) if ctx.params.get("stream") else None
+    ctx.data["summary"] = ai.get_summary(transcription.text, use_cache=not ctx.params.get("bypass_cache"),
+                                         segments=transcription.segments, on_token=on_token, stats=stats)
+    return {"bytesIn": len(transcription.text.encode("utf-8")),
+            "bytesOut": len(json.dumps(ctx.data["summary"], ensure_ascii=False).encode("utf-8")), **stats}
+
+
+def save_summary(ctx):
+    params = ctx.params
+    transcription = ctx.data["transcription"]
+    mapped_segments = list(map(
+        lambda segment:
+            {
+                "id": segment["id"],
+                "startTime": math.floor(segment["start"]),
+                "endTime": math.floor(segment["end"]),
+                "text": segment["text"]
+            },
+        transcription.segments))
+    date = datetime.now(timezone.utc).isoformat()
+    # 構建返回的 JSON 格式
+    ctx.data["response"] = {
+        "summary": {
+            "id": params["summary_id"],
+            "date": date,
+            "summary": ctx.data["summary"],
+            "transcription": {
+                "duration": transcription.duration,
+                "segments": mapped_segments  # 傳遞時間段的轉錄內容
+            },
+            "srcUrl": f"{params['origin']}/api/openvidu/recordings/{params['s3_file_name']}",
+            "thumbnailUrl": ctx.data["thumbnail_url"],
+        }
+    }
+    doc_ref = db.collection("user").document(
+        params["uid"]).collection("summaries").document(params["summary_id"])
+
+    start = time.perf_counter()
+    # 完整的 segments 以壓縮格式另存於 S3，Firestore 文件只保留指標、統計與開頭幾 KB 的預覽 (TRANSCRIPT_INLINE_MAX_BYTES)，
+    # 預覽被截斷時標記 segmentsTruncated，前端改以 segments API 取得完整內容
+    segments_ref = transcript_store.put(params["summary_id"], transcription.segments)
+    segments, truncated = inline_segments(mapped_segments)
+    document = dict(ctx.data["response"]["summary"], transcription={
+        "duration": transcription.duration,
+        "segments": segments,
+        "segmentsTruncated": truncated,
+        "segmentsRef": segments_ref,
+    })
+    doc_ref.set(document)
+    return {"upstreamMs": round((time.perf_counter() - start) * 1000, 1), "bytesOut": segments_ref["bytes"]}
+
+
+def notify_line(ctx):
+    send_message_to_line(ctx.data["line_id"], ctx.data["response"]["summary"])
+
+
+# 摘要流程：各階段共用 PipelineContext，並記錄耗時 (依檔案類型彙整於 /api/pipeline/metrics)
+pipeline_metrics = PipelineMetrics()
+recording_stages = [
+    Stage("thumbnail", 5, make_thumbnail),
+    Stage("live", 8, take_live_transcription,
+          when=lambda ctx: ctx.params.get("live_room") and ctx.params.get("live_started_at")),
+    Stage("cache", 9, lookup_uploaded_transcription,
+          when=lambda ctx: ctx.params.get("content_sha256") and "transcription" not in ctx.data),
+    # 已有即時轉錄或快取的逐字稿時略過轉檔與轉錄
+    Stage("transcoding", 10, transcode_audio, when=lambda ctx: "transcription" not in ctx.data),
+    Stage("transcribing", 35, transcribe, when=lambda ctx: "transcription" not in ctx.data),
+    Stage("summarizing", 70, summarize_transcription),
+    Stage("saving", 90, save_summary),
+]
+summarize_pipeline = Pipeline("summarize", [
+    Stage("profile", 2, load_profile),
+    *recording_stages,
+    Stage("notifying", 95, notify_line,
+          when=lambda ctx: ctx.data["line_id"] and ctx.data["line_notification_enabled"]),
+], metrics=pipeline_metrics)
+# 批次中的每個錄音檔：使用者設定與 LINE 通知由整個批次共用
+batch_item_pipeline = Pipeline("summarize_batch_item", recording_stages, metrics=pipeline_metrics)
+
+
+def run_summarize(job, params):
+    ctx = summarize_pipeline.run(new_pipeline_context(job, params), group=params["file_type"])
+    response = ctx.data["response"]
+    # timings=true 時一併回傳各階段耗時
+    if params.get("timings"):
+        response = dict(response, timings=ctx.timings)
+    return response
+
+
+def run_summarize_batch(job, batch):
+    """
+    多個錄音檔同時以 SUMMARIZE_BATCH_CONCURRENCY 個執行緒處理，各檔案的階段互相重疊
+    (例如一個在轉檔時另一個在轉錄)。整個批次只讀取一次使用者設定、只發送一則 LINE 通知。
+    """
+    items = batch["items"]
+    job.update("profile", 2)
+    line_id, line_notification_enabled = get_line_settings(batch["uid"])
+
+    percents = [0] * len(items)
+    lock = threading.Lock()
+
+    def report(index, item_job):
+        with lock:
+            percents[index] = item_job.percent
+            job.update("processing", 5 + sum(percents) * 85 // (100 * len(items)))
+
+    def run_item(index, params):
+        item_job = Job("summarize", job_id=f"{job.id}:{index}", on_update=lambda item: report(index, item))
+        result = {"summaryId": params["summary_id"], "s3FileName": params["s3_file_name"]}
+        try:
+            ctx = batch_item_pipeline.run(new_pipeline_context(item_job, params), group=params["file_type"])
+        except Exception as e:
+            print(f"Batch item {params['s3_file_name']} failed.", e)
+            return dict(result, status="failed", errorMessage=str(e))
+        result = dict(result, status="done", summary=ctx.data["response"]["summary"])
+        if params.get("timings"):
+            result["timings"] = ctx.timings
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, SUMMARIZE_BATCH_CONCURRENCY)) as executor:
+        results = list(executor.map(run_item, range(len(items)), items))
+
+    summaries = [result["summary"] for result in results if result["status"] == "done"]
+    if line_id and line_notification_enabled and summaries:
+        job.update("notifying", 95)
+        send_meetings_to_line(line_id, summaries)
+    return {"items": results}
+
+
+@api_blueprint.route('/pipeline/metrics', methods=['GET'])
+def get_pipeline_metrics():
+    return jsonify(pipeline_metrics.snapshot())
+
+
+@api_blueprint.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        "transcription": transcription_cache.stats(),
+        "summary": summary_cache.stats(),
+        "chatbot": ai.chatbot_cache_stats(),
+    })
+
+
+@api_blueprint.route('/live/<room_name>', methods=['GET'])
+def get_live_transcription(room_name):
+    # 會議進行中目前累積的即時逐字稿
+    snapshot = live_transcriber.snapshot(room_name)
+    if snapshot is None:
+        return jsonify({"errorMessage": "Live session not found"}), 404
+    return jsonify(snapshot)
+
+
+@api_blueprint.route('/health/ready', methods=['GET'])
+def get_readiness():
+    # 伺服器啟動後即可服務，聊天機器人元件於背景預熱；?require=chatbot 時在預熱完成前回傳 503 (供負載平衡器使用)
+    readiness = ai.readiness()
+    if request.args.get('require') == 'chatbot' and not readiness["ready"]:
+        return jsonify(readiness), 503
+    return jsonify(readiness)
+
+
+@api_blueprint.route('/ai/limits', methods=['GET'])
+def get_ai_limits():
+    # 各模型的限流狀態：排隊數、等待時間、429 與重試次數
+    return jsonify(ai.limits.stats())
+
+
+@api_blueprint.route('/summary/<summary_id>/segments', methods=['GET'])
+def get_summary_segments(summary_id):
+    # 依時間範圍 (秒) 取得逐字稿 segments：?from=&to=，皆可省略
+    uid = request.headers.get('X-User-Id')
+    try:
+        start = request.args.get('from', type=float)
+        end = request.args.get('to', type=float)
+        snapshot = db.collection("user").document(
+            uid).collection("summaries").document(summary_id).get()
+        if not snapshot.exists:
+            return jsonify({"errorMessage": "Summary not found"}), 404
+        transcription = snapshot.to_dict().get("transcription", {})
+        segments_ref = transcription.get("segmentsRef")
+        # 舊文件的 segments 直接存在 Firestore 中
+        segments = transcript_store.get(segments_ref["key"]) if segments_ref else transcription.get("segments", [])
+        return jsonify({
+            "id": summary_id,
+            "duration": transcription.get("duration"),
+            "total": len(segments),
+            "segments": slice_segments(segments, start, end),
+        })
     except Exception as e:
         return jsonify({
             "errorMessage": str(e)
@@ -268,6 +628,10 @@ def delete_summary(summary_id):
         doc_ref = db.collection("user").document(
             uid).collection("summaries").document(summary_id)
 
+        snapshot = doc_ref.get()
+        segments_ref = (snapshot.to_dict() or {}).get("transcription", {}).get("segmentsRef") if snapshot.exists else None
+        if segments_ref:
+            transcript_store.delete(segments_ref["key"])
         doc_ref.delete()
         return jsonify({"message": "success"}), 200
     except Exception as e:
@@ -392,6 +756,9 @@ def get_chatbot_message():
                 }
             ]
 
+        # 先前沒有使用者提問時，回答不依賴對話歷史，才可使用共用的回答快取
+        first_turn = not any(chat["role"] == "user" for chat in chat_history_messages)
+
         # 添加用戶新消息到歷史記錄
         current_message = {
             "role": "user",
@@ -410,7 +777,9 @@ def get_chatbot_message():
         }] + messages
 
         # 調用ChatGroq API
-        bot_response = ai.get_chatbot_message(str(messages))
+        # 相近的提問直接使用快取的回答 (bypassCache 為 true 時略過快取)
+        bot_response = ai.get_chatbot_message(str(messages), question=message,
+                                              use_cache=not data.get('bypassCache'), first_turn=first_turn)
 
         # 將機器人的回應添加到歷史記錄
         bot_message = {
@@ -429,6 +798,11 @@ def get_chatbot_message():
 
         return jsonify(chat_data)
 
+    except RateLimitTimeout as e:
+        # 上游模型額度已滿且等待逾時
+        return jsonify({
+            "errorMessage": str(e)
+        }), 503
     except Exception as e:
         return jsonify({
             "errorMessage": str(e)
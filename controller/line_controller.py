@@ -62,14 +62,7 @@ with ApiClient(configuration) as api_client:
 # 發送 LINE 訊息的函式
 
 
-def send_message_to_line(user_id, meeting_data):
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {LINE_MESSAGE_CHANEL_ACCESS_TOKEN}",
-        "X-Line-Retry-Key": str(uuid.uuid4()),
-        "Content-Disposition": "attachment; filename*=utf-8''",
-        'Access-Control-Expose-Headers': 'Content-Disposition',
-    }
+def build_meeting_bubble(meeting_data):
     thumbnailUrl = meeting_data["thumbnailUrl"]
     srcUrl = meeting_data["srcUrl"]
     summary_title = meeting_data["summary"]["title"]
@@ -150,18 +143,60 @@ def send_message_to_line(user_id, meeting_data):
             "uri": encoded_srcUrl
         }
     }
+    return flex_content
+
 
+def send_message_to_line(user_id, meeting_data):
     # ✅ 修正 FlexMessage 物件創建方式
     flex_message = {
         "type": "flex",
-        "altText": "📺 點擊觀看會議影片" if srcUrl.endswith('.mp4') else "🎵 點擊播放會議音檔",
-        "contents": flex_content
+        "altText": "📺 點擊觀看會議影片" if meeting_data["srcUrl"].endswith('.mp4') else "🎵 點擊播放會議音檔",
+        "contents": build_meeting_bubble(meeting_data)
     }
+    push_line_messages(user_id, [flex_message])
+
+
+# LINE carousel 最多 12 個 bubble
+LINE_CAROUSEL_MAX_BUBBLES = 12
+# 一次 push 最多 5 則訊息
+LINE_PUSH_MAX_MESSAGES = 5
+
 
+def send_meetings_to_line(user_id, meetings):
+    # 批次摘要完成後，以單次 push 通知所有會議 (每則 carousel 最多 12 場，超過時分成多則)
+    if len(meetings) == 1:
+        return send_message_to_line(user_id, meetings[0])
+    max_meetings = LINE_CAROUSEL_MAX_BUBBLES * LINE_PUSH_MAX_MESSAGES
+    if len(meetings) > max_meetings:
+        print(f"⚠️ Only the first {max_meetings} of {len(meetings)} meetings are sent to LINE")
+        meetings = meetings[:max_meetings]
+    flex_messages = [
+        {
+            "type": "flex",
+            "altText": f"📋 {len(meetings)} 場會議摘要已完成",
+            "contents": {
+                "type": "carousel",
+                "contents": [build_meeting_bubble(meeting)
+                             for meeting in meetings[start:start + LINE_CAROUSEL_MAX_BUBBLES]],
+            }
+        }
+        for start in range(0, len(meetings), LINE_CAROUSEL_MAX_BUBBLES)
+    ]
+    push_line_messages(user_id, flex_messages)
+
+
+def push_line_messages(user_id, messages):
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {LINE_MESSAGE_CHANEL_ACCESS_TOKEN}",
+        "X-Line-Retry-Key": str(uuid.uuid4()),
+        "Content-Disposition": "attachment; filename*=utf-8''",
+        'Access-Control-Expose-Headers': 'Content-Disposition',
+    }
     payload = {
         "to": user_id,
         # **直接傳 JSON，不需要 `model_dump_json()`**
-        "messages": [flex_message]
+        "messages": messages
     }
 
     # 🔍 記錄發送資訊
@@ -5,17 +5,25 @@ from livekit.api import AccessToken, VideoGrants, TokenVerifier, WebhookReceiver
 from livekit import api
 from livekit.api import egress_service
 from livekit.protocol import egress as proto_egress
+from firebase_admin import firestore
+from libs.jobs import QueueFullError
 from libs.s3 import S3
 from botocore.response import StreamingBody
 from botocore.exceptions import ClientError
 
+from controller.api_controller import enqueue_recording_summary
+
 LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY", "devkey")
 LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET", "secret")
 LIVEKIT_URL = os.environ.get("LIVEKIT_URL", "http://localhost:7880")
 RECORDINGS_PATH = os.environ.get("RECORDINGS_PATH", "recordings/")
 RECORDING_FILE_PORTION_SIZE = 5 * 1024 * 1024  # 5MB
+THUMBNAIL_CONTENT_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+# 對外網址，webhook 自動摘要時用於縮圖與錄影連結 (webhook 請求來自 LiveKit，無法從請求取得)
+PUBLIC_URL = os.environ.get("PUBLIC_URL", "")
 
 s3 = S3()
+db = firestore.client()
 
 openvidu_blueprint = Blueprint('api/openvidu', __name__)
 
@@ -48,11 +56,58 @@ def receive_webhook():
     try:
         event = webhook_receiver.receive(request.data.decode("utf-8"), auth_token)
         print("LiveKit Webhook:", event)
-        return "ok"
     except:
         print("Authorization header is not valid")
         return "Authorization header is not valid", 401
 
+    if event.event == "egress_ended":
+        try:
+            summarize_egress(event.egress_info)
+        except QueueFullError as e:
+            # 佇列已滿：回傳錯誤讓 LiveKit 重送
+            print("Error enqueueing egress summary.", e)
+            return str(e), 503
+    return "ok"
+
+
+@firestore.transactional
+def claim_egress(transaction, egress_ref):
+    # 同一個 egress 只排入一次摘要 (webhook 可能重送或由多個程序收到)
+    snapshot = egress_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        return None
+    egress = snapshot.to_dict()
+    if egress.get("summaryJobId"):
+        return None
+    transaction.update(egress_ref, {"summaryJobId": f"egress-{snapshot.id}"})
+    return egress
+
+
+def summarize_egress(egress_info):
+    if egress_info.status != proto_egress.EgressStatus.EGRESS_COMPLETE or not egress_info.file_results:
+        print(f"Egress {egress_info.egress_id} ended with status {egress_info.status}, skipping summary")
+        return
+    egress_ref = db.collection("egress").document(egress_info.egress_id)
+    egress = claim_egress(db.transaction(), egress_ref)
+    if not egress:
+        print(f"Egress {egress_info.egress_id} has no owner or is already summarized")
+        return
+
+    file_result = egress_info.file_results[0]
+    s3_file_name = file_result.filename.split("/").pop()
+    # 錄影檔開始的時間 (奈秒)，即時逐字稿依此對齊錄影檔
+    started_at = (file_result.started_at or egress_info.started_at) / 1_000_000_000 or None
+    origin = PUBLIC_URL or request.host_url.rstrip("/")
+    try:
+        # 以 egress id 作為摘要 id 與工作 id，重複處理時覆寫同一份摘要
+        job = enqueue_recording_summary(egress["uid"], s3_file_name, egress_info.egress_id, origin,
+                                        job_id=f"egress-{egress_info.egress_id}", live_room=egress_info.room_name,
+                                        live_started_at=started_at)
+    except QueueFullError:
+        egress_ref.update({"summaryJobId": firestore.DELETE_FIELD})
+        raise
+    print(f"Egress {egress_info.egress_id}: summarize job {job.id} queued for {s3_file_name}")
+
 @openvidu_blueprint.route("/recordings/start", methods=["POST"])
 async def start_recording():
     lkapi = api.LiveKitAPI(url=LIVEKIT_URL, api_key=LIVEKIT_API_KEY, api_secret=LIVEKIT_API_SECRET)
@@ -81,6 +136,15 @@ async def start_recording():
         )
 
         egress_info = await egress.start_room_composite_egress(start=egress_request)
+
+        # 記錄錄影的擁有者，錄影結束 (egress_ended webhook) 時自動為其生成摘要
+        uid = request.json.get("uid") or request.headers.get("X-User-Id")
+        if uid:
+            db.collection("egress").document(egress_info.egress_id).set({
+                "uid": uid,
+                "roomName": room_name,
+                "startedAt": egress_info.started_at / 1_000_000,
+            })
         
         file = egress_info.file_results[0]
         
@@ -250,7 +314,7 @@ def get_recording_thumbnail(thumbnail_name):
         
         # 獲取圖片的 MIME 類型 (預設為 image/jpeg)
         headers = {
-            "Content-Type": 'image/jpeg',
+            "Content-Type": THUMBNAIL_CONTENT_TYPES.get(thumbnail_name.rsplit('.', 1)[-1].lower(), 'image/jpeg'),
         }
         # 回傳檔案流作為 HTTP 回應
         return Response(image_stream.read(), headers=headers)
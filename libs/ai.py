@@ -1,12 +1,311 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 from io import BufferedReader
+import os
+import random
+import threading
+from tempfile import NamedTemporaryFile
+import time
 from typing import Optional
-from groq import Groq, AsyncGroq
-from langchain_groq import ChatGroq
-from langchain.document_loaders import PyPDFLoader
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import Chroma
-from langchain.chains import RetrievalQA
 import json
+from libs.backends import AI_BACKEND, create_backends
+from libs.cache import CachedEmbeddings
+from libs.audio import (AUDIO_EXTRACT_FORMAT, TimeOffsetMap, detect_silences, export_chunk, extract_format, plan_chunks,
+                        plan_trim, probe_duration_ms, trim_audio)
+
+# 會議摘要 prompt，內容修改時請一併調整版本號，使摘要快取失效
+SUMMARY_PROMPT_VERSION = "1"
+SUMMARY_PROMPT = """
+        角色：
+        您是一位專業的文字處理專家，具備細心、耐心、強大的語言能力和豐富的文字處理經驗，並能與不同部門協調合作，確保內容質量與專業性。
+
+        任務：
+        請協助總結會議內容，生成會議標籤、會議討論氣氛、會議標題與會議摘要，並以以下格式輸出：
+        {
+            "tags": [],
+            "atmosphere": [],
+            "title": "",
+            "content": ""
+        }
+
+        規則：
+        1. 必須逐字閱讀逐字稿，確保沒有遺漏任何關鍵訊息。
+        2. 中文用字需淺顯易懂，避免使用晦澀語言。
+        3. 提取以下內容：
+        - 關鍵討論點
+        - 決策內容
+        - 行動項目
+        - 重要意見
+        4. 整理後需確保邏輯清晰、結構連貫。
+        5. **摘要需根據輸入內容長度生成相對應的字數：**
+        - 100 字的內容，生成 75 字的摘要。
+        - 200 字的內容，生成 150 字的摘要。
+        - 以此類推，摘要長度需符合內容比例，並涵蓋核心重點。
+        6. 摘要需完整且詳細，語言流暢、易於理解。
+        7. 僅返回符合 JSON 格式的內容，確保輸出結果無其他額外文字。
+        8. 不要出現```。
+
+        請直接回覆符合上述規範的 JSON 格式。
+        """
+
+# 逐字稿過長時，每段先整理重點 (map)，再合併成最終摘要 (reduce)
+SUMMARY_MAP_PROMPT = """
+        以下是一場會議逐字稿的其中一段。
+        請逐字閱讀，整理這一段的關鍵討論點、決策內容、行動項目與重要意見，
+        並保留發言脈絡與重要數字，以繁體中文條列輸出。
+        僅輸出條列重點，不要輸出 JSON，也不要加上其他說明。
+        """
+SUMMARY_REDUCE_PREFIX = "以下為會議各段落依時間順序整理的重點，請視為完整的會議逐字稿內容進行總結：\n\n"
+SUMMARY_WINDOW_TOKENS = int(os.environ.get("SUMMARY_WINDOW_TOKENS", 6000))
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", 4))
+SUMMARY_MAX_DEPTH = 3
+
+# 長音檔分段轉錄的同時請求數
+TRANSCRIBE_PARALLELISM = int(os.environ.get("TRANSCRIBE_PARALLELISM", 4))
+
+# 上游模型的限流：預設每個模型的 RPM / TPM (0 為不限制)，個別模型可用 AI_RATE_LIMITS 覆寫
+AI_DEFAULT_RPM = int(os.environ.get("AI_DEFAULT_RPM", 30))
+AI_DEFAULT_TPM = int(os.environ.get("AI_DEFAULT_TPM", 0))
+AI_LIMIT_TIMEOUT_SECONDS = float(os.environ.get("AI_LIMIT_TIMEOUT_SECONDS", 120))
+AI_MAX_RETRIES = int(os.environ.get("AI_MAX_RETRIES", 3))
+AI_RETRY_BASE_SECONDS = 1
+# 聊天機器人請求除訊息外，還包含檢索到的文件內容 (約 3 段)
+CHATBOT_CONTEXT_TOKENS = 1500
+RAG_PERSIST_DIRECTORY = "chroma_db"
+# 向量數據庫內容的版本，語意回答快取以此區分；未設定時依 chroma_db 的檔案大小與修改時間計算
+RAG_CORPUS_VERSION = os.environ.get("RAG_CORPUS_VERSION")
+
+
+class Transcription:
+    # 與 Groq verbose_json 回應相同的欄位 (text / segments / duration)，供分段合併後使用
+    def __init__(self, text: str, segments: list, duration: float):
+        self.text = text
+        self.segments = segments
+        self.duration = duration
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "segments": self.segments, "duration": self.duration}
+
+
+def stitch_transcriptions(chunks: list, transcriptions: list) -> Transcription:
+    # 將各段的 segments 平移到原始時間軸，並只保留中點落在該段負責範圍內的 segment，去除重疊區的重複文字
+    segments = []
+    for index, ((start_ms, _, own_start_ms, own_end_ms), transcription) in enumerate(zip(chunks, transcriptions)):
+        offset = start_ms / 1000
+        own_start = own_start_ms / 1000
+        own_end = own_end_ms / 1000 if index < len(chunks) - 1 else float("inf")
+        for segment in transcription.segments:
+            start = segment["start"] + offset
+            end = segment["end"] + offset
+            if own_start <= (start + end) / 2 < own_end:
+                segments.append({"id": len(segments), "start": start, "end": end, "text": segment["text"]})
+    text = "".join(segment["text"] for segment in segments)
+    return Transcription(text=text, segments=segments, duration=chunks[-1][3] / 1000)
+
+
+def estimate_tokens(text: str) -> int:
+    # 粗估 token 數：中日韓文字約每字 1 個 token，其餘字元約每 4 字 1 個 token
+    cjk = sum(1 for char in text if "\u2e80" <= char <= "\u9fff" or "\uf900" <= char <= "\ufaff" or "\uff00" <= char <= "\uffef")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def rag_corpus_version(directory: str = RAG_PERSIST_DIRECTORY) -> str:
+    if RAG_CORPUS_VERSION:
+        return RAG_CORPUS_VERSION
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(f"{os.path.relpath(os.path.join(root, name), directory)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def split_windows(pieces: list, window_tokens: int) -> list:
+    # 依序將文字片段 (例如逐字稿 segments) 合併成不超過 window_tokens 的視窗，過長的單一片段再依字數切開
+    windows = []
+    current = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if tokens > window_tokens:
+            step = max(1, len(piece) * window_tokens // tokens)
+            parts = [piece[i:i + step] for i in range(0, len(piece), step)]
+        else:
+            parts = [piece]
+        for part in parts:
+            part_tokens = estimate_tokens(part)
+            if current and current_tokens + part_tokens > window_tokens:
+                windows.append("".join(current))
+                current = []
+                current_tokens = 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        windows.append("".join(current))
+    return windows
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def _rate_limit_delay(error: Exception):
+    # Groq 回應 429 時回傳建議等待秒數 (retry-after，沒有時為 0)，其他錯誤回傳 None
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status != 429 and type(error).__name__ != "RateLimitError":
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class TokenBucketLimiter:
+    """
+    單一模型的請求數 (RPM) 與 token 數 (TPM) 限制，兩者皆為每分鐘補滿的 token bucket，0 表示不限制。
+    等待者依到達順序 (FIFO) 取得額度，超過 timeout 仍未輪到時丟出 RateLimitTimeout。
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, timeout: float = AI_LIMIT_TIMEOUT_SECONDS):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.timeout = timeout
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._blocked_until = 0
+        self._waiters = deque()
+        self._cond = threading.Condition()
+        self._stats = {"acquired": 0, "timeouts": 0, "rateLimited": 0, "retries": 0, "waitMs": 0.0, "maxWaitMs": 0.0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _wait_seconds(self, now: float, tokens: int) -> float:
+        # 距離額度足夠還需多久，0 表示現在即可取得
+        wait = max(0, self._blocked_until - now)
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+        if self.tpm and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+        return wait
+
+    def acquire(self, tokens: int = 0, timeout: float = None):
+        timeout = self.timeout if timeout is None else timeout
+        # 單次請求超過每分鐘上限時，最多等到 bucket 全滿
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        ticket = object()
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_seconds(now, tokens) if self._waiters[0] is ticket else None
+                    if wait == 0:
+                        self._requests -= 1 if self.rpm else 0
+                        self._tokens -= tokens
+                        waited_ms = (now - start) * 1000
+                        self._stats["acquired"] += 1
+                        self._stats["waitMs"] += waited_ms
+                        self._stats["maxWaitMs"] = max(self._stats["maxWaitMs"], waited_ms)
+                        return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise RateLimitTimeout(f"Timed out after {timeout}s waiting for rate limit")
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def settle(self, estimated: int, actual: int):
+        # 以實際用量修正預估值 (多扣的退回，少扣的補扣)
+        if not self.tpm:
+            return
+        with self._cond:
+            self._tokens = min(self.tpm, self._tokens + estimated - actual)
+            self._cond.notify_all()
+
+    def block(self, seconds: float):
+        # 收到 429 時，讓所有等待者一起暫停，避免同時重試
+        with self._cond:
+            self._stats["rateLimited"] += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def count_retry(self):
+        with self._cond:
+            self._stats["retries"] += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queued"] = len(self._waiters)
+        stats["avgWaitMs"] = round(stats.pop("waitMs") / stats["acquired"], 1) if stats["acquired"] else 0
+        stats["maxWaitMs"] = round(stats["maxWaitMs"], 1)
+        stats.update(rpm=self.rpm, tpm=self.tpm)
+        return stats
+
+
+class RateLimits:
+    """各模型共用的限流器，限制值來自 AI_RATE_LIMITS (JSON，例如 {"whisper-large-v3": {"rpm": 20}})"""
+
+    def __init__(self, limits: dict = None, default_rpm: int = AI_DEFAULT_RPM, default_tpm: int = AI_DEFAULT_TPM,
+                 max_retries: int = AI_MAX_RETRIES, timeout: float = AI_LIMIT_TIMEOUT_SECONDS):
+        self.limits = limits if limits is not None else json.loads(os.environ.get("AI_RATE_LIMITS", "{}"))
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str) -> TokenBucketLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                limit = self.limits.get(model, {})
+                self._limiters[model] = TokenBucketLimiter(limit.get("rpm", self.default_rpm),
+                                                           limit.get("tpm", self.default_tpm), self.timeout)
+            return self._limiters[model]
+
+    def call(self, model: str, fn, tokens: int = 0):
+        """
+        取得額度後呼叫 fn()，遇到 429 以 full-jitter 指數退避重試 (同時暫停該模型的其他請求)。
+        fn 的回傳值若帶有 usage_metadata (LangChain 訊息)，以實際 token 數修正預估。
+        """
+        limiter = self.get(model)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                delay = _rate_limit_delay(e)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                delay = max(delay, random.uniform(0, AI_RETRY_BASE_SECONDS * 2 ** attempt))
+                limiter.block(delay)
+                limiter.count_retry()
+                continue
+            usage = getattr(result, "usage_metadata", None)
+            if usage and usage.get("total_tokens"):
+                limiter.settle(tokens, usage["total_tokens"])
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {model: limiter.stats() for model, limiter in limiters.items()}
+
 
 class AI:
     # 步驟 1: 載入 PDF 文件並提取內容
@@ -15,41 +314,66 @@ class AI:
         if not os.path.exists(pdf_path):
             print("Current working directory:", os.getcwd())
             raise FileNotFoundError(f"File path {pdf_path} is not a valid file or url")
+        from langchain.document_loaders import PyPDFLoader
         loader = PyPDFLoader(pdf_path)
         documents = loader.load_and_split()  # 分割為段落
         return documents
 
     # 步驟 2: 將文檔存儲到 Chroma 向量數據庫
-    def create_chroma_vectorstore(self, documents=None):
+    def create_embeddings(self):
+        # 載入 sentence-transformers 模型需數秒，只在第一次使用或背景預熱時執行
+        from langchain.embeddings import HuggingFaceEmbeddings
         model_name = "sentence-transformers/all-MiniLM-L6-v2"
         model_kwargs = {'device': 'cpu'}
-        embeddings = HuggingFaceEmbeddings(model_name=model_name,
-                                        model_kwargs=model_kwargs)
-        # vectorstore = Chroma.from_documents(documents, embeddings, persist_directory="chroma_db")
+        # 重複的問題不必重新計算向量
+        return CachedEmbeddings(HuggingFaceEmbeddings(model_name=model_name,
+                                                      model_kwargs=model_kwargs))
+
+    def create_chroma_vectorstore(self, documents=None):
+        from langchain.vectorstores import Chroma
+        # vectorstore = Chroma.from_documents(documents, self.embeddings, persist_directory=RAG_PERSIST_DIRECTORY)
+        # 版本需在開啟 (persist 會更新檔案) 前計算
+        self.corpus_version = rag_corpus_version()
         # 從已儲存的 chroma_db 加載
-        vectorstore = Chroma(persist_directory="chroma_db", embedding_function=embeddings)
+        vectorstore = Chroma(persist_directory=RAG_PERSIST_DIRECTORY, embedding_function=self.embeddings)
         vectorstore.persist()  # 持久化存儲
         return vectorstore
 
     # 步驟 3: 創建 RAG 應用的檢索器
     def create_retrieval_qa(self, vectorstore):
+        from langchain.chains import RetrievalQA
         retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 3})  # 最相似的 3 條內容
         qa_chain = RetrievalQA.from_chain_type(llm=self.llm, retriever=retriever, return_source_documents=True)
         return qa_chain
     
-    def __init__(self, api_key: str, chat_model: str = "deepseek-r1-distill-llama-70b", audio_model: str = "whisper-large-v3", temperature: float = 0):
+    def __init__(self, api_key: str, chat_model: str = "deepseek-r1-distill-llama-70b", audio_model: str = "whisper-large-v3", temperature: float = 0,
+                 transcription_cache=None, summary_cache=None, chatbot_cache=None,
+                 summary_window_tokens: int = SUMMARY_WINDOW_TOKENS, summary_concurrency: int = SUMMARY_CONCURRENCY,
+                 backend: str = AI_BACKEND, limits: RateLimits = None):
         self.api_key = api_key
         self.chat_model = chat_model
         self.audio_model = audio_model
         self.temperature = temperature
-        self.llm = ChatGroq(
-            model=self.chat_model,
-            temperature=self.temperature,
-            max_retries=2,
-            api_key=self.api_key,
-        )
-        self.client = Groq(api_key=self.api_key)
-        
+        self.language = "zh"
+        self.transcription_cache = transcription_cache
+        self.summary_cache = summary_cache
+        self.chatbot_cache = chatbot_cache
+        self.corpus_version = None
+        self.summary_window_tokens = summary_window_tokens
+        self.summary_concurrency = summary_concurrency
+        # 轉錄與聊天模型後端 (AI_BACKEND)：groq、replay 或 fake，後兩者可離線壓測
+        self.backend = backend
+        self.transcriber, self.llm = create_backends(backend, self.api_key, self.chat_model, self.temperature)
+        # 所有上游請求共用的限流器
+        self.limits = limits or RateLimits()
+
+        # 聊天機器人的 embeddings / 向量數據庫 / RAG 應用延遲到第一次使用 (或 warmup) 時才建立
+        self._components = {}
+        self._component_load_ms = {}
+        self._component_lock = threading.RLock()
+        self._warmup_thread = None
+        self._warmup_error = None
+
         # 指定 PDF 路徑
         # pdf_path = "rag_data.pdf"  # 替換為你的 PDF 文件路徑
 
@@ -57,66 +381,266 @@ class AI:
         # print("Loading PDF and creating vectorstore...")
         # documents = self.load_pdf_to_documents(pdf_path)
         # vectorstore = self.create_chroma_vectorstore(documents)
-        vectorstore = self.create_chroma_vectorstore() 
+
+    def _component(self, name: str, factory):
+        component = self._components.get(name)
+        if component is None:
+            with self._component_lock:
+                component = self._components.get(name)
+                if component is None:
+                    start = time.perf_counter()
+                    component = factory()
+                    self._component_load_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+                    self._components[name] = component
+        return component
+
+    @property
+    def embeddings(self):
+        return self._component("embeddings", self.create_embeddings)
+
+    @property
+    def vectorstore(self):
+        return self._component("vectorstore", self.create_chroma_vectorstore)
+
+    @property
+    def qa_chain(self):
         # 創建檢索增強生成 (RAG) 的 QA 應用
-        print("Creating RetrievalQA...")
-        self.qa_chain = self.create_retrieval_qa(vectorstore)
-    
-    def get_summary(self, text: str) -> dict:
-        prompt = """
-        角色：
-        您是一位專業的文字處理專家，具備細心、耐心、強大的語言能力和豐富的文字處理經驗，並能與不同部門協調合作，確保內容質量與專業性。
+        return self._component("qaChain", lambda: self.create_retrieval_qa(self.vectorstore))
 
-        任務：
-        請協助總結會議內容，生成會議標籤、會議討論氣氛、會議標題與會議摘要，並以以下格式輸出：
-        {
-            "tags": [],
-            "atmosphere": [],
-            "title": "",
-            "content": ""
+    def warmup(self):
+        # 在背景執行緒建立聊天機器人元件，伺服器不必等待模型載入即可開始服務
+        def run():
+            try:
+                print("Warming up RetrievalQA...")
+                self.qa_chain
+            except Exception as e:
+                self._warmup_error = str(e)
+                print("Error warming up AI components.", e)
+
+        with self._component_lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=run, name="ai-warmup", daemon=True)
+                self._warmup_thread.start()
+
+    def readiness(self) -> dict:
+        components = {name: name in self._components for name in ("embeddings", "vectorstore", "qaChain")}
+        return {
+            "ready": all(components.values()),
+            "components": components,
+            "warming": bool(self._warmup_thread and self._warmup_thread.is_alive()),
+            "loadMs": dict(self._component_load_ms),
+            "error": self._warmup_error,
         }
 
-        規則：
-        1. 必須逐字閱讀逐字稿，確保沒有遺漏任何關鍵訊息。
-        2. 中文用字需淺顯易懂，避免使用晦澀語言。
-        3. 提取以下內容：
-        - 關鍵討論點
-        - 決策內容
-        - 行動項目
-        - 重要意見
-        4. 整理後需確保邏輯清晰、結構連貫。
-        5. **摘要需根據輸入內容長度生成相對應的字數：**
-        - 100 字的內容，生成 75 字的摘要。
-        - 200 字的內容，生成 150 字的摘要。
-        - 以此類推，摘要長度需符合內容比例，並涵蓋核心重點。
-        6. 摘要需完整且詳細，語言流暢、易於理解。
-        7. 僅返回符合 JSON 格式的內容，確保輸出結果無其他額外文字。
-        8. 不要出現```。
+    def get_summary(self, text: str, use_cache: bool = True, segments: list = None, on_token=None,
+                    stats: dict = None) -> dict:
+        # on_token(text) 會收到最終摘要呼叫的串流輸出 (命中快取時不會呼叫)
+        # stats 若有提供，會填入 cached 與 upstreamMs (呼叫模型的時間)
+        stats = stats if stats is not None else {}
+        stats["cached"] = False
+        cache_key = None
+        if self.summary_cache:
+            cache_key = self.summary_cache.make_key(text, SUMMARY_PROMPT_VERSION, SUMMARY_PROMPT, self.chat_model, self.temperature)
+            if use_cache:
+                cached = self.summary_cache.get(cache_key)
+                if cached:
+                    stats["cached"] = True
+                    return cached
+            else:
+                # 使用者要求重新生成：略過快取，但仍以新結果更新快取
+                self.summary_cache.count_bypass()
 
-        請直接回覆符合上述規範的 JSON 格式。
-        """
-        
+        start = time.perf_counter()
+        if estimate_tokens(text) <= self.summary_window_tokens:
+            summary = self.summarize_text(text, on_token)
+        else:
+            # 逐字稿超過視窗大小時，以 segment 為界切成多個視窗分別整理後再合併
+            pieces = [segment["text"] for segment in segments] if segments else [text]
+            summary = self.reduce_notes(self.map_windows(split_windows(pieces, self.summary_window_tokens)), on_token=on_token)
+        stats["upstreamMs"] = round((time.perf_counter() - start) * 1000, 1)
+
+        if cache_key:
+            self.summary_cache.set(cache_key, summary)
+        return summary
+
+    def summarize_text(self, text: str, on_token=None) -> dict:
         messages = [
             ("user", text),
-            ("user", prompt),
+            ("user", SUMMARY_PROMPT),
         ]
-        output = self.llm.invoke(messages)
-        # output = self.qa_chain({"query":messages})
-        print(output.content)
-        return json.loads(output.content)
+        if on_token:
+            content = self.stream_llm(messages, on_token)
+        else:
+            output = self.invoke_llm(messages)
+            # output = self.qa_chain({"query":messages})
+            content = output.content
+        print(content)
+        return json.loads(content)
+
+    def estimate_request_tokens(self, messages: list) -> int:
+        # 預估請求的 token 數 (輸入 + 約四分之一的輸出)，實際用量於回應後修正
+        input_tokens = sum(estimate_tokens(content) for _, content in messages)
+        return input_tokens + input_tokens // 4
+
+    def invoke_llm(self, messages: list):
+        return self.limits.call(self.chat_model, lambda: self.llm.invoke(messages),
+                                self.estimate_request_tokens(messages))
+
+    def stream_llm(self, messages: list, on_token) -> str:
+        # 串流模式：邊生成邊回傳 token，回傳完整內容；已輸出 token 後發生的錯誤不重試
+        def stream():
+            content = ""
+            try:
+                for chunk in self.llm.stream(messages):
+                    if chunk.content:
+                        content += chunk.content
+                        on_token(chunk.content)
+            except Exception as e:
+                if content:
+                    raise RuntimeError(f"Summary stream interrupted: {e}") from e
+                raise
+            return content
+
+        return self.limits.call(self.chat_model, stream, self.estimate_request_tokens(messages))
+
+    def map_windows(self, windows: list) -> list:
+        # 並行整理各視窗的重點，回傳順序與輸入相同
+        def summarize_window(window):
+            return self.invoke_llm([("user", window), ("user", SUMMARY_MAP_PROMPT)]).content.strip()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.summary_concurrency)) as executor:
+            return list(executor.map(summarize_window, windows))
+
+    def reduce_notes(self, notes: list, depth: int = 1, on_token=None) -> dict:
+        # 合併後仍超過視窗大小時再整理一層，直到可以一次生成最終摘要
+        combined = "\n\n".join(notes)
+        if estimate_tokens(combined) > self.summary_window_tokens and depth < SUMMARY_MAX_DEPTH and len(notes) > 1:
+            windows = split_windows([note + "\n\n" for note in notes], self.summary_window_tokens)
+            return self.reduce_notes(self.map_windows(windows), depth + 1, on_token)
+        return self.summarize_text(SUMMARY_REDUCE_PREFIX + combined, on_token)
 
     def transcribe_audio(self, file: BufferedReader) -> dict:
-        transcription = self.client.audio.transcriptions.create(
-            file=file,
-            model=self.audio_model,
-            response_format="verbose_json",  # Optional
-            language="zh",  # Optional
-            temperature=self.temperature,  # Optional
-        )
-        return transcription
+        return self.limits.call(self.audio_model, lambda: self.transcriber.transcribe(
+            file, model=self.audio_model, language=self.language, temperature=self.temperature))
     
-    def get_chatbot_message(self, message: str) -> dict:
-        # output = self.llm.invoke(message)
-        output = self.qa_chain.invoke(message)
-        # print(output)
-        return output['result']
+    def source_cache_key(self, content_sha256: str, audio_format: str = AUDIO_EXTRACT_FORMAT):
+        if not (self.transcription_cache and content_sha256):
+            return None
+        return self.transcription_cache.make_source_key(content_sha256, audio_format, self.audio_model,
+                                                        self.language, self.temperature)
+
+    def get_cached_transcription(self, content_sha256: str, audio_format: str = AUDIO_EXTRACT_FORMAT):
+        # 以上傳檔案的雜湊查詢轉錄快取，命中時不需抽音訊與轉錄；沒有快取時回傳 None
+        source_key = self.source_cache_key(content_sha256, audio_format)
+        cached = self.transcription_cache.get(source_key) if source_key else None
+        return Transcription(**cached) if cached else None
+
+    def transcribe_long_audio(self, audio_path: str, audio_format: str = AUDIO_EXTRACT_FORMAT,
+                              parallelism: int = TRANSCRIBE_PARALLELISM, stats: dict = None,
+                              content_sha256: str = None) -> Transcription:
+        # 長音檔依靜音切段後並行轉錄，再合併回原始時間軸 (audio_path 為 extract_audio 的輸出)
+        # stats 若有提供，會填入 cached、upstreamMs (各段轉錄請求時間總和) 與 audioMs (實際送出的音訊長度)
+        # content_sha256 為上傳檔案的雜湊，提供時另外以此記錄轉錄結果，供 get_cached_transcription 使用
+        stats = stats if stats is not None else {}
+        stats["cached"] = False
+        cache_key = None
+        source_key = self.source_cache_key(content_sha256, audio_format)
+        if self.transcription_cache:
+            # 相同音訊與轉錄參數直接重用先前的結果
+            cache_key = self.transcription_cache.make_key(audio_path, self.audio_model, self.language, self.temperature)
+            cached = self.transcription_cache.get(cache_key, os.path.getsize(audio_path))
+            if cached:
+                stats["cached"] = True
+                if source_key:
+                    self.transcription_cache.set(source_key, cached)
+                return Transcription(**cached)
+
+        _, _, extension = extract_format(audio_format)
+        duration_ms = original_duration_ms = probe_duration_ms(audio_path)
+        silences = detect_silences(audio_path)
+        keep = plan_trim(duration_ms, silences)
+        with NamedTemporaryFile(suffix=f".{extension}") as trimmed_file:
+            offsets = None
+            source_path = audio_path
+            if keep:
+                # 剪掉長時間的靜音再送出轉錄，之後將 segments 的時間還原到原始時間軸
+                offsets = TimeOffsetMap(keep)
+                source_path = trim_audio(audio_path, trimmed_file.name, keep, audio_format)
+                print(f"Trimmed silence: {duration_ms} ms -> {offsets.trimmed_duration_ms} ms")
+                duration_ms = probe_duration_ms(source_path)
+                silences = detect_silences(source_path)
+            chunks = plan_chunks(duration_ms, silences)
+
+            upstream_ms = []
+
+            def transcribe_chunk(index_chunk):
+                index, (start_ms, end_ms, _, _) = index_chunk
+                data = export_chunk(source_path, start_ms, end_ms, audio_format)
+                start = time.perf_counter()
+                transcription = self.transcribe_audio((f"chunk_{index}.{extension}", data))
+                upstream_ms.append((time.perf_counter() - start) * 1000)
+                return transcription
+
+            with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+                transcriptions = list(executor.map(transcribe_chunk, enumerate(chunks)))
+            stats["upstreamMs"] = round(sum(upstream_ms), 1)
+            stats["audioMs"] = duration_ms
+        transcription = stitch_transcriptions(chunks, transcriptions)
+        if offsets:
+            for segment in transcription.segments:
+                segment["start"] = offsets.to_original(segment["start"])
+                segment["end"] = offsets.to_original(segment["end"])
+            transcription.duration = original_duration_ms / 1000
+
+        if cache_key:
+            self.transcription_cache.set(cache_key, transcription.to_dict())
+        if source_key:
+            self.transcription_cache.set(source_key, transcription.to_dict())
+        return transcription
+
+    def get_chatbot_message(self, message: str, question: str = None, use_cache: bool = True,
+                            first_turn: bool = False) -> str:
+        # question 為使用者這次的提問 (不含對話歷史)，提供時以此檢索文件；
+        # first_turn 表示對話中沒有先前的提問，只有此時 (且不含個人內容) 才以語意回答快取查詢相近的問題
+        cache = self.chatbot_cache if question else None
+        if cache and not use_cache:
+            cache.count_bypass()
+            cache = None
+        elif cache and not cache.is_cacheable(question, first_turn):
+            cache.count_skip()
+            cache = None
+        if cache:
+            # 載入向量數據庫後才有語料版本
+            self.vectorstore
+            scope = f"{self.corpus_version}:{self.chat_model}:{self.temperature}"
+            answer, vector = cache.get(scope, question, lambda: self.embeddings.embed_query(question))
+            if answer is not None:
+                return answer
+
+        start = time.perf_counter()
+        if question:
+            # 以這次的提問檢索文件 (查詢向量可命中 embeddings 快取)，再連同完整對話交給模型回答
+            qa_chain = self.qa_chain
+            documents = qa_chain.retriever.invoke(question)
+            output = self.limits.call(
+                self.chat_model,
+                lambda: qa_chain.combine_documents_chain.invoke({"input_documents": documents, "question": message}),
+                estimate_tokens(message) + CHATBOT_CONTEXT_TOKENS)
+            result = output['output_text']
+        else:
+            # output = self.llm.invoke(message)
+            output = self.limits.call(self.chat_model, lambda: self.qa_chain.invoke(message),
+                                      estimate_tokens(message) + CHATBOT_CONTEXT_TOKENS)
+            # print(output)
+            result = output['result']
+        if cache:
+            cache.set(scope, question, vector, result, (time.perf_counter() - start) * 1000)
+        return result
+
+    def chatbot_cache_stats(self) -> dict:
+        embeddings = self._components.get("embeddings")
+        return {
+            "answer": self.chatbot_cache.stats() if self.chatbot_cache else None,
+            # embeddings 尚未載入時為 None
+            "queryEmbedding": embeddings.stats() if embeddings else None,
+        }
@@ -0,0 +1,212 @@
+from bisect import bisect_right
+import os
+import re
+import subprocess
+
+# 長音檔切段設定 (毫秒)
+TRANSCRIBE_CHUNK_MS = int(os.environ.get("TRANSCRIBE_CHUNK_SECONDS", 600)) * 1000
+TRANSCRIBE_CHUNK_OVERLAP_MS = int(float(os.environ.get("TRANSCRIBE_CHUNK_OVERLAP_SECONDS", 2)) * 1000)
+# 在目標切點前多長的範圍內尋找靜音
+SILENCE_SEARCH_MS = 30 * 1000
+# 最後一段短於 chunk 長度的此比例時併入前一段，避免為幾秒 (甚至只有重疊部分) 的音訊多送一次轉錄請求
+TRANSCRIBE_MIN_TAIL_RATIO = 0.25
+MIN_SILENCE_MS = 500
+SILENCE_NOISE_DB = int(os.environ.get("SILENCE_NOISE_DB", -35))
+# 轉錄前剪掉長於此長度的靜音 (0 表示不剪)，剪除處前後各保留一小段避免切掉語音邊緣
+TRIM_SILENCE_MIN_MS = int(float(os.environ.get("TRIM_SILENCE_MIN_SECONDS", 2)) * 1000)
+TRIM_SILENCE_PADDING_MS = 250
+# 可剪除的總長度低於此值時不值得重新編碼
+TRIM_MIN_SAVING_MS = 5 * 1000
+
+# 轉錄用的音訊格式：單聲道 16 kHz，opus (ogg) 或 flac
+AUDIO_EXTRACT_FORMAT = os.environ.get("AUDIO_EXTRACT_FORMAT", "opus")
+AUDIO_SAMPLE_RATE = 16000
+_EXTRACT_CODECS = {
+    "opus": (["-c:a", "libopus", "-b:a", "24k", "-application", "voip"], "ogg", "ogg"),
+    "flac": (["-c:a", "flac"], "flac", "flac"),
+}
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+def extract_format(audio_format: str = AUDIO_EXTRACT_FORMAT):
+    # 回傳 (ffmpeg 編碼參數, ffmpeg 容器格式, 副檔名)
+    if audio_format not in _EXTRACT_CODECS:
+        raise ValueError(f"Unsupported audio format: {audio_format}")
+    return _EXTRACT_CODECS[audio_format]
+
+
+def extract_audio(source: str, output_path: str, audio_format: str = AUDIO_EXTRACT_FORMAT):
+    """
+    以 ffmpeg 串流方式抽出音軌並轉為精簡的語音格式，記憶體用量與檔案長度無關。
+    source 可為本機路徑或 URL (例如 S3 presigned URL，ffmpeg 會自行以 range 請求讀取 mp4 的 moov)。
+    """
+    codec_args, container, _ = extract_format(audio_format)
+    command = [
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-i", source,
+        "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+        *codec_args,
+        # bitexact 讓相同輸入產生相同輸出 (固定 ogg serial 與 encoder 標籤)，轉錄快取才能以內容雜湊比對
+        "-fflags", "+bitexact", "-flags:a", "+bitexact",
+        "-f", container, output_path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    return output_path
+
+
+def probe_duration_ms(path: str) -> int:
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+    )
+    return int(float(result.stdout.decode().strip()) * 1000)
+
+
+def detect_silences(path: str, noise_db: int = SILENCE_NOISE_DB, min_silence_ms: int = MIN_SILENCE_MS) -> list:
+    # 使用 ffmpeg silencedetect 找出靜音區段 [(start_ms, end_ms), ...]，不需將音訊解碼到 Python 記憶體
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "info", "-i", path,
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence_ms / 1000}", "-f", "null", "-"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    silences = []
+    start = None
+    for line in result.stderr.decode(errors="ignore").splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0, int(float(match.group(1)) * 1000))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, int(float(match.group(1)) * 1000)))
+            start = None
+    return silences
+
+
+def export_chunk(path: str, start_ms: int, end_ms: int, audio_format: str = AUDIO_EXTRACT_FORMAT) -> bytes:
+    # 直接複製編碼資料切出片段，不重新編碼
+    _, container, _ = extract_format(audio_format)
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error",
+         "-ss", f"{start_ms / 1000:.3f}", "-to", f"{end_ms / 1000:.3f}", "-i", path,
+         "-c", "copy", "-f", container, "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    return result.stdout
+
+
+def plan_chunks(duration_ms: int, silences: list, chunk_ms: int = TRANSCRIBE_CHUNK_MS,
+                overlap_ms: int = TRANSCRIBE_CHUNK_OVERLAP_MS) -> list:
+    """
+    將音訊切成多段，切點盡量落在靜音處。
+    回傳 [(start_ms, end_ms, own_start_ms, own_end_ms), ...]：
+    start/end 為實際送出轉錄的範圍 (前後含重疊)，own_start/own_end 為該段負責的範圍，用於合併時去除重複。
+    """
+    if duration_ms <= chunk_ms:
+        return [(0, duration_ms, 0, duration_ms)]
+
+    cuts = []
+    start = 0
+    while start + chunk_ms < duration_ms:
+        target = start + chunk_ms
+        window_start = max(start + chunk_ms // 2, target - SILENCE_SEARCH_MS)
+        # 取最接近目標切點的靜音中點
+        midpoints = [(silence_start + silence_end) // 2 for silence_start, silence_end in silences]
+        candidates = [midpoint for midpoint in midpoints if window_start <= midpoint <= target]
+        cut = candidates[-1] if candidates else target
+        cuts.append(cut)
+        start = cut
+    if duration_ms - cuts[-1] < chunk_ms * TRANSCRIBE_MIN_TAIL_RATIO:
+        cuts.pop()
+
+    bounds = [0] + cuts + [duration_ms]
+    return [
+        (max(0, own_start - overlap_ms), min(duration_ms, own_end + overlap_ms), own_start, own_end)
+        for own_start, own_end in zip(bounds, bounds[1:])
+    ]
+
+
+def plan_trim(duration_ms: int, silences: list, min_silence_ms: int = TRIM_SILENCE_MIN_MS,
+              padding_ms: int = TRIM_SILENCE_PADDING_MS) -> list:
+    """
+    依靜音區段決定要保留的範圍 [(start_ms, end_ms), ...] (原始時間軸)。
+    只剪除長於 min_silence_ms 的靜音，可剪除的總長度不足 TRIM_MIN_SAVING_MS 時回傳 None。
+    """
+    if not min_silence_ms:
+        return None
+    keep = []
+    start = 0
+    for silence_start, silence_end in silences:
+        if silence_end - silence_start < min_silence_ms:
+            continue
+        cut_start = max(start, silence_start + padding_ms)
+        cut_end = min(duration_ms, silence_end - padding_ms)
+        if cut_end <= cut_start:
+            continue
+        if cut_start > start:
+            keep.append((start, cut_start))
+        start = cut_end
+    if start < duration_ms:
+        keep.append((start, duration_ms))
+    kept_ms = sum(end - start for start, end in keep)
+    if not keep or duration_ms - kept_ms < TRIM_MIN_SAVING_MS:
+        return None
+    return keep
+
+
+def trim_audio(path: str, output_path: str, keep: list, audio_format: str = AUDIO_EXTRACT_FORMAT):
+    # 只保留 keep 範圍內的音訊並重新編碼為相同格式，時間戳重新連續排列
+    codec_args, container, _ = extract_format(audio_format)
+    expression = "+".join(f"between(t,{start / 1000:.3f},{end / 1000:.3f})" for start, end in keep)
+    command = [
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-i", path,
+        "-af", f"aselect='{expression}',asetpts=N/SR/TB",
+        "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+        *codec_args,
+        "-fflags", "+bitexact", "-flags:a", "+bitexact",
+        "-f", container, output_path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    return output_path
+
+
+class TimeOffsetMap:
+    """剪除靜音後的時間 (秒) 與原始時間的對照，keep 為 plan_trim 的回傳值"""
+
+    def __init__(self, keep: list):
+        self.keep = keep
+        # 每個保留範圍在剪除後時間軸上的起點
+        self.trimmed_starts = []
+        position = 0
+        for start, end in keep:
+            self.trimmed_starts.append(position)
+            position += end - start
+        self.trimmed_duration_ms = position
+
+    def to_original(self, seconds: float) -> float:
+        trimmed_ms = seconds * 1000
+        index = max(0, bisect_right(self.trimmed_starts, trimmed_ms) - 1)
+        start, end = self.keep[index]
+        return min(end, start + trimmed_ms - self.trimmed_starts[index]) / 1000
+
+
+def decode_to_pcm(data: bytes, input_format: str = None) -> bytes:
+    # 將一段音訊 (任何 ffmpeg 支援的格式，或 input_format="s16le" 的 16 kHz 單聲道 PCM) 轉為 16 kHz 單聲道 s16le PCM
+    input_args = ["-f", "s16le", "-ar", str(AUDIO_SAMPLE_RATE), "-ac", "1"] if input_format == "s16le" else []
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", *input_args, "-i", "pipe:0",
+         "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+        input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='ignore').strip()}")
+    return result.stdout
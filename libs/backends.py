@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional
+from groq import Groq
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_groq import ChatGroq
+
+# 轉錄與聊天模型的後端：groq (預設)、replay (重播先前錄下的回應) 或 fake (不需錄音檔的固定輸出)
+AI_BACKEND = os.environ.get("AI_BACKEND", "groq")
+# 設定時，groq 後端會將每次回應錄到此目錄，供 replay 後端離線重播
+AI_RECORD_DIR = os.environ.get("AI_RECORD_DIR")
+AI_REPLAY_DIR = os.environ.get("AI_REPLAY_DIR", "recordings/replay")
+# 模擬延遲：每次請求的固定延遲，加上聊天模型每個輸出 token / 轉錄每秒音訊的時間
+AI_SIMULATED_LATENCY_MS = float(os.environ.get("AI_SIMULATED_LATENCY_MS", 0))
+AI_SIMULATED_MS_PER_TOKEN = float(os.environ.get("AI_SIMULATED_MS_PER_TOKEN", 0))
+AI_SIMULATED_MS_PER_AUDIO_SECOND = float(os.environ.get("AI_SIMULATED_MS_PER_AUDIO_SECOND", 0))
+# 24 kbps opus 約每秒 3000 bytes，fake 轉錄以此估算音訊長度
+_FAKE_BYTES_PER_SECOND = 3000
+_FAKE_SENTENCES = [
+    "我們先確認這週的進度",
+    "這個部分下週再討論",
+    "預算需要再跟財務確認",
+    "請大家在週五前回覆",
+    "測試環境還有兩個問題",
+    "客戶希望月底前看到展示",
+]
+
+
+class ReplayMissError(KeyError):
+    pass
+
+
+class ReplayStore:
+    """以請求內容雜湊為鍵，將回應存成 <directory>/<kind>/<key>.json"""
+
+    def __init__(self, directory: str = AI_REPLAY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else json.dumps(part, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def get(self, kind: str, key: str) -> dict:
+        try:
+            with open(self._path(kind, key), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise ReplayMissError(f"No recorded {kind} response for {key}")
+
+    def put(self, kind: str, key: str, value: dict):
+        path = self._path(kind, key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(value, file, ensure_ascii=False)
+
+
+def _simulate_latency(latency_ms: float, units: float = 0, ms_per_unit: float = 0):
+    delay = latency_ms + units * ms_per_unit
+    if delay > 0:
+        time.sleep(delay / 1000)
+
+
+def _file_bytes(file) -> bytes:
+    # 與 Groq SDK 相同，file 可為 (檔名, 內容) 或檔案物件
+    if isinstance(file, tuple):
+        file = file[1]
+    if isinstance(file, bytes):
+        return file
+    return file.read()
+
+
+def _messages_payload(messages) -> list:
+    payload = []
+    for message in messages:
+        if isinstance(message, tuple):
+            payload.append(list(message))
+        else:
+            payload.append([message.type, message.content])
+    return payload
+
+
+class GroqTranscriber:
+    def __init__(self, api_key: str, store: ReplayStore = None):
+        self.client = Groq(api_key=api_key)
+        self.store = store
+
+    def transcribe(self, file, model: str, language: str, temperature: float):
+        data = _file_bytes(file)
+        name = file[0] if isinstance(file, tuple) else getattr(file, "name", "audio")
+        transcription = self.client.audio.transcriptions.create(
+            file=(name, data),
+            model=model,
+            response_format="verbose_json",  # Optional
+            language=language,  # Optional
+            temperature=temperature,  # Optional
+        )
+        if self.store:
+            key = ReplayStore.make_key(data, [model, language, temperature])
+            self.store.put("transcriptions", key, {
+                "text": transcription.text,
+                "segments": transcription.segments,
+                "duration": getattr(transcription, "duration", None),
+            })
+        return transcription
+
+
+class ReplayTranscriber:
+    def __init__(self, store: ReplayStore, latency_ms: float = AI_SIMULATED_LATENCY_MS,
+                 ms_per_audio_second: float = AI_SIMULATED_MS_PER_AUDIO_SECOND):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.ms_per_audio_second = ms_per_audio_second
+
+    def transcribe(self, file, model: str, language: str, temperature: float):
+        key = ReplayStore.make_key(_file_bytes(file), [model, language, temperature])
+        recorded = self.store.get("transcriptions", key)
+        _simulate_latency(self.latency_ms, recorded.get("duration") or 0, self.ms_per_audio_second)
+        return SimpleNamespace(**recorded)
+
+
+class FakeTranscriber:
+    """依音訊內容產生固定的逐字稿：長度由檔案大小估算，文字由內容雜湊決定"""
+
+    def __init__(self, latency_ms: float = AI_SIMULATED_LATENCY_MS,
+                 ms_per_audio_second: float = AI_SIMULATED_MS_PER_AUDIO_SECOND):
+        self.latency_ms = latency_ms
+        self.ms_per_audio_second = ms_per_audio_second
+
+    def transcribe(self, file, model: str, language: str, temperature: float):
+        data = _file_bytes(file)
+        duration = max(1.0, len(data) / _FAKE_BYTES_PER_SECOND)
+        rng = random.Random(hashlib.sha256(data).hexdigest())
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + 5)
+            segments.append({"id": len(segments), "start": start, "end": end,
+                             "text": rng.choice(_FAKE_SENTENCES) + "。"})
+            start = end
+        _simulate_latency(self.latency_ms, duration, self.ms_per_audio_second)
+        return SimpleNamespace(text="".join(segment["text"] for segment in segments), segments=segments,
+                               duration=duration)
+
+
+class RecordingChatModel(SimpleChatModel):
+    # 包裝實際的聊天模型，並將每次回應錄下供 replay 使用
+    inner: Any
+    store: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _call(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        content = self.inner.invoke(messages, stop=stop).content
+        self.store.put("chat", ReplayStore.make_key(_messages_payload(messages)), {"content": content})
+        return content
+
+
+class ReplayChatModel(SimpleChatModel):
+    store: Any
+    latency_ms: float = AI_SIMULATED_LATENCY_MS
+    ms_per_token: float = AI_SIMULATED_MS_PER_TOKEN
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _call(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        content = self.store.get("chat", ReplayStore.make_key(_messages_payload(messages)))["content"]
+        # 輸出 token 數以字數粗估
+        _simulate_latency(self.latency_ms, len(content), self.ms_per_token)
+        return content
+
+
+class FakeChatModel(SimpleChatModel):
+    # 固定回傳符合摘要格式的 JSON (內容由輸入雜湊決定)，也可作為聊天機器人的回覆
+    latency_ms: float = AI_SIMULATED_LATENCY_MS
+    ms_per_token: float = AI_SIMULATED_MS_PER_TOKEN
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _call(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        payload = _messages_payload(messages)
+        rng = random.Random(ReplayStore.make_key(payload))
+        input_length = sum(len(content) for _, content in payload)
+        content = json.dumps({
+            "tags": rng.sample(["進度", "預算", "測試", "客戶", "排程"], 2),
+            "atmosphere": [rng.choice(["輕鬆", "專注", "熱烈"])],
+            "title": rng.choice(_FAKE_SENTENCES),
+            "content": "".join(rng.choice(_FAKE_SENTENCES) for _ in range(max(1, input_length // 200))),
+        }, ensure_ascii=False)
+        _simulate_latency(self.latency_ms, len(content), self.ms_per_token)
+        return content
+
+
+def create_backends(backend: str, api_key: str, chat_model: str, temperature: float,
+                    record_dir: str = AI_RECORD_DIR, replay_dir: str = AI_REPLAY_DIR):
+    # 回傳 (轉錄後端, LangChain 聊天模型)
+    if backend == "groq":
+        store = ReplayStore(record_dir) if record_dir else None
+        llm = ChatGroq(
+            model=chat_model,
+            temperature=temperature,
+            # 重試與退避由 AI 的限流器處理
+            max_retries=0,
+            api_key=api_key,
+        )
+        if store:
+            llm = RecordingChatModel(inner=llm, store=store)
+        return GroqTranscriber(api_key, store), llm
+    if backend == "replay":
+        store = ReplayStore(replay_dir)
+        return ReplayTranscriber(store), ReplayChatModel(store=store)
+    if backend == "fake":
+        return FakeTranscriber(), FakeChatModel()
+    raise ValueError(f"Unsupported AI backend: {backend}")
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from botocore.exceptions import ClientError
+import numpy as np
+
+from libs.s3 import S3
+
+RECORDINGS_PATH = os.environ.get("RECORDINGS_PATH", "recordings/")
+TRANSCRIPTION_CACHE_PREFIX = os.environ.get("TRANSCRIPTION_CACHE_PREFIX", f"{RECORDINGS_PATH}transcriptions/")
+TRANSCRIPTION_CACHE_SIZE = int(os.environ.get("TRANSCRIPTION_CACHE_SIZE", 64))
+SUMMARY_CACHE_SIZE = int(os.environ.get("SUMMARY_CACHE_SIZE", 256))
+SUMMARY_CACHE_TTL_SECONDS = int(os.environ.get("SUMMARY_CACHE_TTL_SECONDS", 24 * 3600))
+# 聊天機器人：查詢向量快取與語意回答快取 (相似度以 cosine 計算，達門檻即直接回傳先前的回答)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+# 回答快取由所有使用者共用，預設關閉；開啟時只快取不依賴對話歷史與個人資料的提問 (見 SemanticAnswerCache.is_cacheable)
+CHATBOT_CACHE_ENABLED = os.environ.get("CHATBOT_CACHE_ENABLED", "false").lower() in ("1", "true")
+CHATBOT_CACHE_SIZE = int(os.environ.get("CHATBOT_CACHE_SIZE", 256))
+CHATBOT_CACHE_TTL_SECONDS = int(os.environ.get("CHATBOT_CACHE_TTL_SECONDS", 24 * 3600))
+CHATBOT_SIMILARITY_THRESHOLD = float(os.environ.get("CHATBOT_SIMILARITY_THRESHOLD", 0.95))
+# email、網址與連續 3 位以上的數字 (電話、訂單編號等) 視為個人內容，這類提問不讀寫快取
+_PERSONAL_CONTENT = re.compile(r"\S+@\S+|https?://|www\.|\d{3,}|[０-９]{3,}")
+
+
+class LRUCache:
+    """執行緒安全的 LRU 快取，可選擇設定存活時間 (秒)"""
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def items(self) -> list:
+        # 未過期項目的快照 (不影響 LRU 順序)
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (value, expires_at) in self._items.items()
+                    if expires_at is None or expires_at >= now]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    以正規化音訊內容的雜湊值加上轉錄參數為鍵的轉錄快取。
+    本機 LRU 為第一層，S3 (與錄影檔同一 bucket) 為第二層，跨程序與重新部署後仍可重用。
+    """
+
+    def __init__(self, s3: S3 = None, prefix: str = TRANSCRIPTION_CACHE_PREFIX,
+                 max_entries: int = TRANSCRIPTION_CACHE_SIZE):
+        self.s3 = s3 or S3()
+        self.prefix = prefix
+        self.local = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self._stats = {"localHits": 0, "remoteHits": 0, "misses": 0, "bytesSaved": 0}
+
+    @staticmethod
+    def make_key(audio_path: str, audio_model: str, language: str, temperature: float) -> str:
+        params = json.dumps({"model": audio_model, "language": language, "temperature": temperature}, sort_keys=True)
+        return hashlib.sha256(f"{file_sha256(audio_path)}:{params}".encode()).hexdigest()
+
+    @staticmethod
+    def make_source_key(content_sha256: str, audio_format: str, audio_model: str, language: str,
+                        temperature: float) -> str:
+        # 以上傳檔案本身的雜湊為鍵 (指向同一份轉錄結果)，相同檔案重新上傳時連抽音訊都可省略
+        params = json.dumps({"format": audio_format, "model": audio_model, "language": language,
+                             "temperature": temperature}, sort_keys=True)
+        return hashlib.sha256(f"source:{content_sha256}:{params}".encode()).hexdigest()
+
+    def _count(self, name: str, audio_bytes: int = 0):
+        with self._lock:
+            self._stats[name] += 1
+            if name != "misses":
+                self._stats["bytesSaved"] += audio_bytes
+
+    def get(self, key: str, audio_bytes: int = 0):
+        # 回傳 dict (text / segments / duration)，沒有快取時回傳 None
+        value = self.local.get(key)
+        if value is not None:
+            self._count("localHits", audio_bytes)
+            return value
+        try:
+            value = self.s3.get_object_as_json(f"{self.prefix}{key}.json")
+        except ClientError:
+            self._count("misses")
+            return None
+        self.local.set(key, value)
+        self._count("remoteHits", audio_bytes)
+        return value
+
+    def set(self, key: str, value: dict):
+        self.local.set(key, value)
+        try:
+            body = BytesIO(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            self.s3.upload_object(f"{self.prefix}{key}.json", body)
+        except Exception as e:
+            print("Error writing transcription cache.", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["localHits"] + stats["remoteHits"] + stats["misses"]
+        stats["hitRate"] = round((stats["localHits"] + stats["remoteHits"]) / lookups, 4) if lookups else 0
+        stats["localEntries"] = len(self.local)
+        return stats
+
+
+class SummaryCache:
+    """以逐字稿、prompt 版本與雜湊、模型參數為鍵的摘要快取，依存活時間與數量淘汰"""
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_SIZE, ttl_seconds: int = SUMMARY_CACHE_TTL_SECONDS):
+        self.local = LRUCache(max_entries, ttl_seconds)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def make_key(text: str, prompt_version: str, prompt: str, chat_model: str, temperature: float) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        params = json.dumps({"model": chat_model, "temperature": temperature}, sort_keys=True)
+        return hashlib.sha256(f"{prompt_version}:{prompt_hash}:{params}:{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        value = self.local.get(key)
+        with self._lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: dict):
+        self.local.set(key, value)
+
+    def count_bypass(self):
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        stats["entries"] = len(self.local)
+        return stats
+
+
+class CachedEmbeddings:
+    """包裝 LangChain embeddings，以 LRU 快取查詢向量；文件向量 (建立向量數據庫時) 不快取"""
+
+    def __init__(self, embeddings, max_entries: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.local = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "embedMs": 0, "embedMsSaved": 0}
+
+    def embed_query(self, text: str) -> list:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cached = self.local.get(key)
+        if cached is not None:
+            vector, embed_ms = cached
+            with self._lock:
+                self._stats["hits"] += 1
+                self._stats["embedMsSaved"] += embed_ms
+            return vector
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        embed_ms = (time.perf_counter() - start) * 1000
+        self.local.set(key, (vector, embed_ms))
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["embedMs"] += embed_ms
+        return vector
+
+    def embed_documents(self, texts: list) -> list:
+        return self.embeddings.embed_documents(texts)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        stats["embedMs"] = round(stats["embedMs"], 1)
+        stats["embedMsSaved"] = round(stats["embedMsSaved"], 1)
+        stats["entries"] = len(self.local)
+        return stats
+
+
+class SemanticAnswerCache:
+    """
+    聊天機器人的語意回答快取：問題向量與已快取問題的 cosine 相似度達門檻時直接回傳先前的回答，不呼叫模型。
+    scope 包含 RAG 語料版本與模型參數，語料或模型變更後舊的回答不會被取用。
+    快取由所有使用者共用，因此只用於對話的第一個提問且不含個人內容 (is_cacheable)，回答不會依賴其他使用者的對話。
+    """
+
+    def __init__(self, max_entries: int = CHATBOT_CACHE_SIZE, ttl_seconds: int = CHATBOT_CACHE_TTL_SECONDS,
+                 threshold: float = CHATBOT_SIMILARITY_THRESHOLD):
+        self.local = LRUCache(max_entries, ttl_seconds)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stats = {"exactHits": 0, "semanticHits": 0, "misses": 0, "bypassed": 0, "skipped": 0,
+                       "latencyMsSaved": 0}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        return " ".join(question.split()).lower()
+
+    @staticmethod
+    def is_cacheable(question: str, first_turn: bool) -> bool:
+        # 之後的提問可能依賴先前的對話 (例如「我剛剛問了什麼」)，回答也可能重複使用者提供的個人資料
+        return first_turn and not _PERSONAL_CONTENT.search(question)
+
+    def count_skip(self):
+        with self._lock:
+            self._stats["skipped"] += 1
+
+    def _hit(self, name: str, entry: dict) -> str:
+        with self._lock:
+            self._stats[name] += 1
+            self._stats["latencyMsSaved"] += entry["latencyMs"]
+        return entry["answer"]
+
+    def get(self, scope: str, question: str, embed):
+        """
+        embed() 回傳問題向量，只在沒有完全相同的問題時才呼叫。
+        回傳 (回答, 問題向量)，沒有快取時回答為 None。
+        """
+        key = (scope, self.normalize_question(question))
+        entry = self.local.get(key)
+        if entry is not None:
+            return self._hit("exactHits", entry), entry["vector"]
+
+        vector = np.asarray(embed(), dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1)
+        candidates = [(candidate_key, candidate) for candidate_key, candidate in self.local.items()
+                      if candidate_key[0] == scope]
+        if candidates:
+            similarities = np.stack([candidate["vector"] for _, candidate in candidates]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                best_key, best_entry = candidates[best]
+                # 更新 LRU 順序
+                self.local.get(best_key)
+                return self._hit("semanticHits", best_entry), vector
+        with self._lock:
+            self._stats["misses"] += 1
+        return None, vector
+
+    def set(self, scope: str, question: str, vector, answer: str, latency_ms: float):
+        self.local.set((scope, self.normalize_question(question)),
+                       {"vector": vector, "answer": answer, "latencyMs": latency_ms})
+
+    def count_bypass(self):
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["exactHits"] + stats["semanticHits"]
+        lookups = hits + stats["misses"]
+        stats["hitRate"] = round(hits / lookups, 4) if lookups else 0
+        stats["latencyMsSaved"] = round(stats["latencyMsSaved"], 1)
+        stats["threshold"] = self.threshold
+        stats["entries"] = len(self.local)
+        return stats
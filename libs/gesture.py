@@ -0,0 +1,465 @@
+import base64
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+GESTURE_MODEL_PATH = os.environ.get("GESTURE_MODEL_PATH", "gesture_recognizer.task")
+GESTURE_POOL_SIZE = int(os.environ.get("GESTURE_POOL_SIZE", 4))
+# 每位使用者每秒最多推論的影格數 (0 表示不限制)
+GESTURE_MAX_FPS = float(os.environ.get("GESTURE_MAX_FPS", 10))
+# 同一手勢持續多少幀後再次通知 (手勢改變時會立即通知)
+GESTURE_HOLD_FRAMES = int(os.environ.get("GESTURE_HOLD_FRAMES", 15))
+# 手勢推論工作程序數量 (0 表示在目前程序內推論) 與每個程序的共享記憶體大小
+GESTURE_WORKERS = int(os.environ.get("GESTURE_WORKERS", 2))
+GESTURE_SHM_SLOT_BYTES = int(os.environ.get("GESTURE_SHM_SLOT_BYTES", 4 * 1024 * 1024))
+# 解碼後影像的最長邊上限，手部偵測模型的輸入遠小於原始視訊解析度
+GESTURE_FRAME_MAX_SIDE = int(os.environ.get("GESTURE_FRAME_MAX_SIDE", 480))
+
+# JPEG SOF (Start Of Frame) 標記，記錄影像寬高
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(img_data: bytes):
+    # 只讀取 JPEG 標頭取得寬高，不解碼影像
+    if img_data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 < len(img_data):
+        if img_data[i] != 0xFF:
+            return None
+        marker = img_data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(img_data[i + 5:i + 7], "big")
+            width = int.from_bytes(img_data[i + 7:i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(img_data[i + 2:i + 4], "big")
+    return None
+
+
+def base64_to_bytes(base64_string: str) -> bytes:
+    # 移除 Base64 字首 (data:image/jpeg;base64, ...)
+    base64_data = base64_string.split(",")[1] if "," in base64_string else base64_string
+    return base64.b64decode(base64_data)
+
+
+def decode_frame(payload, max_side: int = GESTURE_FRAME_MAX_SIDE):
+    # 支援 Socket.IO 二進位附件 (JPEG/WebP bytes) 與舊版 Base64 data URL 字串
+    # cv2 只在實際解碼的程序 (推論工作程序，或 GESTURE_WORKERS=0 時的伺服器) 中匯入，不拖慢伺服器啟動
+    import cv2
+    img_data = base64_to_bytes(payload) if isinstance(payload, str) else bytes(payload)
+    np_arr = np.frombuffer(img_data, np.uint8)
+
+    # JPEG 可直接以 1/2、1/4、1/8 解析度解碼，省下完整解碼的成本
+    flag = cv2.IMREAD_COLOR
+    size = _jpeg_size(img_data)
+    if size and max_side:
+        for factor, reduced_flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                     (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if max(size) // factor >= max_side:
+                flag = reduced_flag
+                break
+
+    img = cv2.imdecode(np_arr, flag)
+    if img is None:
+        return None
+
+    # 其他格式 (WebP 等) 或縮減後仍過大時，再縮放到上限
+    height, width = img.shape[:2]
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        img = cv2.resize(img, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    return img
+
+
+# MediaPipe 手部 21 點 landmark 索引：(指尖, 第二關節 PIP)
+_FINGER_JOINTS = {
+    "index": (8, 6),
+    "middle": (12, 10),
+    "ring": (16, 14),
+    "pinky": (20, 18),
+}
+_HAND_LANDMARK_COUNT = 21
+
+
+def _to_points(hand) -> list:
+    # landmark 可為 {"x","y","z"} 或 [x, y, z]，座標為影像正規化座標
+    if len(hand) != _HAND_LANDMARK_COUNT:
+        raise ValueError(f"每隻手需要 {_HAND_LANDMARK_COUNT} 個 landmarks")
+    return [(float(p["x"]), float(p["y"])) if isinstance(p, dict) else (float(p[0]), float(p[1])) for p in hand]
+
+
+def _distance(a, b) -> float:
+    return ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+
+
+def classify_landmarks(hand) -> str:
+    # 由瀏覽器端 MediaPipe 產生的 landmarks 直接判斷手勢，類別名稱與 gesture_recognizer.task 相同
+    points = _to_points(hand)
+    wrist = points[0]
+    extended = {name: _distance(points[tip], wrist) > _distance(points[pip], wrist)
+                for name, (tip, pip) in _FINGER_JOINTS.items()}
+    # 拇指以指尖與 IP 關節到小指根部的距離判斷是否張開
+    thumb = _distance(points[4], points[17]) > _distance(points[3], points[17]) * 1.1
+
+    fingers = (extended["index"], extended["middle"], extended["ring"], extended["pinky"])
+    if fingers == (False, False, False, False):
+        if not thumb:
+            return "Closed_Fist"
+        return "Thumb_Up" if points[4][1] < points[2][1] else "Thumb_Down"
+    if all(fingers):
+        return "Open_Palm" if thumb else "None"
+    if fingers == (True, False, False, False) and points[8][1] < wrist[1]:
+        return "Pointing_Up"
+    if fingers == (True, True, False, False):
+        return "Victory"
+    if fingers == (True, False, False, True) and thumb:
+        return "ILoveYou"
+    return "None"
+
+
+def _is_point(value) -> bool:
+    return isinstance(value, dict) or (isinstance(value, (list, tuple)) and bool(value) and
+                                       isinstance(value[0], (int, float)))
+
+
+def classify_hands(landmarks) -> list:
+    # 接受單隻手 (21 點) 或多隻手 ([[21 點], ...])
+    if landmarks and _is_point(landmarks[0]):
+        landmarks = [landmarks]
+    return [classify_landmarks(hand) for hand in landmarks]
+
+
+class GestureRecognizerPool:
+    """
+    常駐的 GestureRecognizer 池，每個同時執行的工作者借用一個 recognizer，模型只載入一次。
+    recognizer 會處理不同使用者的影格，因此使用 IMAGE 模式：VIDEO 模式跨幀追蹤的手部位置會套用到其他使用者的影格。
+    """
+
+    def __init__(self, model_path: str = GESTURE_MODEL_PATH, size: int = GESTURE_POOL_SIZE,
+                 num_hands: int = 2, min_detection_confidence: float = 0.5):
+        self.model_path = model_path
+        self.size = max(1, size)
+        self.num_hands = num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self._idle = queue.LifoQueue()
+        self._created = []
+        self._lock = threading.Lock()
+
+    def _create_recognizer(self):
+        # mediapipe 載入較慢，只在實際建立 recognizer 的程序 (推論工作程序) 中匯入
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+        base_options = python.BaseOptions(model_asset_path=self.model_path)
+        options = vision.GestureRecognizerOptions(
+            base_options=base_options,
+            running_mode=vision.RunningMode.IMAGE,
+            num_hands=self.num_hands,
+            min_hand_detection_confidence=self.min_detection_confidence,
+        )
+        return vision.GestureRecognizer.create_from_options(options)
+
+    @contextmanager
+    def acquire(self):
+        # 先取閒置的 recognizer，池未滿時才建立新的，滿了就等待其他工作者歸還
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            pooled = None
+            with self._lock:
+                if len(self._created) < self.size:
+                    pooled = self._create_recognizer()
+                    self._created.append(pooled)
+            if pooled is None:
+                pooled = self._idle.get()
+        try:
+            yield pooled
+        finally:
+            self._idle.put(pooled)
+
+    def warmup(self, count: int = 1):
+        # 預先載入模型，避免第一幀承擔載入延遲
+        with self._lock:
+            while len(self._created) < min(count, self.size):
+                pooled = self._create_recognizer()
+                self._created.append(pooled)
+                self._idle.put(pooled)
+
+    def recognize(self, img_rgb) -> list:
+        # 僅推論，不繪製 landmarks；GestureRecognizer 本身已包含手部偵測
+        import mediapipe as mp
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(img_rgb))
+        with self.acquire() as recognizer:
+            result = recognizer.recognize(mp_image)
+        return [gesture[0].category_name for gesture in result.gestures if gesture]
+
+    def close(self):
+        with self._lock:
+            for recognizer in self._created:
+                recognizer.close()
+            self._created = []
+            self._idle = queue.LifoQueue()
+
+
+class _InferenceWorker:
+    # 一個獨立的推論程序，影格經由共享記憶體傳遞，控制訊息只有位元組長度與辨識結果
+    def __init__(self, slot_bytes: int, model_path: str):
+        self.model_path = model_path
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes)
+        self.process = None
+
+    def spawn(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "libs.gesture", self.shm.name, self.model_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+
+    def wait_ready(self):
+        if self.process.stdout.readline().strip() != "ready":
+            raise RuntimeError("手勢推論程序啟動失敗")
+
+    def restart(self):
+        old = self.process
+        for stream in (old.stdin, old.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        old.kill()
+        old.wait()
+        self.spawn()
+        self.wait_ready()
+
+    def infer(self, img_data) -> list:
+        nbytes = len(img_data)
+        if nbytes > self.shm.size:
+            raise ValueError(f"影格大小 {nbytes} bytes 超過共享記憶體上限 {self.shm.size} bytes")
+        if self.process.poll() is not None:
+            # 程序在兩幀之間結束
+            self.restart()
+        self.shm.buf[:nbytes] = img_data
+        try:
+            self.process.stdin.write(f"{nbytes}\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except OSError:
+            # 寫入時程序已結束 (BrokenPipeError)
+            line = ""
+        if not line:
+            # 程序意外結束時重新啟動，這一幀視為失敗
+            self.restart()
+            raise RuntimeError("手勢推論程序已結束，已重新啟動")
+        result = json.loads(line)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["gestures"]
+
+    def close(self):
+        if self.process:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class GestureInferenceEngine:
+    """多程序手勢推論服務：每個程序持有已預熱的 recognizer，與 Socket.IO/Flask 工作者分離"""
+
+    def __init__(self, workers: int = GESTURE_WORKERS, slot_bytes: int = GESTURE_SHM_SLOT_BYTES,
+                 model_path: str = GESTURE_MODEL_PATH):
+        self.workers = max(0, workers)
+        self.slot_bytes = slot_bytes
+        self.model_path = model_path
+        self._idle = queue.Queue()
+        self._workers = []
+        self._local_pool = None
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            if self.workers == 0:
+                self._local_pool = GestureRecognizerPool(model_path=self.model_path)
+                self._local_pool.warmup()
+            else:
+                self._workers = [_InferenceWorker(self.slot_bytes, self.model_path) for _ in range(self.workers)]
+                # 先同時啟動所有程序，再等待各自載入模型完成
+                for worker in self._workers:
+                    worker.spawn()
+                for worker in self._workers:
+                    worker.wait_ready()
+                    self._idle.put(worker)
+            self._started = True
+
+    def recognize(self, payload) -> list:
+        # payload 為壓縮後的影格 (bytes 或 Base64 字串)，解碼與推論都在工作程序內完成
+        self.start()
+        img_data = base64_to_bytes(payload) if isinstance(payload, str) else payload
+        if self._local_pool:
+            import cv2
+            img = decode_frame(img_data)
+            if img is None:
+                raise ValueError("影像解碼失敗")
+            return self._local_pool.recognize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+
+        worker = self._idle.get()
+        try:
+            return worker.infer(img_data)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+            self._idle = queue.Queue()
+            if self._local_pool:
+                self._local_pool.close()
+                self._local_pool = None
+            self._started = False
+
+
+class GestureDebouncer:
+    """只在使用者的手勢改變，或同一手勢持續 hold_frames 幀時才回傳需要通知的手勢"""
+
+    def __init__(self, hold_frames: int = GESTURE_HOLD_FRAMES):
+        self.hold_frames = max(1, hold_frames)
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def update(self, username, gestures: list) -> list:
+        key = tuple(gestures)
+        with self._lock:
+            if not key:
+                # 沒有偵測到手，下次出現手勢時重新通知
+                self._states.pop(username, None)
+                return []
+            last_key, count = self._states.get(username, ((), 0))
+            count = count + 1 if key == last_key else 1
+            self._states[username] = (key, count)
+        if count == 1 or count % self.hold_frames == 0:
+            return list(key)
+        return []
+
+    def forget(self, username):
+        with self._lock:
+            self._states.pop(username, None)
+
+
+class GestureFrameMailbox:
+    """每位使用者一格的影格信箱：新影格覆蓋尚未處理的舊影格，並限制每位使用者的推論頻率"""
+
+    def __init__(self, handler, max_fps: float = GESTURE_MAX_FPS, spawn=None, sleep=time.sleep):
+        # handler(username, frame) 在背景工作者中執行；spawn/sleep 可替換為 socketio 的版本
+        self.handler = handler
+        self.min_interval = 1 / max_fps if max_fps > 0 else 0
+        self.spawn = spawn or (lambda fn, *args: threading.Thread(target=fn, args=args, daemon=True).start())
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._active = set()
+        self._last_run = {}
+        self._stats = {}
+
+    def _user_stats(self, username):
+        return self._stats.setdefault(username, {"received": 0, "dropped": 0, "processed": 0, "errors": 0})
+
+    def submit(self, username, frame):
+        with self._lock:
+            stats = self._user_stats(username)
+            stats["received"] += 1
+            if username in self._slots:
+                stats["dropped"] += 1
+            self._slots[username] = frame
+            if username in self._active:
+                return
+            self._active.add(username)
+        self.spawn(self._drain, username)
+
+    def _drain(self, username):
+        # 每位使用者最多一個工作者，處理完信箱清空後結束
+        while True:
+            wait = self._last_run.get(username, 0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                self.sleep(wait)
+            with self._lock:
+                frame = self._slots.pop(username, None)
+                if frame is None:
+                    self._active.discard(username)
+                    return
+            self._last_run[username] = time.monotonic()
+            try:
+                self.handler(username, frame)
+                counter = "processed"
+            except Exception as e:
+                print("手勢影格處理錯誤:", e)
+                counter = "errors"
+            with self._lock:
+                self._user_stats(username)[counter] += 1
+
+    def forget(self, username):
+        # 使用者離開或斷線時移除統計與節流紀錄 (尚未處理的影格一併丟棄)
+        with self._lock:
+            self._slots.pop(username, None)
+            self._stats.pop(username, None)
+            self._last_run.pop(username, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = {username: dict(stats) for username, stats in self._stats.items()}
+            pending = len(self._slots)
+        totals = {"received": 0, "dropped": 0, "processed": 0, "errors": 0}
+        for stats in users.values():
+            for name in totals:
+                totals[name] += stats[name]
+        return {"maxFps": round(1 / self.min_interval, 2) if self.min_interval else None,
+                "pending": pending, "totals": totals, "users": users}
+
+
+def _run_worker(shm_name: str, model_path: str):
+    # 推論程序進入點：由 GestureInferenceEngine 以 `python -m libs.gesture` 啟動
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # 共享記憶體由主程序負責釋放，避免子程序結束時被 resource_tracker 移除
+    resource_tracker.unregister(shm._name, "shared_memory")
+
+    # stdout 保留給控制訊息，其餘輸出導向 stderr
+    out = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+
+    import cv2
+    pool = GestureRecognizerPool(model_path=model_path, size=1)
+    pool.warmup()
+    out.write("ready\n")
+
+    for line in sys.stdin:
+        try:
+            img = decode_frame(shm.buf[:int(line)])
+            if img is None:
+                raise ValueError("影像解碼失敗")
+            gestures = pool.recognize(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            out.write(json.dumps({"gestures": gestures}) + "\n")
+        except Exception as e:
+            out.write(json.dumps({"error": str(e)}) + "\n")
+
+    pool.close()
+    shm.close()
+
+
+if __name__ == "__main__":
+    _run_worker(sys.argv[1], sys.argv[2])
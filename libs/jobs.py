@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+JOB_BACKEND = os.environ.get("JOB_BACKEND", "local")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 20))
+# 完成的工作保留多久供查詢 (秒)
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", 3600))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str, job_id: str = None, on_update=None):
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.status = "queued"
+        self.stage = "queued"
+        self.percent = 0
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.updated_at = self.created_at
+        self.finished_at = None
+        self._on_update = on_update
+        self._subscribers = []
+        self._done = threading.Event()
+
+    def subscribe(self, subscriber):
+        # subscriber(event, data) 接收此工作的事件：progress / token / done / failed
+        self._subscribers.append(subscriber)
+
+    def publish(self, event: str, data: dict):
+        for subscriber in self._subscribers:
+            try:
+                subscriber(event, data)
+            except Exception as e:
+                print("Error publishing job event.", e)
+
+    def _touch(self, event: str = "progress"):
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+        if self._on_update:
+            self._on_update(self)
+        self.publish(event, self.to_dict())
+
+    def update(self, stage: str, percent: int):
+        self.status = "running"
+        self.stage = stage
+        self.percent = percent
+        self._touch()
+
+    def finish(self, result):
+        self.status = "done"
+        self.stage = "done"
+        self.percent = 100
+        self.result = result
+        self.finished_at = time.monotonic()
+        self._touch("done")
+        self._done.set()
+
+    def fail(self, error: str):
+        self.status = "failed"
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._touch("failed")
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "percent": self.percent,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+
+class LocalJobQueue:
+    """程序內的工作佇列：固定數量的工作執行緒依序執行，佇列滿時拒絕新工作"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queue: int = JOB_QUEUE_SIZE,
+                 retention_seconds: int = JOB_RETENTION_SECONDS):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True).start()
+
+    def add_listener(self, listener):
+        # listener(job) 在工作狀態改變時呼叫，例如透過 Socket.IO 推送進度
+        self._listeners.append(listener)
+
+    def _notify(self, job: Job):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print("Error notifying job listener.", e)
+
+    def submit(self, fn, *args, kind: str = "summarize", job_id: str = None, subscriber=None) -> Job:
+        # fn(job, *args) 的回傳值即為工作結果；subscriber 在排入佇列前訂閱，不會漏掉任何事件
+        self._evict_finished()
+        job = Job(kind, job_id=job_id, on_update=self._notify)
+        if subscriber:
+            job.subscribe(subscriber)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait((job, fn, args))
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise QueueFullError(f"Job queue is full ({self.max_queue} jobs waiting)")
+        self._notify(job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict_finished(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at and now - job.finished_at > self.retention_seconds]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job, fn, args = self._queue.get()
+            try:
+                job.update("started", 0)
+                job.finish(fn(job, *args))
+            except Exception as e:
+                print(f"Job {job.id} failed.", e)
+                job.fail(str(e))
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {"backend": "local", "workers": self.workers, "maxQueue": self.max_queue,
+                "queued": self._queue.qsize(), "running": running}
+
+
+def create_job_queue(backend: str = JOB_BACKEND, **kwargs):
+    if backend == "local":
+        return LocalJobQueue(**kwargs)
+    raise ValueError(f"Unsupported job backend: {backend}")
@@ -0,0 +1,192 @@
+import math
+import os
+import queue
+import threading
+import time
+import wave
+from io import BytesIO
+
+from libs.ai import AI, Transcription
+from libs.audio import AUDIO_SAMPLE_RATE, decode_to_pcm
+
+# 即時轉錄：客戶端每隔數秒送出一段可獨立解碼的音訊 (例如每段重新啟動的 MediaRecorder 或 16 kHz PCM)
+LIVE_SESSION_TTL_SECONDS = int(os.environ.get("LIVE_SESSION_TTL_SECONDS", 4 * 3600))
+# 會議結束時等待尚未轉錄完的音訊段
+LIVE_FINISH_TIMEOUT_SECONDS = 60
+_BYTES_PER_SECOND = AUDIO_SAMPLE_RATE * 2
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    output = BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return output.getvalue()
+
+
+class LiveSession:
+    def __init__(self, room_name: str, source: str = None):
+        self.room_name = room_name
+        # 每個會議室只接受一個音訊來源 (例如主持人的 Socket.IO 連線)，多個來源無法放在同一條時間軸上
+        self.source = source
+        self.segments = []
+        # 第一段音訊開始的時間 (epoch 秒)，時間軸以此為 0
+        self.started_at = None
+        # 已轉錄音訊的結尾 (秒)，下一段音訊不會早於此時間
+        self.offset = 0.0
+        self.pending = queue.Queue()
+        self.updated_at = time.monotonic()
+        self.chunks = 0
+        self.failed_chunks = 0
+
+    def transcription(self, started_at: float = None) -> Transcription:
+        """
+        started_at 為錄影檔開始的時間 (epoch 秒)，提供時將 segments 平移到錄影檔的時間軸，
+        錄影開始前的內容捨去。
+        """
+        shift = self.started_at - started_at if started_at is not None else 0.0
+        segments = []
+        for segment in self.segments:
+            start, end = segment["start"] + shift, segment["end"] + shift
+            if end <= 0:
+                continue
+            segments.append(dict(segment, id=len(segments), start=max(0.0, start), end=end))
+        text = "".join(segment["text"] for segment in segments)
+        return Transcription(text=text, segments=segments, duration=max(0.0, self.offset + shift))
+
+
+class LiveTranscriber:
+    """
+    每個會議室一個工作階段，音訊段依收到的順序逐段轉錄 (每個會議室一個執行緒)，
+    轉錄結果平移到會議時間軸後透過 listener 推送，會議結束時直接取用累積的逐字稿。
+    """
+
+    def __init__(self, ai: AI, ttl_seconds: int = LIVE_SESSION_TTL_SECONDS):
+        self.ai = ai
+        self.ttl_seconds = ttl_seconds
+        self._sessions = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        # listener(room_name, segments) 在每段音訊轉錄完成時呼叫，segments 為新增的部分
+        self._listeners.append(listener)
+
+    def _notify(self, room_name: str, segments: list):
+        for listener in self._listeners:
+            try:
+                listener(room_name, segments)
+            except Exception as e:
+                print("Error notifying live transcription listener.", e)
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [room for room, session in self._sessions.items() if now - session.updated_at > self.ttl_seconds]
+            for room in idle:
+                session = self._sessions.pop(room)
+                session.pending.put(None)
+
+    def submit(self, room_name: str, data: bytes, input_format: str = None, source: str = None) -> bool:
+        # 回傳 False 表示會議室已有其他音訊來源，這段音訊不處理
+        self._evict_idle()
+        with self._lock:
+            session = self._sessions.get(room_name)
+            if session is None:
+                session = self._sessions[room_name] = LiveSession(room_name, source)
+                threading.Thread(target=self._worker, args=(session,), name=f"live-{room_name}", daemon=True).start()
+            elif session.source is None:
+                session.source = source
+            elif session.source != source:
+                return False
+            session.updated_at = time.monotonic()
+        # 記錄收到的時間，音訊段依實際時間放到時間軸上 (中途暫停送出時不會往前擠)
+        session.pending.put((data, input_format, time.time()))
+        return True
+
+    def release(self, source: str):
+        # 音訊來源斷線後，會議室中的其他客戶端可以接手
+        with self._lock:
+            for session in self._sessions.values():
+                if session.source == source:
+                    session.source = None
+
+    def _worker(self, session: LiveSession):
+        while True:
+            item = session.pending.get()
+            try:
+                if item is None:
+                    return
+                self._transcribe_chunk(session, *item)
+            except Exception as e:
+                session.failed_chunks += 1
+                print(f"Live transcription failed for {session.room_name}.", e)
+            finally:
+                session.pending.task_done()
+
+    def _transcribe_chunk(self, session: LiveSession, data: bytes, input_format: str, received_at: float):
+        pcm = decode_to_pcm(data, input_format)
+        duration = len(pcm) / _BYTES_PER_SECOND
+        if duration == 0:
+            return
+        # 音訊段在錄完後才送出，收到的時間減去長度即為這段音訊開始的時間
+        chunk_started_at = received_at - duration
+        if session.started_at is None:
+            session.started_at = chunk_started_at
+        offset = max(session.offset, chunk_started_at - session.started_at)
+        transcription = self.ai.transcribe_audio((f"live_{session.chunks}.wav", pcm_to_wav(pcm)))
+        new_segments = []
+        for segment in transcription.segments:
+            new_segments.append({
+                "id": len(session.segments) + len(new_segments),
+                "start": offset + segment["start"],
+                "end": min(offset + duration, offset + segment["end"]),
+                "text": segment["text"],
+            })
+        session.segments.extend(new_segments)
+        session.offset = offset + duration
+        session.chunks += 1
+        self._notify(session.room_name, [
+            {
+                "id": segment["id"],
+                "startTime": math.floor(segment["start"]),
+                "endTime": math.floor(segment["end"]),
+                "text": segment["text"],
+            }
+            for segment in new_segments
+        ])
+
+    def snapshot(self, room_name: str):
+        with self._lock:
+            session = self._sessions.get(room_name)
+        if session is None:
+            return None
+        return {
+            "roomName": room_name,
+            "chunks": session.chunks,
+            "failedChunks": session.failed_chunks,
+            "pending": session.pending.qsize(),
+            "startedAt": session.started_at,
+            "transcription": session.transcription().to_dict(),
+        }
+
+    def finish(self, room_name: str, started_at: float, timeout: float = LIVE_FINISH_TIMEOUT_SECONDS):
+        """
+        結束會議室的工作階段並回傳平移到錄影檔時間軸 (started_at 為錄影開始的 epoch 秒) 的 Transcription。
+        沒有工作階段 (或有音訊段轉錄失敗) 時回傳 None，由呼叫端改為轉錄完整錄音檔。
+        """
+        with self._lock:
+            session = self._sessions.pop(room_name, None)
+        if session is None:
+            return None
+        session.pending.put(None)
+        deadline = time.monotonic() + timeout
+        # 等待 worker 處理完剩餘的音訊段 (包含結束標記)
+        while session.pending.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if session.pending.unfinished_tasks or session.failed_chunks or not session.segments:
+            return None
+        transcription = session.transcription(started_at)
+        return transcription if transcription.segments else None
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+
+class PipelineContext:
+    """
+    各階段共用的狀態：params 為請求參數，data 存放階段之間傳遞的中間結果，
+    timings 為每個階段的計時紀錄，cleanups 在流程結束後 (無論成功與否) 依反向順序執行。
+    """
+
+    def __init__(self, job, params: dict):
+        self.job = job
+        self.params = params
+        self.data = {}
+        self.timings = []
+        self.cleanups = []
+
+    def on_cleanup(self, fn):
+        self.cleanups.append(fn)
+
+
+class Stage:
+    # fn(ctx) 可回傳 dict：bytesIn / bytesOut / upstreamMs 等計量；when(ctx) 為 False 時略過此階段
+    def __init__(self, name: str, percent: int, fn, when=None):
+        self.name = name
+        self.percent = percent
+        self.fn = fn
+        self.when = when
+
+
+class PipelineMetrics:
+    """程序內各階段的累計耗時，依檔案類型分組，供調整最慢的階段"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, group: str, timing: dict):
+        with self._lock:
+            stats = self._stages.setdefault(group, {}).setdefault(timing["stage"], {
+                "count": 0, "failed": 0, "totalMs": 0, "maxMs": 0, "upstreamMs": 0, "bytesIn": 0, "bytesOut": 0,
+            })
+            stats["count"] += 1
+            stats["failed"] += 0 if timing["ok"] else 1
+            stats["totalMs"] += timing["wallMs"]
+            stats["maxMs"] = max(stats["maxMs"], timing["wallMs"])
+            for name in ("upstreamMs", "bytesIn", "bytesOut"):
+                stats[name] += timing.get(name) or 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for group, stages in self._stages.items():
+                result[group] = {}
+                for stage, stats in stages.items():
+                    result[group][stage] = dict(stats, avgMs=round(stats["totalMs"] / stats["count"], 1))
+            return result
+
+
+class Pipeline:
+    def __init__(self, name: str, stages: list, metrics: PipelineMetrics = None):
+        self.name = name
+        self.stages = stages
+        self.metrics = metrics
+
+    def run(self, ctx: PipelineContext, group: str = "default"):
+        try:
+            for stage in self.stages:
+                if stage.when and not stage.when(ctx):
+                    continue
+                ctx.job.update(stage.name, stage.percent)
+                start = time.perf_counter()
+                measures = {}
+                ok = False
+                try:
+                    measures = stage.fn(ctx) or {}
+                    ok = True
+                finally:
+                    timing = {"stage": stage.name, "ok": ok, "wallMs": round((time.perf_counter() - start) * 1000, 1),
+                              **measures}
+                    ctx.timings.append(timing)
+                    self._emit(ctx, group, timing)
+            return ctx
+        finally:
+            for cleanup in reversed(ctx.cleanups):
+                try:
+                    cleanup()
+                except Exception as e:
+                    print(f"Pipeline {self.name} cleanup failed.", e)
+
+    def _emit(self, ctx: PipelineContext, group: str, timing: dict):
+        if self.metrics:
+            self.metrics.record(group, timing)
+        # 每個階段一行 JSON，方便以日誌系統彙整
+        print(json.dumps({"event": "pipeline.stage", "pipeline": self.name, "jobId": ctx.job.id, "group": group,
+                          **timing}))
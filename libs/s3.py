@@ -1,7 +1,40 @@
+import hashlib
 import os
 import boto3
 import json
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
+
+# 分段上傳設定：每段大小 (MB) 與同時上傳的段數
+S3_UPLOAD_PART_MB = int(os.environ.get("S3_UPLOAD_PART_MB", 8))
+S3_UPLOAD_CONCURRENCY = int(os.environ.get("S3_UPLOAD_CONCURRENCY", 8))
+
+
+class HashingReader:
+    """
+    包裝輸入串流，讀取時同步計算 SHA-256 並可選擇寫入本機檔案 (tee)。
+    只提供 read()，讓 boto3 以不可 seek 的串流方式依序讀取，確保雜湊順序正確。
+    """
+
+    def __init__(self, stream, tee=None):
+        self.stream = stream
+        self.tee = tee
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if data:
+            self.digest.update(data)
+            self.size += len(data)
+            if self.tee:
+                self.tee.write(data)
+        return data
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+
 class S3:
     _instance = None
 
@@ -24,6 +57,9 @@ class S3:
             aws_secret_access_key=S3_SECRET_KEY,
             region_name=AWS_REGION
         )
+        part_size = S3_UPLOAD_PART_MB * 1024 * 1024
+        self.transfer_config = TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size,
+                                              max_concurrency=S3_UPLOAD_CONCURRENCY, use_threads=True)
 
     def exists(self, key):
         try:
@@ -54,6 +90,13 @@ class S3:
         response = self.s3_client.get_object(**params)
         return response['Body']
 
+    def generate_presigned_url(self, key, expires_in=3600):
+        params = {
+            'Bucket': self.S3_BUCKET,
+            'Key': key
+        }
+        return self.s3_client.generate_presigned_url('get_object', Params=params, ExpiresIn=expires_in)
+
     def get_object_as_json(self, key):
         body = self.get_object(key)
         stringified_data = body.read().decode('utf-8')
@@ -79,9 +122,16 @@ class S3:
             'Bucket': self.S3_BUCKET,
             'Key': key,
             'Fileobj': file,
+            'Config': self.transfer_config,
         }
         return self.s3_client.upload_fileobj(**params)
 
+    def upload_stream(self, key, stream, tee=None):
+        # 串流上傳 (分段並行)，同時計算內容雜湊並寫入 tee，回傳 (sha256, 位元組數)
+        reader = HashingReader(stream, tee)
+        self.upload_object(key, reader)
+        return reader.hexdigest(), reader.size
+
     def download_object(self, key, file):
         params = {
             'Bucket': self.S3_BUCKET,
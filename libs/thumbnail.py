@@ -0,0 +1,232 @@
+import os
+import struct
+import subprocess
+from io import BytesIO
+from tempfile import NamedTemporaryFile
+import numpy as np
+
+from libs.s3 import S3
+
+# 擷取第幾幀作為縮圖 (錄影開頭常為黑畫面)
+THUMBNAIL_FRAME = int(os.environ.get("THUMBNAIL_FRAME", 24))
+# 縮圖寬度，第一個寬度的 JPEG 為主要縮圖 (<name>_thumbnail.jpg)，其餘為 <name>_thumbnail_<width>.<ext>
+THUMBNAIL_WIDTHS = [int(width) for width in os.environ.get("THUMBNAIL_WIDTHS", "1280,480").split(",")]
+# 輸出格式與品質 (cv2 延遲到產生縮圖時才匯入，因此以屬性名稱記錄參數)
+THUMBNAIL_FORMATS = {
+    "jpg": ("IMWRITE_JPEG_QUALITY", 85),
+    "webp": ("IMWRITE_WEBP_QUALITY", 80),
+}
+_BOX_HEADER_SIZE = 16
+
+
+class _RangeReader:
+    # 以 S3 range 請求讀取物件的指定區段，並記錄實際下載的位元組數
+    def __init__(self, s3: S3, key: str):
+        self.s3 = s3
+        self.key = key
+        self.size = s3.get_object_size(key)
+        self.bytes_read = 0
+
+    def read(self, start: int, length: int) -> bytes:
+        end = min(start + length, self.size) - 1
+        data = self.s3.get_object(self.key, range_start=start, range_end=end).read()
+        self.bytes_read += len(data)
+        return data
+
+
+def _box_header(data: bytes, offset: int):
+    # 回傳 (box 類型, 標頭長度, box 長度)
+    size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+    header_size = 8
+    if size == 1:
+        size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+        header_size = 16
+    return box_type, header_size, size
+
+
+def _top_level_boxes(reader: _RangeReader) -> dict:
+    # 只讀取每個頂層 box 的標頭，跳過 mdat 內容，找到 moov 即停止
+    boxes = {}
+    offset = 0
+    while offset + 8 <= reader.size:
+        header = reader.read(offset, _BOX_HEADER_SIZE)
+        box_type, _, size = _box_header(header, 0)
+        if size == 0:
+            size = reader.size - offset
+        if size < 8:
+            raise ValueError("Invalid mp4 box size")
+        boxes.setdefault(box_type, (offset, size))
+        if box_type == b"moov":
+            break
+        offset += size
+    return boxes
+
+
+def _children(data: bytes, start: int, end: int):
+    offset = start
+    while offset + 8 <= end:
+        box_type, header_size, size = _box_header(data, offset)
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def _find(data: bytes, start: int, end: int, path: list):
+    for box_type, payload_start, box_end in _children(data, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return payload_start, box_end
+            return _find(data, payload_start, box_end, path[1:])
+    return None
+
+
+def _video_sample_ranges(moov: bytes, count: int) -> list:
+    # 由 moov 的 sample table (stsz/stsc/stco) 計算視訊軌前 count 個 sample 在檔案中的位置
+    for box_type, trak_start, trak_end in _children(moov, 0, len(moov)):
+        if box_type != b"trak":
+            continue
+        hdlr = _find(moov, trak_start, trak_end, [b"mdia", b"hdlr"])
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+        stbl = _find(moov, trak_start, trak_end, [b"mdia", b"minf", b"stbl"])
+        stsz = _find(moov, stbl[0], stbl[1], [b"stsz"])
+        stsc = _find(moov, stbl[0], stbl[1], [b"stsc"])
+        stco = _find(moov, stbl[0], stbl[1], [b"stco"])
+        co64 = _find(moov, stbl[0], stbl[1], [b"co64"])
+
+        sample_size, sample_count = struct.unpack(">II", moov[stsz[0] + 4:stsz[0] + 12])
+        count = min(count, sample_count)
+        if sample_size:
+            sizes = [sample_size] * count
+        else:
+            sizes = list(struct.unpack(f">{count}I", moov[stsz[0] + 12:stsz[0] + 12 + 4 * count]))
+
+        if stco:
+            chunk_count = struct.unpack(">I", moov[stco[0] + 4:stco[0] + 8])[0]
+            chunk_offsets = struct.unpack(f">{chunk_count}I", moov[stco[0] + 8:stco[0] + 8 + 4 * chunk_count])
+        else:
+            chunk_count = struct.unpack(">I", moov[co64[0] + 4:co64[0] + 8])[0]
+            chunk_offsets = struct.unpack(f">{chunk_count}Q", moov[co64[0] + 8:co64[0] + 8 + 8 * chunk_count])
+
+        entry_count = struct.unpack(">I", moov[stsc[0] + 4:stsc[0] + 8])[0]
+        entries = [struct.unpack(">III", moov[stsc[0] + 8 + 12 * i:stsc[0] + 20 + 12 * i]) for i in range(entry_count)]
+
+        ranges = []
+        for index, (first_chunk, samples_per_chunk, _) in enumerate(entries):
+            last_chunk = entries[index + 1][0] - 1 if index + 1 < entry_count else chunk_count
+            for chunk in range(first_chunk, last_chunk + 1):
+                offset = chunk_offsets[chunk - 1]
+                for _ in range(samples_per_chunk):
+                    if len(ranges) == count:
+                        return ranges
+                    size = sizes[len(ranges)]
+                    ranges.append((offset, size))
+                    offset += size
+        return ranges
+    raise ValueError("No video track found")
+
+
+def _read_frame(video_path: str, frame_index: int):
+    import cv2
+    video = cv2.VideoCapture(video_path)
+    frame = None
+    # 依序讀取而非跳轉，只需要已下載的 sample
+    for _ in range(frame_index + 1):
+        success, current = video.read()
+        if not success:
+            break
+        frame = current
+    video.release()
+    return frame
+
+
+def extract_frame_by_range(s3: S3, key: str, frame_index: int = THUMBNAIL_FRAME):
+    """
+    只以 range 請求下載 ftyp、moov 與前幾個視訊 sample，寫入與原檔相同配置的稀疏暫存檔後解碼一幀。
+    回傳 (frame, 下載的位元組數)。
+    """
+    reader = _RangeReader(s3, key)
+    boxes = _top_level_boxes(reader)
+    if b"moov" not in boxes:
+        raise ValueError("moov box not found")
+
+    moov_offset, moov_size = boxes[b"moov"]
+    moov_box = reader.read(moov_offset, moov_size)
+    _, header_size, _ = _box_header(moov_box, 0)
+    samples = _video_sample_ranges(moov_box[header_size:], frame_index + 1)
+    if not samples:
+        raise ValueError("No video samples found")
+
+    with NamedTemporaryFile(suffix=".mp4") as sparse_file:
+        sparse_file.truncate(reader.size)
+        for box_type in (b"ftyp", b"moov"):
+            if box_type in boxes:
+                offset, size = boxes[box_type]
+                sparse_file.seek(offset)
+                sparse_file.write(moov_box if box_type == b"moov" else reader.read(offset, size))
+        # 前幾個視訊 sample 通常連續存放 (中間可能夾雜音訊)，以單一 range 請求下載
+        samples_start = min(offset for offset, _ in samples)
+        samples_end = max(offset + size for offset, size in samples)
+        sparse_file.seek(samples_start)
+        sparse_file.write(reader.read(samples_start, samples_end - samples_start))
+        sparse_file.flush()
+        frame = _read_frame(sparse_file.name, frame_index)
+    return frame, reader.bytes_read
+
+
+def extract_frame_by_ffmpeg(source: str, frame_index: int = THUMBNAIL_FRAME):
+    # 備用方案：ffmpeg 直接讀取 URL，只解碼到指定幀
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", source,
+         "-vf", f"select=gte(n\\,{frame_index})", "-frames:v", "1", "-f", "image2pipe", "-c:v", "png", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0 or not result.stdout:
+        return None
+    import cv2
+    return cv2.imdecode(np.frombuffer(result.stdout, np.uint8), cv2.IMREAD_COLOR)
+
+
+def thumbnail_variants(frame, base_name: str) -> list:
+    # 產生各尺寸的 JPEG/WebP 縮圖，回傳 [(檔名, 內容), ...]
+    import cv2
+    variants = []
+    height, width = frame.shape[:2]
+    for index, target_width in enumerate(THUMBNAIL_WIDTHS):
+        image = frame
+        if width > target_width:
+            image = cv2.resize(frame, (target_width, int(height * target_width / width)), interpolation=cv2.INTER_AREA)
+        for extension, (flag, quality) in THUMBNAIL_FORMATS.items():
+            success, encoded = cv2.imencode(f".{extension}", image, [getattr(cv2, flag), quality])
+            if not success:
+                continue
+            if index == 0 and extension == "jpg":
+                name = f"{base_name}_thumbnail.jpg"
+            else:
+                name = f"{base_name}_thumbnail_{target_width}.{extension}"
+            variants.append((name, encoded.tobytes()))
+    return variants
+
+
+def create_thumbnails(s3: S3, key: str, output_prefix: str, local_path: str = None) -> str:
+    # 擷取縮圖並上傳所有尺寸，回傳主要縮圖檔名；有本機副本 (剛上傳的檔案) 時直接讀取本機檔案
+    base_name = key.split('/')[-1].split('.')[0]
+    frame = None
+    if local_path:
+        frame = _read_frame(local_path, THUMBNAIL_FRAME)
+    else:
+        try:
+            frame, bytes_read = extract_frame_by_range(s3, key)
+            print(f"Thumbnail for {key}: downloaded {bytes_read} bytes by range requests")
+        except Exception as e:
+            print("Range thumbnail extraction failed, falling back to ffmpeg.", e)
+    if frame is None:
+        frame = extract_frame_by_ffmpeg(s3.generate_presigned_url(key))
+    if frame is None:
+        raise RuntimeError("Failed to extract frame from video")
+
+    variants = thumbnail_variants(frame, base_name)
+    for name, content in variants:
+        s3.upload_object(f"{output_prefix}{name}", BytesIO(content))
+    return variants[0][0]
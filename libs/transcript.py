@@ -0,0 +1,121 @@
+import json
+import math
+import os
+import struct
+import zlib
+from io import BytesIO
+
+from libs.cache import LRUCache
+from libs.s3 import S3
+
+RECORDINGS_PATH = os.environ.get("RECORDINGS_PATH", "recordings/")
+TRANSCRIPT_PREFIX = os.environ.get("TRANSCRIPT_PREFIX", f"{RECORDINGS_PATH}transcripts/")
+TRANSCRIPT_CACHE_SIZE = int(os.environ.get("TRANSCRIPT_CACHE_SIZE", 32))
+# 摘要文件內只保留開頭幾 KB 的 segments 作為預覽，文件大小不隨會議長度增加；完整內容由 segments API 取得
+TRANSCRIPT_INLINE_MAX_BYTES = int(os.environ.get("TRANSCRIPT_INLINE_MAX_BYTES", 4 * 1024))
+
+# 格式：zlib 壓縮的 [標頭 | id | 起點差值 (ms) | 長度 (ms) | 文字位元組數 | UTF-8 文字]，整數皆為 little-endian int32
+_MAGIC = b"TRS1"
+_HEADER = struct.Struct("<4sI")
+TRANSCRIPT_FORMAT = "trs1+zlib"
+
+
+def encode_segments(segments: list) -> bytes:
+    # segments 為轉錄結果 ({"id", "start", "end", "text"}，時間單位為秒)
+    ids = [segment["id"] for segment in segments]
+    starts = [int(round(segment["start"] * 1000)) for segment in segments]
+    ends = [int(round(segment["end"] * 1000)) for segment in segments]
+    deltas = [start - previous for previous, start in zip([0] + starts, starts)]
+    durations = [end - start for start, end in zip(starts, ends)]
+    texts = [segment["text"].encode("utf-8") for segment in segments]
+    count = len(segments)
+    packed = b"".join([
+        _HEADER.pack(_MAGIC, count),
+        struct.pack(f"<{count}i", *ids),
+        struct.pack(f"<{count}i", *deltas),
+        struct.pack(f"<{count}i", *durations),
+        struct.pack(f"<{count}i", *(len(text) for text in texts)),
+        *texts,
+    ])
+    return zlib.compress(packed, 9)
+
+
+def decode_segments(blob: bytes) -> list:
+    # 回傳與 API 相同格式的 segments ({"id", "startTime", "endTime", "text"}，時間單位為秒並無條件捨去)
+    packed = zlib.decompress(blob)
+    magic, count = _HEADER.unpack_from(packed, 0)
+    if magic != _MAGIC:
+        raise ValueError("Unsupported transcript format")
+    offset = _HEADER.size
+    columns = []
+    for _ in range(4):
+        columns.append(struct.unpack_from(f"<{count}i", packed, offset))
+        offset += 4 * count
+    ids, deltas, durations, lengths = columns
+
+    segments = []
+    start = 0
+    for index in range(count):
+        start += deltas[index]
+        text = packed[offset:offset + lengths[index]].decode("utf-8")
+        offset += lengths[index]
+        segments.append({
+            "id": ids[index],
+            "startTime": math.floor(start / 1000),
+            "endTime": math.floor((start + durations[index]) / 1000),
+            "text": text,
+        })
+    return segments
+
+
+def inline_segments(segments: list, max_bytes: int = TRANSCRIPT_INLINE_MAX_BYTES):
+    # 取開頭不超過 max_bytes (以 JSON 大小估算) 的 segments，回傳 (segments, 是否截斷)
+    total = 0
+    for index, segment in enumerate(segments):
+        total += len(json.dumps(segment, ensure_ascii=False).encode("utf-8"))
+        if total > max_bytes:
+            return segments[:index], True
+    return segments, False
+
+
+def slice_segments(segments: list, start: float = None, end: float = None) -> list:
+    # 取出與 [start, end] (秒) 重疊的 segments
+    return [
+        segment for segment in segments
+        if (start is None or segment["endTime"] >= start) and (end is None or segment["startTime"] <= end)
+    ]
+
+
+class TranscriptStore:
+    """逐字稿 segments 以壓縮的欄位式格式存放於 S3 (每份摘要一個物件)，Firestore 只保存指標與統計"""
+
+    def __init__(self, s3: S3 = None, prefix: str = TRANSCRIPT_PREFIX, max_entries: int = TRANSCRIPT_CACHE_SIZE):
+        self.s3 = s3 or S3()
+        self.prefix = prefix
+        self.local = LRUCache(max_entries)
+
+    def key(self, summary_id: str) -> str:
+        return f"{self.prefix}{summary_id}.trs"
+
+    def put(self, summary_id: str, segments: list) -> dict:
+        blob = encode_segments(segments)
+        key = self.key(summary_id)
+        self.s3.upload_object(key, BytesIO(blob))
+        return {
+            "key": key,
+            "format": TRANSCRIPT_FORMAT,
+            "bytes": len(blob),
+            "segmentCount": len(segments),
+            "textLength": sum(len(segment["text"]) for segment in segments),
+        }
+
+    def get(self, key: str) -> list:
+        segments = self.local.get(key)
+        if segments is None:
+            segments = decode_segments(self.s3.get_object(key).read())
+            self.local.set(key, segments)
+        return segments
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        self.s3.delete_object(key)
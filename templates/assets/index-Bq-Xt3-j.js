@@ -3524,7 +3524,7 @@ This typically indicates that your device does not have a healthy Internet conne
 `)}get[Symbol.toStringTag](){return"AxiosHeaders"}static from(e){return e instanceof this?e:new this(e)}static concat(e,...n){const r=new this(e);return n.forEach(i=>r.set(i)),r}static accessor(e){const r=(this[s1]=this[s1]={accessors:{}}).accessors,i=this.prototype;function s(o){const a=mu(o);r[a]||(U8(i,o),r[a]=!0)}return W.isArray(e)?e.forEach(s):s(e),this}}An.accessor(["Content-Type","Content-Length","Accept","Accept-Encoding","User-Agent","Authorization"]);W.reduceDescriptors(An.prototype,({value:t},e)=>{let n=e[0].toUpperCase()+e.slice(1);return{get:()=>t,set(r){this[n]=r}}});W.freezeMethods(An);function sy(t,e){const n=this||hd,r=e||n,i=An.from(r.headers);let s=r.data;return W.forEach(t,function(a){s=a.call(n,s,i.normalize(),e?e.status:void 0)}),i.normalize(),s}function VO(t){return!!(t&&t.__CANCEL__)}function Ll(t,e,n){we.call(this,t??"canceled",we.ERR_CANCELED,e,n),this.name="CanceledError"}W.inherits(Ll,we,{__CANCEL__:!0});function jO(t,e,n){const r=n.config.validateStatus;!n.status||!r||r(n.status)?t(n):e(new we("Request failed with status code "+n.status,[we.ERR_BAD_REQUEST,we.ERR_BAD_RESPONSE][Math.floor(n.status/100)-4],n.config,n.request,n))}function F8(t){const e=/^([-+\w]{1,25})(:?\/\/|:)/.exec(t);return e&&e[1]||""}function V8(t,e){t=t||10;const n=new Array(t),r=new Array(t);let i=0,s=0,o;return e=e!==void 0?e:1e3,function(l){const u=Date.now(),c=r[s];o||(o=u),n[i]=l,r[i]=u;let d=s,h=0;for(;d!==i;)h+=n[d++],d=d%t;if(i=(i+1)%t,i===s&&(s=(s+1)%t),u-o<e)return;const p=c&&u-c;return p?Math.round(h*1e3/p):void 0}}function j8(t,e){let n=0,r=1e3/e,i,s;const o=(u,c=Date.now())=>{n=c,i=null,s&&(clearTimeout(s),s=null),t.apply(null,u)};return[(...u)=>{const c=Date.now(),d=c-n;d>=r?o(u,c):(i=u,s||(s=setTimeout(()=>{s=null,o(i)},r-d)))},()=>i&&o(i)]}const fp=(t,e,n=3)=>{let r=0;const i=V8(50,250);return j8(s=>{const o=s.loaded,a=s.lengthComputable?s.total:void 0,l=o-r,u=i(l),c=o<=a;r=o;const d={loaded:o,total:a,progress:a?o/a:void 0,bytes:l,rate:u||void 0,estimated:u&&a&&c?(a-o)/u:void 0,event:s,lengthComputable:a!=null,[e?"download":"upload"]:!0};t(d)},n)},o1=(t,e)=>{const n=t!=null;return[r=>e[0]({lengthComputable:n,total:t,loaded:r}),e[1]]},a1=t=>(...e)=>W.asap(()=>t(...e)),B8=rn.hasStandardBrowserEnv?((t,e)=>n=>(n=new URL(n,rn.origin),t.protocol===n.protocol&&t.host===n.host&&(e||t.port===n.port)))(new URL(rn.origin),rn.navigator&&/(msie|trident)/i.test(rn.navigator.userAgent)):()=>!0,$8=rn.hasStandardBrowserEnv?{write(t,e,n,r,i,s){const o=[t+"="+encodeURIComponent(e)];W.isNumber(n)&&o.push("expires="+new Date(n).toGMTString()),W.isString(r)&&o.push("path="+r),W.isString(i)&&o.push("domain="+i),s===!0&&o.push("secure"),document.cookie=o.join("; ")},read(t){const e=document.cookie.match(new RegExp("(^|;\\s*)("+t+")=([^;]*)"));return e?decodeURIComponent(e[3]):null},remove(t){this.write(t,"",Date.now()-864e5)}}:{write(){},read(){return null},remove(){}};function z8(t){return/^([a-z][a-z\d+\-.]*:)?\/\//i.test(t)}function q8(t,e){return e?t.replace(/\/?\/$/,"")+"/"+e.replace(/^\/+/,""):t}function BO(t,e){return t&&!z8(e)?q8(t,e):e}const l1=t=>t instanceof An?{...t}:t;function Bo(t,e){e=e||{};const n={};function r(u,c,d,h){return W.isPlainObject(u)&&W.isPlainObject(c)?W.merge.call({caseless:h},u,c):W.isPlainObject(c)?W.merge({},c):W.isArray(c)?c.slice():c}function i(u,c,d,h){if(W.isUndefined(c)){if(!W.isUndefined(u))return r(void 0,u,d,h)}else return r(u,c,d,h)}function s(u,c){if(!W.isUndefined(c))return r(void 0,c)}function o(u,c){if(W.isUndefined(c)){if(!W.isUndefined(u))return r(void 0,u)}else return r(void 0,c)}function a(u,c,d){if(d in e)return r(u,c);if(d in t)return r(void 0,u)}const l={url:s,method:s,data:s,baseURL:o,transformRequest:o,transformResponse:o,paramsSerializer:o,timeout:o,timeoutMessage:o,withCredentials:o,withXSRFToken:o,adapter:o,responseType:o,xsrfCookieName:o,xsrfHeaderName:o,onUploadProgress:o,onDownloadProgress:o,decompress:o,maxContentLength:o,maxBodyLength:o,beforeRedirect:o,transport:o,httpAgent:o,httpsAgent:o,cancelToken:o,socketPath:o,responseEncoding:o,validateStatus:a,headers:(u,c,d)=>i(l1(u),l1(c),d,!0)};return W.forEach(Object.keys(Object.assign({},t,e)),function(c){const d=l[c]||i,h=d(t[c],e[c],c);W.isUndefined(h)&&d!==a||(n[c]=h)}),n}const $O=t=>{const e=Bo({},t);let{data:n,withXSRFToken:r,xsrfHeaderName:i,xsrfCookieName:s,headers:o,auth:a}=e;e.headers=o=An.from(o),e.url=MO(BO(e.baseURL,e.url),t.params,t.paramsSerializer),a&&o.set("Authorization","Basic "+btoa((a.username||"")+":"+(a.password?unescape(encodeURIComponent(a.password)):"")));let l;if(W.isFormData(n)){if(rn.hasStandardBrowserEnv||rn.hasStandardBrowserWebWorkerEnv)o.setContentType(void 0);else if((l=o.getContentType())!==!1){const[u,...c]=l?l.split(";").map(d=>d.trim()).filter(Boolean):[];o.setContentType([u||"multipart/form-data",...c].join("; "))}}if(rn.hasStandardBrowserEnv&&(r&&W.isFunction(r)&&(r=r(e)),r||r!==!1&&B8(e.url))){const u=i&&s&&$8.read(s);u&&o.set(i,u)}return e},H8=typeof XMLHttpRequest<"u",W8=H8&&function(t){return new Promise(function(n,r){const i=$O(t);let s=i.data;const o=An.from(i.headers).normalize();let{responseType:a,onUploadProgress:l,onDownloadProgress:u}=i,c,d,h,p,m;function g(){p&&p(),m&&m(),i.cancelToken&&i.cancelToken.unsubscribe(c),i.signal&&i.signal.removeEventListener("abort",c)}let k=new XMLHttpRequest;k.open(i.method.toUpperCase(),i.url,!0),k.timeout=i.timeout;function y(){if(!k)return;const T=An.from("getAllResponseHeaders"in k&&k.getAllResponseHeaders()),I={data:!a||a==="text"||a==="json"?k.responseText:k.response,status:k.status,statusText:k.statusText,headers:T,config:t,request:k};jO(function(S){n(S),g()},function(S){r(S),g()},I),k=null}"onloadend"in k?k.onloadend=y:k.onreadystatechange=function(){!k||k.readyState!==4||k.status===0&&!(k.responseURL&&k.responseURL.indexOf("file:")===0)||setTimeout(y)},k.onabort=function(){k&&(r(new we("Request aborted",we.ECONNABORTED,t,k)),k=null)},k.onerror=function(){r(new we("Network Error",we.ERR_NETWORK,t,k)),k=null},k.ontimeout=function(){let x=i.timeout?"timeout of "+i.timeout+"ms exceeded":"timeout exceeded";const I=i.transitional||UO;i.timeoutErrorMessage&&(x=i.timeoutErrorMessage),r(new we(x,I.clarifyTimeoutError?we.ETIMEDOUT:we.ECONNABORTED,t,k)),k=null},s===void 0&&o.setContentType(null),"setRequestHeader"in k&&W.forEach(o.toJSON(),function(x,I){k.setRequestHeader(I,x)}),W.isUndefined(i.withCredentials)||(k.withCredentials=!!i.withCredentials),a&&a!=="json"&&(k.responseType=i.responseType),u&&([h,m]=fp(u,!0),k.addEventListener("progress",h)),l&&k.upload&&([d,p]=fp(l),k.upload.addEventListener("progress",d),k.upload.addEventListener("loadend",p)),(i.cancelToken||i.signal)&&(c=T=>{k&&(r(!T||T.type?new Ll(null,t,k):T),k.abort(),k=null)},i.cancelToken&&i.cancelToken.subscribe(c),i.signal&&(i.signal.aborted?c():i.signal.addEventListener("abort",c)));const w=F8(i.url);if(w&&rn.protocols.indexOf(w)===-1){r(new we("Unsupported protocol "+w+":",we.ERR_BAD_REQUEST,t));return}k.send(s||null)})},K8=(t,e)=>{const{length:n}=t=t?t.filter(Boolean):[];if(e||n){let r=new AbortController,i;const s=function(u){if(!i){i=!0,a();const c=u instanceof Error?u:this.reason;r.abort(c instanceof we?c:new Ll(c instanceof Error?c.message:c))}};let o=e&&setTimeout(()=>{o=null,s(new we(`timeout ${e} of ms exceeded`,we.ETIMEDOUT))},e);const a=()=>{t&&(o&&clearTimeout(o),o=null,t.forEach(u=>{u.unsubscribe?u.unsubscribe(s):u.removeEventListener("abort",s)}),t=null)};t.forEach(u=>u.addEventListener("abort",s));const{signal:l}=r;return l.unsubscribe=()=>W.asap(a),l}},G8=function*(t,e){let n=t.byteLength;if(n<e){yield t;return}let r=0,i;for(;r<n;)i=r+e,yield t.slice(r,i),r=i},Q8=async function*(t,e){for await(const n of J8(t))yield*G8(n,e)},J8=async function*(t){if(t[Symbol.asyncIterator]){yield*t;return}const e=t.getReader();try{for(;;){const{done:n,value:r}=await e.read();if(n)break;yield r}}finally{await e.cancel()}},u1=(t,e,n,r)=>{const i=Q8(t,e);let s=0,o,a=l=>{o||(o=!0,r&&r(l))};return new ReadableStream({async pull(l){try{const{done:u,value:c}=await i.next();if(u){a(),l.close();return}let d=c.byteLength;if(n){let h=s+=d;n(h)}l.enqueue(new Uint8Array(c))}catch(u){throw a(u),u}},cancel(l){return a(l),i.return()}},{highWaterMark:2})},Cm=typeof fetch=="function"&&typeof Request=="function"&&typeof Response=="function",zO=Cm&&typeof ReadableStream=="function",Y8=Cm&&(typeof TextEncoder=="function"?(t=>e=>t.encode(e))(new TextEncoder):async t=>new Uint8Array(await new Response(t).arrayBuffer())),qO=(t,...e)=>{try{return!!t(...e)}catch{return!1}},X8=zO&&qO(()=>{let t=!1;const e=new Request(rn.origin,{body:new ReadableStream,method:"POST",get duplex(){return t=!0,"half"}}).headers.has("Content-Type");return t&&!e}),c1=64*1024,vb=zO&&qO(()=>W.isReadableStream(new Response("").body)),hp={stream:vb&&(t=>t.body)};Cm&&(t=>{["text","arrayBuffer","blob","formData","stream"].forEach(e=>{!hp[e]&&(hp[e]=W.isFunction(t[e])?n=>n[e]():(n,r)=>{throw new we(`Response type '${e}' is not supported`,we.ERR_NOT_SUPPORT,r)})})})(new Response);const Z8=async t=>{if(t==null)return 0;if(W.isBlob(t))return t.size;if(W.isSpecCompliantForm(t))return(await new Request(rn.origin,{method:"POST",body:t}).arrayBuffer()).byteLength;if(W.isArrayBufferView(t)||W.isArrayBuffer(t))return t.byteLength;if(W.isURLSearchParams(t)&&(t=t+""),W.isString(t))return(await Y8(t)).byteLength},eq=async(t,e)=>{const n=W.toFiniteNumber(t.getContentLength());return n??Z8(e)},tq=Cm&&(async t=>{let{url:e,method:n,data:r,signal:i,cancelToken:s,timeout:o,onDownloadProgress:a,onUploadProgress:l,responseType:u,headers:c,withCredentials:d="same-origin",fetchOptions:h}=$O(t);u=u?(u+"").toLowerCase():"text";let p=K8([i,s&&s.toAbortSignal()],o),m;const g=p&&p.unsubscribe&&(()=>{p.unsubscribe()});let k;try{if(l&&X8&&n!=="get"&&n!=="head"&&(k=await eq(c,r))!==0){let I=new Request(e,{method:"POST",body:r,duplex:"half"}),A;if(W.isFormData(r)&&(A=I.headers.get("content-type"))&&c.setContentType(A),I.body){const[S,_]=o1(k,fp(a1(l)));r=u1(I.body,c1,S,_)}}W.isString(d)||(d=d?"include":"omit");const y="credentials"in Request.prototype;m=new Request(e,{...h,signal:p,method:n.toUpperCase(),headers:c.normalize().toJSON(),body:r,duplex:"half",credentials:y?d:void 0});let w=await fetch(m);const T=vb&&(u==="stream"||u==="response");if(vb&&(a||T&&g)){const I={};["status","statusText","headers"].forEach(P=>{I[P]=w[P]});const A=W.toFiniteNumber(w.headers.get("content-length")),[S,_]=a&&o1(A,fp(a1(a),!0))||[];w=new Response(u1(w.body,c1,S,()=>{_&&_(),g&&g()}),I)}u=u||"text";let x=await hp[W.findKey(hp,u)||"text"](w,t);return!T&&g&&g(),await new Promise((I,A)=>{jO(I,A,{data:x,headers:An.from(w.headers),status:w.status,statusText:w.statusText,config:t,request:m})})}catch(y){throw g&&g(),y&&y.name==="TypeError"&&/fetch/i.test(y.message)?Object.assign(new we("Network Error",we.ERR_NETWORK,t,m),{cause:y.cause||y}):we.from(y,y&&y.code,t,m)}}),bb={http:g8,xhr:W8,fetch:tq};W.forEach(bb,(t,e)=>{if(t){try{Object.defineProperty(t,"name",{value:e})}catch{}Object.defineProperty(t,"adapterName",{value:e})}});const d1=t=>`- ${t}`,nq=t=>W.isFunction(t)||t===null||t===!1,HO={getAdapter:t=>{t=W.isArray(t)?t:[t];const{length:e}=t;let n,r;const i={};for(let s=0;s<e;s++){n=t[s];let o;if(r=n,!nq(n)&&(r=bb[(o=String(n)).toLowerCase()],r===void 0))throw new we(`Unknown adapter '${o}'`);if(r)break;i[o||"#"+s]=r}if(!r){const s=Object.entries(i).map(([a,l])=>`adapter ${a} `+(l===!1?"is not supported by the environment":"is not available in the build"));let o=e?s.length>1?`since :
 `+s.map(d1).join(`
 `):" "+d1(s[0]):"as no adapter specified";throw new we("There is no suitable adapter to dispatch the request "+o,"ERR_NOT_SUPPORT")}return r},adapters:bb};function oy(t){if(t.cancelToken&&t.cancelToken.throwIfRequested(),t.signal&&t.signal.aborted)throw new Ll(null,t)}function f1(t){return oy(t),t.headers=An.from(t.headers),t.data=sy.call(t,t.transformRequest),["post","put","patch"].indexOf(t.method)!==-1&&t.headers.setContentType("application/x-www-form-urlencoded",!1),HO.getAdapter(t.adapter||hd.adapter)(t).then(function(r){return oy(t),r.data=sy.call(t,t.transformResponse,r),r.headers=An.from(r.headers),r},function(r){return VO(r)||(oy(t),r&&r.response&&(r.response.data=sy.call(t,t.transformResponse,r.response),r.response.headers=An.from(r.response.headers))),Promise.reject(r)})}const WO="1.7.9",xm={};["object","boolean","number","function","string","symbol"].forEach((t,e)=>{xm[t]=function(r){return typeof r===t||"a"+(e<1?"n ":" ")+t}});const h1={};xm.transitional=function(e,n,r){function i(s,o){return"[Axios v"+WO+"] Transitional option '"+s+"'"+o+(r?". "+r:"")}return(s,o,a)=>{if(e===!1)throw new we(i(o," has been removed"+(n?" in "+n:"")),we.ERR_DEPRECATED);return n&&!h1[o]&&(h1[o]=!0,console.warn(i(o," has been deprecated since v"+n+" and will be removed in the near future"))),e?e(s,o,a):!0}};xm.spelling=function(e){return(n,r)=>(console.warn(`${r} is likely a misspelling of ${e}`),!0)};function rq(t,e,n){if(typeof t!="object")throw new we("options must be an object",we.ERR_BAD_OPTION_VALUE);const r=Object.keys(t);let i=r.length;for(;i-- >0;){const s=r[i],o=e[s];if(o){const a=t[s],l=a===void 0||o(a,s,t);if(l!==!0)throw new we("option "+s+" must be "+l,we.ERR_BAD_OPTION_VALUE);continue}if(n!==!0)throw new we("Unknown option "+s,we.ERR_BAD_OPTION)}}const Xf={assertOptions:rq,validators:xm},Kr=Xf.validators;class Co{constructor(e){this.defaults=e,this.interceptors={request:new i1,response:new i1}}async request(e,n){try{return await this._request(e,n)}catch(r){if(r instanceof Error){let i={};Error.captureStackTrace?Error.captureStackTrace(i):i=new Error;const s=i.stack?i.stack.replace(/^.+\n/,""):"";try{r.stack?s&&!String(r.stack).endsWith(s.replace(/^.+\n.+\n/,""))&&(r.stack+=`
-`+s):r.stack=s}catch{}}throw r}}_request(e,n){typeof e=="string"?(n=n||{},n.url=e):n=e||{},n=Bo(this.defaults,n);const{transitional:r,paramsSerializer:i,headers:s}=n;r!==void 0&&Xf.assertOptions(r,{silentJSONParsing:Kr.transitional(Kr.boolean),forcedJSONParsing:Kr.transitional(Kr.boolean),clarifyTimeoutError:Kr.transitional(Kr.boolean)},!1),i!=null&&(W.isFunction(i)?n.paramsSerializer={serialize:i}:Xf.assertOptions(i,{encode:Kr.function,serialize:Kr.function},!0)),Xf.assertOptions(n,{baseUrl:Kr.spelling("baseURL"),withXsrfToken:Kr.spelling("withXSRFToken")},!0),n.method=(n.method||this.defaults.method||"get").toLowerCase();let o=s&&W.merge(s.common,s[n.method]);s&&W.forEach(["delete","get","head","post","put","patch","common"],m=>{delete s[m]}),n.headers=An.concat(o,s);const a=[];let l=!0;this.interceptors.request.forEach(function(g){typeof g.runWhen=="function"&&g.runWhen(n)===!1||(l=l&&g.synchronous,a.unshift(g.fulfilled,g.rejected))});const u=[];this.interceptors.response.forEach(function(g){u.push(g.fulfilled,g.rejected)});let c,d=0,h;if(!l){const m=[f1.bind(this),void 0];for(m.unshift.apply(m,a),m.push.apply(m,u),h=m.length,c=Promise.resolve(n);d<h;)c=c.then(m[d++],m[d++]);return c}h=a.length;let p=n;for(d=0;d<h;){const m=a[d++],g=a[d++];try{p=m(p)}catch(k){g.call(this,k);break}}try{c=f1.call(this,p)}catch(m){return Promise.reject(m)}for(d=0,h=u.length;d<h;)c=c.then(u[d++],u[d++]);return c}getUri(e){e=Bo(this.defaults,e);const n=BO(e.baseURL,e.url);return MO(n,e.params,e.paramsSerializer)}}W.forEach(["delete","get","head","options"],function(e){Co.prototype[e]=function(n,r){return this.request(Bo(r||{},{method:e,url:n,data:(r||{}).data}))}});W.forEach(["post","put","patch"],function(e){function n(r){return function(s,o,a){return this.request(Bo(a||{},{method:e,headers:r?{"Content-Type":"multipart/form-data"}:{},url:s,data:o}))}}Co.prototype[e]=n(),Co.prototype[e+"Form"]=n(!0)});class kw{constructor(e){if(typeof e!="function")throw new TypeError("executor must be a function.");let n;this.promise=new Promise(function(s){n=s});const r=this;this.promise.then(i=>{if(!r._listeners)return;let s=r._listeners.length;for(;s-- >0;)r._listeners[s](i);r._listeners=null}),this.promise.then=i=>{let s;const o=new Promise(a=>{r.subscribe(a),s=a}).then(i);return o.cancel=function(){r.unsubscribe(s)},o},e(function(s,o,a){r.reason||(r.reason=new Ll(s,o,a),n(r.reason))})}throwIfRequested(){if(this.reason)throw this.reason}subscribe(e){if(this.reason){e(this.reason);return}this._listeners?this._listeners.push(e):this._listeners=[e]}unsubscribe(e){if(!this._listeners)return;const n=this._listeners.indexOf(e);n!==-1&&this._listeners.splice(n,1)}toAbortSignal(){const e=new AbortController,n=r=>{e.abort(r)};return this.subscribe(n),e.signal.unsubscribe=()=>this.unsubscribe(n),e.signal}static source(){let e;return{token:new kw(function(i){e=i}),cancel:e}}}function iq(t){return function(n){return t.apply(null,n)}}function sq(t){return W.isObject(t)&&t.isAxiosError===!0}const kb={Continue:100,SwitchingProtocols:101,Processing:102,EarlyHints:103,Ok:200,Created:201,Accepted:202,NonAuthoritativeInformation:203,NoContent:204,ResetContent:205,PartialContent:206,MultiStatus:207,AlreadyReported:208,ImUsed:226,MultipleChoices:300,MovedPermanently:301,Found:302,SeeOther:303,NotModified:304,UseProxy:305,Unused:306,TemporaryRedirect:307,PermanentRedirect:308,BadRequest:400,Unauthorized:401,PaymentRequired:402,Forbidden:403,NotFound:404,MethodNotAllowed:405,NotAcceptable:406,ProxyAuthenticationRequired:407,RequestTimeout:408,Conflict:409,Gone:410,LengthRequired:411,PreconditionFailed:412,PayloadTooLarge:413,UriTooLong:414,UnsupportedMediaType:415,RangeNotSatisfiable:416,ExpectationFailed:417,ImATeapot:418,MisdirectedRequest:421,UnprocessableEntity:422,Locked:423,FailedDependency:424,TooEarly:425,UpgradeRequired:426,PreconditionRequired:428,TooManyRequests:429,RequestHeaderFieldsTooLarge:431,UnavailableForLegalReasons:451,InternalServerError:500,NotImplemented:501,BadGateway:502,ServiceUnavailable:503,GatewayTimeout:504,HttpVersionNotSupported:505,VariantAlsoNegotiates:506,InsufficientStorage:507,LoopDetected:508,NotExtended:510,NetworkAuthenticationRequired:511};Object.entries(kb).forEach(([t,e])=>{kb[e]=t});function KO(t){const e=new Co(t),n=SO(Co.prototype.request,e);return W.extend(n,Co.prototype,e,{allOwnKeys:!0}),W.extend(n,e,null,{allOwnKeys:!0}),n.create=function(i){return KO(Bo(t,i))},n}const Et=KO(hd);Et.Axios=Co;Et.CanceledError=Ll;Et.CancelToken=kw;Et.isCancel=VO;Et.VERSION=WO;Et.toFormData=Em;Et.AxiosError=we;Et.Cancel=Et.CanceledError;Et.all=function(e){return Promise.all(e)};Et.spread=iq;Et.isAxiosError=sq;Et.mergeConfig=Bo;Et.AxiosHeaders=An;Et.formToJSON=t=>FO(W.isHTMLForm(t)?new FormData(t):t);Et.getAdapter=HO.getAdapter;Et.HttpStatusCode=kb;Et.default=Et;const zn=Et.create({baseURL:"api/",headers:{"Access-Control-Expose-Headers":"Content-Disposition","Content-Type":"application/json"}});let ay=null;zn.interceptors.request.use(t=>(ay||(ay=new AbortController),t.signal=ay.signal,t),t=>Promise.reject(t));zn.interceptors.response.use(t=>(console.log(t.headers),t),async t=>{if(t.config,t.response)switch(t.response.status){}return Promise.reject(t)});class oq{summarize(e){return console.log("summarize"),zn.post("/summarize",e,{headers:{"Content-Type":"multipart/form-data"}})}deleteSummary(e,n){return zn.delete(`/summary/${n}`,{headers:{"X-User-Id":e}})}downloadSummary(e,n){return zn.get(`/summary/${n}/download`,{headers:{"X-User-Id":e},responseType:"blob"})}getChatbotHistory(e){return zn.get("/chatbot/history",{headers:{"X-User-Id":e}})}getChatbotMessage(e,n,r){const i={uid:e,message:n};return r&&(i.chatId=r),zn.post("/chatbot/message",i)}}const Yu=new oq,GO=v.createContext(void 0);function aq({children:t}){const{user:e}=mr(),[n,r]=v.useState([]),[i,s]=v.useState(!1),o=v.useCallback(h=>{r(p=>[...p].sort((m,g)=>{const k=new Date(m.date).getTime(),y=new Date(g.date).getTime();return h==="asc"?k-y:y-k}))},[]),a=v.useCallback(h=>{r(p=>{var m=p.filter(k=>k.id!==h.id);return[...m,h]})},[]),l=v.useCallback(async h=>{if(e){s(!0);const p=new FormData;p.append("uid",e.id),h.file&&p.append("file",h.file),h.s3FileName&&p.append("s3_file_name",h.s3FileName),h.summaryId&&p.append("summary_id",h.summaryId);try{const m=await Yu.summarize(p);return a(m.data.summary),m.data}catch(m){throw console.error("Error uploading file:",m),m}finally{s(!1)}}},[e]),u=v.useCallback(async()=>{if(e)try{const h=await vO.fetchMeetingSummariesData(e.id);r(h)}catch(h){console.error("Error fetching meeting summaries:",h)}},[e]),c=v.useCallback(async h=>{if(e)try{return s(!0),(await Yu.deleteSummary(e.id,h)).status===200?(r(m=>{var g=m.filter(k=>k.id!==h);return g}),!0):!1}catch(p){throw console.error("Error delete file:",p),p}finally{s(!1)}else return!1},[e]),d=v.useCallback(async h=>{if(e)try{s(!0);const p=await Yu.downloadSummary(e.id,h);if(p.status===200){const m=p.headers.get("Content-Disposition");console.log(p);let g="downloaded_file.zip";if(console.log(m),m&&m.includes("filename=")){console.log(m);const w=m.match(/filename\*=utf-8''(.+)/);if(w&&w.length>1)g=decodeURIComponent(w[1]);else{const T=m.match(/filename="(.+)"/);T&&T.length>1&&(g=T[1])}}const k=window.URL.createObjectURL(new Blob([p.data])),y=document.createElement("a");return y.href=k,console.log(k),y.download=g,document.body.appendChild(y),y.click(),document.body.removeChild(y),window.URL.revokeObjectURL(k),!0}else return!1}catch(p){throw console.error("Error delete file:",p),p}finally{s(!1)}else return!1},[e]);return C.jsx(GO.Provider,{value:{isLoading:i,meetingSummaries:n,addMeetingSummary:a,sortMeetingSummaries:o,summarizeMeeting:l,fetchMeetingSummaries:u,deleteMeetingSummary:c,downloadMeetingSummary:d},children:t})}const pd=()=>v.useContext(GO);function lq({children:t}){const{isChecked:e,user:n}=mr(),{fetchMeetingSummaries:r}=pd();return console.log("PrivateRoute"),v.useEffect(()=>{(async()=>{if(n)try{await r()}catch(s){console.error("Error fetching meeting summaries:",s)}})()},[r]),e?n?C.jsx(C.Fragment,{children:t}):C.jsx(RR,{to:"/welcomePage",replace:!0}):null}/**
+`+s):r.stack=s}catch{}}throw r}}_request(e,n){typeof e=="string"?(n=n||{},n.url=e):n=e||{},n=Bo(this.defaults,n);const{transitional:r,paramsSerializer:i,headers:s}=n;r!==void 0&&Xf.assertOptions(r,{silentJSONParsing:Kr.transitional(Kr.boolean),forcedJSONParsing:Kr.transitional(Kr.boolean),clarifyTimeoutError:Kr.transitional(Kr.boolean)},!1),i!=null&&(W.isFunction(i)?n.paramsSerializer={serialize:i}:Xf.assertOptions(i,{encode:Kr.function,serialize:Kr.function},!0)),Xf.assertOptions(n,{baseUrl:Kr.spelling("baseURL"),withXsrfToken:Kr.spelling("withXSRFToken")},!0),n.method=(n.method||this.defaults.method||"get").toLowerCase();let o=s&&W.merge(s.common,s[n.method]);s&&W.forEach(["delete","get","head","post","put","patch","common"],m=>{delete s[m]}),n.headers=An.concat(o,s);const a=[];let l=!0;this.interceptors.request.forEach(function(g){typeof g.runWhen=="function"&&g.runWhen(n)===!1||(l=l&&g.synchronous,a.unshift(g.fulfilled,g.rejected))});const u=[];this.interceptors.response.forEach(function(g){u.push(g.fulfilled,g.rejected)});let c,d=0,h;if(!l){const m=[f1.bind(this),void 0];for(m.unshift.apply(m,a),m.push.apply(m,u),h=m.length,c=Promise.resolve(n);d<h;)c=c.then(m[d++],m[d++]);return c}h=a.length;let p=n;for(d=0;d<h;){const m=a[d++],g=a[d++];try{p=m(p)}catch(k){g.call(this,k);break}}try{c=f1.call(this,p)}catch(m){return Promise.reject(m)}for(d=0,h=u.length;d<h;)c=c.then(u[d++],u[d++]);return c}getUri(e){e=Bo(this.defaults,e);const n=BO(e.baseURL,e.url);return MO(n,e.params,e.paramsSerializer)}}W.forEach(["delete","get","head","options"],function(e){Co.prototype[e]=function(n,r){return this.request(Bo(r||{},{method:e,url:n,data:(r||{}).data}))}});W.forEach(["post","put","patch"],function(e){function n(r){return function(s,o,a){return this.request(Bo(a||{},{method:e,headers:r?{"Content-Type":"multipart/form-data"}:{},url:s,data:o}))}}Co.prototype[e]=n(),Co.prototype[e+"Form"]=n(!0)});class kw{constructor(e){if(typeof e!="function")throw new TypeError("executor must be a function.");let n;this.promise=new Promise(function(s){n=s});const r=this;this.promise.then(i=>{if(!r._listeners)return;let s=r._listeners.length;for(;s-- >0;)r._listeners[s](i);r._listeners=null}),this.promise.then=i=>{let s;const o=new Promise(a=>{r.subscribe(a),s=a}).then(i);return o.cancel=function(){r.unsubscribe(s)},o},e(function(s,o,a){r.reason||(r.reason=new Ll(s,o,a),n(r.reason))})}throwIfRequested(){if(this.reason)throw this.reason}subscribe(e){if(this.reason){e(this.reason);return}this._listeners?this._listeners.push(e):this._listeners=[e]}unsubscribe(e){if(!this._listeners)return;const n=this._listeners.indexOf(e);n!==-1&&this._listeners.splice(n,1)}toAbortSignal(){const e=new AbortController,n=r=>{e.abort(r)};return this.subscribe(n),e.signal.unsubscribe=()=>this.unsubscribe(n),e.signal}static source(){let e;return{token:new kw(function(i){e=i}),cancel:e}}}function iq(t){return function(n){return t.apply(null,n)}}function sq(t){return W.isObject(t)&&t.isAxiosError===!0}const kb={Continue:100,SwitchingProtocols:101,Processing:102,EarlyHints:103,Ok:200,Created:201,Accepted:202,NonAuthoritativeInformation:203,NoContent:204,ResetContent:205,PartialContent:206,MultiStatus:207,AlreadyReported:208,ImUsed:226,MultipleChoices:300,MovedPermanently:301,Found:302,SeeOther:303,NotModified:304,UseProxy:305,Unused:306,TemporaryRedirect:307,PermanentRedirect:308,BadRequest:400,Unauthorized:401,PaymentRequired:402,Forbidden:403,NotFound:404,MethodNotAllowed:405,NotAcceptable:406,ProxyAuthenticationRequired:407,RequestTimeout:408,Conflict:409,Gone:410,LengthRequired:411,PreconditionFailed:412,PayloadTooLarge:413,UriTooLong:414,UnsupportedMediaType:415,RangeNotSatisfiable:416,ExpectationFailed:417,ImATeapot:418,MisdirectedRequest:421,UnprocessableEntity:422,Locked:423,FailedDependency:424,TooEarly:425,UpgradeRequired:426,PreconditionRequired:428,TooManyRequests:429,RequestHeaderFieldsTooLarge:431,UnavailableForLegalReasons:451,InternalServerError:500,NotImplemented:501,BadGateway:502,ServiceUnavailable:503,GatewayTimeout:504,HttpVersionNotSupported:505,VariantAlsoNegotiates:506,InsufficientStorage:507,LoopDetected:508,NotExtended:510,NetworkAuthenticationRequired:511};Object.entries(kb).forEach(([t,e])=>{kb[e]=t});function KO(t){const e=new Co(t),n=SO(Co.prototype.request,e);return W.extend(n,Co.prototype,e,{allOwnKeys:!0}),W.extend(n,e,null,{allOwnKeys:!0}),n.create=function(i){return KO(Bo(t,i))},n}const Et=KO(hd);Et.Axios=Co;Et.CanceledError=Ll;Et.CancelToken=kw;Et.isCancel=VO;Et.VERSION=WO;Et.toFormData=Em;Et.AxiosError=we;Et.Cancel=Et.CanceledError;Et.all=function(e){return Promise.all(e)};Et.spread=iq;Et.isAxiosError=sq;Et.mergeConfig=Bo;Et.AxiosHeaders=An;Et.formToJSON=t=>FO(W.isHTMLForm(t)?new FormData(t):t);Et.getAdapter=HO.getAdapter;Et.HttpStatusCode=kb;Et.default=Et;const zn=Et.create({baseURL:"api/",headers:{"Access-Control-Expose-Headers":"Content-Disposition","Content-Type":"application/json"}});let ay=null;zn.interceptors.request.use(t=>(ay||(ay=new AbortController),t.signal=ay.signal,t),t=>Promise.reject(t));zn.interceptors.response.use(t=>(console.log(t.headers),t),async t=>{if(t.config,t.response)switch(t.response.status){}return Promise.reject(t)});class oq{summarize(e){return console.log("summarize"),zn.post("/summarize",e,{headers:{"Content-Type":"multipart/form-data"}})}deleteSummary(e,n){return zn.delete(`/summary/${n}`,{headers:{"X-User-Id":e}})}getSummarySegments(e,n){return zn.get(`/summary/${n}/segments`,{headers:{"X-User-Id":e}})}downloadSummary(e,n){return zn.get(`/summary/${n}/download`,{headers:{"X-User-Id":e},responseType:"blob"})}getChatbotHistory(e){return zn.get("/chatbot/history",{headers:{"X-User-Id":e}})}getChatbotMessage(e,n,r){const i={uid:e,message:n};return r&&(i.chatId=r),zn.post("/chatbot/message",i)}}const Yu=new oq,GO=v.createContext(void 0);function aq({children:t}){const{user:e}=mr(),[n,r]=v.useState([]),[i,s]=v.useState(!1),o=v.useCallback(h=>{r(p=>[...p].sort((m,g)=>{const k=new Date(m.date).getTime(),y=new Date(g.date).getTime();return h==="asc"?k-y:y-k}))},[]),a=v.useCallback(h=>{r(p=>{var m=p.filter(k=>k.id!==h.id);return[...m,h]})},[]),l=v.useCallback(async h=>{if(e){s(!0);const p=new FormData;p.append("uid",e.id),h.file&&p.append("file",h.file),h.s3FileName&&p.append("s3_file_name",h.s3FileName),h.summaryId&&p.append("summary_id",h.summaryId);try{const m=await Yu.summarize(p);return a(m.data.summary),m.data}catch(m){throw console.error("Error uploading file:",m),m}finally{s(!1)}}},[e]),u=v.useCallback(async()=>{if(e)try{const h=await vO.fetchMeetingSummariesData(e.id);r(h)}catch(h){console.error("Error fetching meeting summaries:",h)}},[e]),c=v.useCallback(async h=>{if(e)try{return s(!0),(await Yu.deleteSummary(e.id,h)).status===200?(r(m=>{var g=m.filter(k=>k.id!==h);return g}),!0):!1}catch(p){throw console.error("Error delete file:",p),p}finally{s(!1)}else return!1},[e]),d=v.useCallback(async h=>{if(e)try{s(!0);const p=await Yu.downloadSummary(e.id,h);if(p.status===200){const m=p.headers.get("Content-Disposition");console.log(p);let g="downloaded_file.zip";if(console.log(m),m&&m.includes("filename=")){console.log(m);const w=m.match(/filename\*=utf-8''(.+)/);if(w&&w.length>1)g=decodeURIComponent(w[1]);else{const T=m.match(/filename="(.+)"/);T&&T.length>1&&(g=T[1])}}const k=window.URL.createObjectURL(new Blob([p.data])),y=document.createElement("a");return y.href=k,console.log(k),y.download=g,document.body.appendChild(y),y.click(),document.body.removeChild(y),window.URL.revokeObjectURL(k),!0}else return!1}catch(p){throw console.error("Error delete file:",p),p}finally{s(!1)}else return!1},[e]);return C.jsx(GO.Provider,{value:{isLoading:i,meetingSummaries:n,addMeetingSummary:a,sortMeetingSummaries:o,summarizeMeeting:l,fetchMeetingSummaries:u,deleteMeetingSummary:c,downloadMeetingSummary:d},children:t})}const pd=()=>v.useContext(GO);function lq({children:t}){const{isChecked:e,user:n}=mr(),{fetchMeetingSummaries:r}=pd();return console.log("PrivateRoute"),v.useEffect(()=>{(async()=>{if(n)try{await r()}catch(s){console.error("Error fetching meeting summaries:",s)}})()},[r]),e?n?C.jsx(C.Fragment,{children:t}):C.jsx(RR,{to:"/welcomePage",replace:!0}):null}/**
  * @license lucide-react v0.344.0 - ISC
  *
  * This source code is licensed under the ISC license.
@@ -3722,7 +3722,7 @@ This typically indicates that your device does not have a healthy Internet conne
       input[type="range"]:hover::-webkit-slider-thumb {
         background-color: #F9FAFB; /* 滑鼠懸停時變色 */
       }
-    `})]})});function dJ({segments:t,onSegmentClick:e}){return C.jsx("div",{className:"space-y-4",children:t.map((n,r)=>C.jsxs("div",{onClick:()=>e==null?void 0:e(n.startTime),className:"p-3 hover:bg-gray-50 dark:hover:bg-gray-700 rounded cursor-pointer",children:[C.jsxs("div",{className:"text-sm text-gray-500 dark:text-gray-400 mb-1",children:[aC(n.startTime)," - ",aC(n.endTime)]}),C.jsx("p",{className:"text-gray-700 dark:text-white",children:n.text})]},r))})}function aC(t){const e=Math.floor(t/60),n=t%60;return`${e}:${n.toString().padStart(2,"0")}`}function fJ({message:t,onClose:e,onConfirm:n}){const{t:r}=pr();return gR.createPortal(C.jsx("div",{className:"fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50",children:C.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-lg w-96 dark:bg-gray-800",children:[C.jsx("p",{className:"text-gray-800 dark:text-white text-lg mb-4",children:t}),C.jsxs("div",{className:"flex justify-end space-x-4",children:[C.jsx("button",{onClick:e,className:"px-4 py-2 bg-white text-red-600 rounded-lg hover:bg-red-50 border border-red-600",children:r("cancel")}),C.jsx("button",{onClick:n,className:`px-4 py-2 hover:bg-gray-50 text-gray-700 rounded-md border border-gray-300 
+    `})]})});function dJ({summaryId:f,truncated:b,segments:t,onSegmentClick:e}){const{user:u}=mr(),[g,k]=v.useState(null);v.useEffect(()=>{k(null),b&&u&&Yu.getSummarySegments(u.id,f).then(q=>k(q.data.segments)).catch(q=>console.error("Error fetching transcript segments:",q))},[f,b,u]),t=g||t||[];return C.jsx("div",{className:"space-y-4",children:t.map((n,r)=>C.jsxs("div",{onClick:()=>e==null?void 0:e(n.startTime),className:"p-3 hover:bg-gray-50 dark:hover:bg-gray-700 rounded cursor-pointer",children:[C.jsxs("div",{className:"text-sm text-gray-500 dark:text-gray-400 mb-1",children:[aC(n.startTime)," - ",aC(n.endTime)]}),C.jsx("p",{className:"text-gray-700 dark:text-white",children:n.text})]},r))})}function aC(t){const e=Math.floor(t/60),n=t%60;return`${e}:${n.toString().padStart(2,"0")}`}function fJ({message:t,onClose:e,onConfirm:n}){const{t:r}=pr();return gR.createPortal(C.jsx("div",{className:"fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center z-50",children:C.jsxs("div",{className:"bg-white p-6 rounded-lg shadow-lg w-96 dark:bg-gray-800",children:[C.jsx("p",{className:"text-gray-800 dark:text-white text-lg mb-4",children:t}),C.jsxs("div",{className:"flex justify-end space-x-4",children:[C.jsx("button",{onClick:e,className:"px-4 py-2 bg-white text-red-600 rounded-lg hover:bg-red-50 border border-red-600",children:r("cancel")}),C.jsx("button",{onClick:n,className:`px-4 py-2 hover:bg-gray-50 text-gray-700 rounded-md border border-gray-300 
         shadow-sm dark:hover:bg-indigo-400
         dark:bg-indigo-200 dark:border-transparent dark:text-indigo-700 transition-colors`,children:r("confirm")})]})]})}),document.body)}function hJ(){const{id:t}=vF(),e=Qi(),n=v.useRef(null),r=v.useRef(null),[i,s]=v.useState("."),{isLoading:o,meetingSummaries:a,deleteMeetingSummary:l,summarizeMeeting:u,downloadMeetingSummary:c}=pd(),[d,h]=v.useState(null),{t:p}=pr(),[m,g]=v.useState({open:!1,message:"",confirm:()=>{}}),k=(S,_)=>g({open:!0,message:S,confirm:_}),y=()=>g({open:!1,message:"",confirm:()=>{}});if(v.useEffect(()=>{console.log(t),console.log(a);const S=a.find(_=>_.id===t);if(S)h(S);else{const _=setInterval(()=>{const P=a.find(N=>N.id===t);P&&(h(P),clearInterval(_))},500)}},[t,a]),v.useEffect(()=>{let S=null;return o?S=setInterval(()=>{s(_=>_==="..."?"":_+".")},500):(s(""),S&&clearInterval(S)),()=>{S&&clearInterval(S)}},[o]),!d)return"Loading...";const w=S=>{n.current&&(n.current.currentTime=S,n.current.play()),r.current&&(r.current.seek(S),r.current.play())},T=()=>{k(p("confirmDelete"),x)},x=async()=>{var S=await l(d.id);S&&(e(-1),y())},I=async()=>{var S=d.srcUrl.split("/").pop();console.log(S);var _=await u({s3FileName:S,summaryId:d.id});_&&(h(_.summary),y())},A=async()=>{var S=d.srcUrl.split("/").pop();console.log(S),await c(d.id),y()};return C.jsxs("div",{className:"relative",children:[C.jsxs("div",{className:"max-w-4xl mx-auto",children:[C.jsx("h1",{className:"text-3xl font-bold text-gray-900 dark:text-white mb-4",children:d.summary.title}),C.jsxs("div",{className:"flex justify-between mb-6",children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsxs("div",{className:"flex items-center text-gray-600 dark:text-gray-400",children:[C.jsx(yq,{className:"w-4 h-4 mr-1"}),C.jsx("span",{children:new Date(d.date).toLocaleString("zh-TW",{year:"numeric",month:"2-digit",day:"2-digit",hour:"2-digit",minute:"2-digit"})})]}),C.jsxs("div",{className:"flex items-center space-x-2",children:[C.jsx(Pq,{className:"w-4 h-4 text-gray-600 dark:text-gray-400"}),C.jsx("div",{className:"flex gap-2",children:d.summary.tags.map(S=>C.jsx("span",{className:"px-3 py-1 bg-indigo-50 dark:bg-indigo-200 text-indigo-700 dark:text-indigo-900 rounded-full text-sm",children:S},S))})]})]}),C.jsxs("div",{className:"flex items-center space-x-2",children:[C.jsx("button",{onClick:()=>k(p("confirmRegenerate"),I),className:`
               px-2.5 py-1.5 rounded-md border
@@ -3739,7 +3739,7 @@ This typically indicates that your device does not have a healthy Internet conne
               dark:border-transparent dark:text-indigo-700
               dark:bg-indigo-200 transition-colors
             `,title:p("download"),children:C.jsx(vq,{className:"w-4 h-4"})}),C.jsx(DD,{title:p("deleteMeetings"),onDelete:T})]})]}),d.srcUrl.endsWith(".mp4")?C.jsx("div",{className:"bg-black aspect-video rounded-lg mb-8",children:C.jsx("video",{ref:n,className:"w-full h-full rounded-lg",controls:!0,poster:d.thumbnailUrl,src:d.srcUrl})}):null,C.jsxs("div",{className:"space-y-8",children:[C.jsxs("section",{children:[C.jsx("h2",{className:"text-xl font-semibold text-gray-900 mb-3 dark:text-white",children:p("Summary")}),C.jsx("p",{className:"text-gray-600 bg-gray-50 p-4 rounded-lg dark:text-gray-200 dark:bg-gray-800",children:d.summary.content})]}),C.jsxs("section",{children:[C.jsx("h2",{className:"text-xl font-semibold text-gray-900 mb-3 dark:text-white",children:p("Transcript")}),C.jsx("div",{className:`bg-white p-4 rounded-lg border border-gray-200 max-h-96 overflow-y-auto 
-            dark:text-gray-200 dark:bg-gray-800 dark:border-transparent`,children:C.jsx(dJ,{segments:d.transcription.segments,onSegmentClick:w})})]})]}),d.srcUrl.endsWith(".mp3")?C.jsx("div",{className:"mt-8",children:C.jsx(cJ,{ref:r,src:d.srcUrl})}):null]}),m.open&&C.jsx(fJ,{message:m.message,onClose:y,onConfirm:m.confirm}),o&&C.jsx($D,{message:p("handling")+i})]})}function pJ(){const{user:t}=mr();return C.jsx("div",{className:"flex items-center justify-between mb-8",children:C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"relative",children:C.jsx("img",{src:t.avatarUrl||"https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?auto=format&fit=facearea&facepad=2&w=256&h=256&q=80",alt:t.name,className:"w-16 h-16 rounded-full object-cover"})}),C.jsxs("div",{children:[C.jsx("h2",{className:"text-2xl font-bold text-gray-900 dark:text-white",children:t.name}),C.jsx("p",{className:"text-gray-500",children:t.email})]})]})})}class mJ{login(e){return zn.get("/line/login",{headers:{"X-User-Id":e}})}}const gJ=new mJ;function yJ(){const{user:t,updateUser:e,isUpdating:n}=mr(),[r,i]=v.useState(t==null?void 0:t.preferences.lineNotification),{t:s,i18n:o}=pr(),{isDarkMode:a,toggleDarkMode:l}=R7(),[u,c]=v.useState(!1),[d,h]=v.useState(!1);console.log(t);const p=async()=>{const w=await gJ.login(t.id);w.data&&(window.location.href=w.data)},m=async()=>{const w={...t.preferences,lineNotification:null};console.log(w),await e(w),console.log(t),i(null)},g=async()=>{const w={...t.preferences.lineNotification,enabled:!t.preferences.lineNotification.enabled},T={...t.preferences,lineNotification:w};await e(T),i(w),console.log(T)},k=async w=>{o.changeLanguage(w);const T={...t.preferences,language:w};await e(T),h(!1)},y=async()=>{l();const w={...t.preferences,darkMode:!t.preferences.darkMode};await e(w)};return C.jsxs("div",{className:"space-y-6",children:[C.jsx("h3",{className:"text-lg font-semibold text-gray-900 dark:text-white",children:s("profile_settingsTitle")}),C.jsxs("div",{className:"relative",children:[C.jsxs("div",{className:"flex justify-between items-center w-full px-6 py-4 bg-transparent hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer rounded-lg transition",onClick:()=>h(!d),children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx(QO,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),C.jsx("span",{className:"font-medium text-gray-900 dark:text-white text-lg",children:s("language")})]}),C.jsxs("div",{className:"flex items-center space-x-2 dark:text-white",children:[C.jsxs("div",{children:[" ",o.language==="en"?"English":"中文"]}),C.jsx(p1,{className:`w-6 h-6 text-gray-600 dark:text-gray-400 transition-transform ${d?"rotate-180":""}`})]})]}),d&&C.jsxs("div",{className:"absolute top-full right-0 mt-1 w-56 max-h-64 bg-white rounded-md dark:bg-gray-800 overflow-hidden z-10",children:[C.jsx("button",{className:"px-6 w-full text-left text-gray-900 dark:text-white hover:bg-gray-100 dark:hover:bg-gray-700 py-4 rounded-lg",onClick:()=>k("en"),children:"English"}),C.jsx("button",{className:"px-6 w-full text-left text-gray-900 dark:text-white hover:bg-gray-100 dark:hover:bg-gray-700 py-4 rounded-lg",onClick:()=>k("zh"),children:"中文"})]})]}),C.jsxs("div",{className:"space-y-4",children:[r?C.jsxs("div",{children:[C.jsxs("div",{className:"flex justify-between items-center w-full px-6 py-4 bg-transparent hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer rounded-lg transition",onClick:()=>c(!u),children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),C.jsx("span",{className:"font-medium text-gray-900 dark:text-white text-lg",children:s("lineNotification.title")})]}),C.jsx("div",{className:"ml-auto",children:C.jsx(p1,{className:`w-6 h-6 text-gray-600 dark:text-gray-400 transition-transform ${u?"rotate-180":""}`})})]}),u&&C.jsxs("div",{className:"w-full bg-gray-50 dark:bg-gray-900 py-4 space-y-4",children:[C.jsxs("div",{className:"flex items-center justify-between py-2 hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer px-6 rounded-lg",children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400 invisible",children:C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"})}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:s("lineNotification.active")}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:s("lineNotification.activeDesc")})]})]}),C.jsx("button",{onClick:g,className:`relative inline-flex h-6 w-11 items-center rounded-full transition-colors ${r.enabled?"bg-indigo-600":"bg-gray-200 dark:bg-gray-700"}`,children:C.jsx("span",{className:`absolute inline-block h-4 w-4 transform rounded-full bg-white transition-transform ${r.enabled?"translate-x-6":"translate-x-1"}`})})]}),C.jsxs("div",{className:"flex items-center space-x-3 justify-between px-6",children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400 invisible",children:C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"})}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:s("lineNotification.lineId")}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:r.uid})]})]}),C.jsx("div",{className:"relative flex items-center gap-2",children:C.jsx("button",{onClick:m,disabled:n,className:`
+            dark:text-gray-200 dark:bg-gray-800 dark:border-transparent`,children:C.jsx(dJ,{summaryId:d.id,truncated:d.transcription.segmentsTruncated,segments:d.transcription.segments,onSegmentClick:w})})]})]}),d.srcUrl.endsWith(".mp3")?C.jsx("div",{className:"mt-8",children:C.jsx(cJ,{ref:r,src:d.srcUrl})}):null]}),m.open&&C.jsx(fJ,{message:m.message,onClose:y,onConfirm:m.confirm}),o&&C.jsx($D,{message:p("handling")+i})]})}function pJ(){const{user:t}=mr();return C.jsx("div",{className:"flex items-center justify-between mb-8",children:C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"relative",children:C.jsx("img",{src:t.avatarUrl||"https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?auto=format&fit=facearea&facepad=2&w=256&h=256&q=80",alt:t.name,className:"w-16 h-16 rounded-full object-cover"})}),C.jsxs("div",{children:[C.jsx("h2",{className:"text-2xl font-bold text-gray-900 dark:text-white",children:t.name}),C.jsx("p",{className:"text-gray-500",children:t.email})]})]})})}class mJ{login(e){return zn.get("/line/login",{headers:{"X-User-Id":e}})}}const gJ=new mJ;function yJ(){const{user:t,updateUser:e,isUpdating:n}=mr(),[r,i]=v.useState(t==null?void 0:t.preferences.lineNotification),{t:s,i18n:o}=pr(),{isDarkMode:a,toggleDarkMode:l}=R7(),[u,c]=v.useState(!1),[d,h]=v.useState(!1);console.log(t);const p=async()=>{const w=await gJ.login(t.id);w.data&&(window.location.href=w.data)},m=async()=>{const w={...t.preferences,lineNotification:null};console.log(w),await e(w),console.log(t),i(null)},g=async()=>{const w={...t.preferences.lineNotification,enabled:!t.preferences.lineNotification.enabled},T={...t.preferences,lineNotification:w};await e(T),i(w),console.log(T)},k=async w=>{o.changeLanguage(w);const T={...t.preferences,language:w};await e(T),h(!1)},y=async()=>{l();const w={...t.preferences,darkMode:!t.preferences.darkMode};await e(w)};return C.jsxs("div",{className:"space-y-6",children:[C.jsx("h3",{className:"text-lg font-semibold text-gray-900 dark:text-white",children:s("profile_settingsTitle")}),C.jsxs("div",{className:"relative",children:[C.jsxs("div",{className:"flex justify-between items-center w-full px-6 py-4 bg-transparent hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer rounded-lg transition",onClick:()=>h(!d),children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx(QO,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),C.jsx("span",{className:"font-medium text-gray-900 dark:text-white text-lg",children:s("language")})]}),C.jsxs("div",{className:"flex items-center space-x-2 dark:text-white",children:[C.jsxs("div",{children:[" ",o.language==="en"?"English":"中文"]}),C.jsx(p1,{className:`w-6 h-6 text-gray-600 dark:text-gray-400 transition-transform ${d?"rotate-180":""}`})]})]}),d&&C.jsxs("div",{className:"absolute top-full right-0 mt-1 w-56 max-h-64 bg-white rounded-md dark:bg-gray-800 overflow-hidden z-10",children:[C.jsx("button",{className:"px-6 w-full text-left text-gray-900 dark:text-white hover:bg-gray-100 dark:hover:bg-gray-700 py-4 rounded-lg",onClick:()=>k("en"),children:"English"}),C.jsx("button",{className:"px-6 w-full text-left text-gray-900 dark:text-white hover:bg-gray-100 dark:hover:bg-gray-700 py-4 rounded-lg",onClick:()=>k("zh"),children:"中文"})]})]}),C.jsxs("div",{className:"space-y-4",children:[r?C.jsxs("div",{children:[C.jsxs("div",{className:"flex justify-between items-center w-full px-6 py-4 bg-transparent hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer rounded-lg transition",onClick:()=>c(!u),children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),C.jsx("span",{className:"font-medium text-gray-900 dark:text-white text-lg",children:s("lineNotification.title")})]}),C.jsx("div",{className:"ml-auto",children:C.jsx(p1,{className:`w-6 h-6 text-gray-600 dark:text-gray-400 transition-transform ${u?"rotate-180":""}`})})]}),u&&C.jsxs("div",{className:"w-full bg-gray-50 dark:bg-gray-900 py-4 space-y-4",children:[C.jsxs("div",{className:"flex items-center justify-between py-2 hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer px-6 rounded-lg",children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400 invisible",children:C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"})}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:s("lineNotification.active")}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:s("lineNotification.activeDesc")})]})]}),C.jsx("button",{onClick:g,className:`relative inline-flex h-6 w-11 items-center rounded-full transition-colors ${r.enabled?"bg-indigo-600":"bg-gray-200 dark:bg-gray-700"}`,children:C.jsx("span",{className:`absolute inline-block h-4 w-4 transform rounded-full bg-white transition-transform ${r.enabled?"translate-x-6":"translate-x-1"}`})})]}),C.jsxs("div",{className:"flex items-center space-x-3 justify-between px-6",children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400 invisible",children:C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"})}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:s("lineNotification.lineId")}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:r.uid})]})]}),C.jsx("div",{className:"relative flex items-center gap-2",children:C.jsx("button",{onClick:m,disabled:n,className:`
             border-2 border-green-500 text-green-500 rounded-lg 
             px-4 py-2 hover:bg-green-500 hover:text-white transition-all`,children:n?C.jsx("div",{className:"w-4 h-4 border-2 border-gray-300 border-t-green-500 rounded-full animate-spin"}):s("lineNotification.unbind")})})]})]})]}):C.jsx(bJ,{className:"px-6 py-4 bg-transparent rounded-lg transition",icon:C.jsx(ff,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),label:s("profile_settings.lineNotifications"),description:s("profile_settings.lineNotificationsDesc"),btnName:s("lineNotification.bind"),onClick:()=>p()}),C.jsx(vJ,{className:"px-6 py-4 bg-transparent hover:bg-gray-100 dark:hover:bg-gray-800 cursor-pointer rounded-lg transition",icon:C.jsx(_q,{className:"w-6 h-6 text-gray-600 dark:text-gray-400"}),label:s("profile_settings.darkMode"),description:s("profile_settings.darkModeDesc"),checked:a,onChange:()=>y()})]})]})}function vJ({className:t,icon:e,label:n,description:r,checked:i,onChange:s}){return C.jsxs("div",{className:`flex items-center justify-between ${t}`,onClick:s,children:[C.jsxs("div",{className:"flex items-center space-x-4",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400",children:e}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:n}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:r})]})]}),C.jsx("div",{className:"relative",children:C.jsx("button",{className:`relative inline-flex h-6 w-11 items-center rounded-full transition-colors ${i?"bg-indigo-600":"bg-gray-200 dark:bg-gray-700"}`,children:C.jsx("span",{className:`absolute inline-block h-4 w-4 transform rounded-full bg-white transition-transform ${i?"translate-x-6":"translate-x-1"}`})})})]})}function bJ({className:t,icon:e,label:n,description:r,btnName:i,onClick:s}){return C.jsxs("div",{className:`flex items-center justify-between ${t}`,children:[C.jsxs("div",{className:"flex items-center space-x-3",children:[C.jsx("div",{className:"text-gray-600 dark:text-gray-400",children:e}),C.jsxs("div",{children:[C.jsx("p",{className:"font-medium text-gray-900 dark:text-white",children:n}),C.jsx("p",{className:"text-sm text-gray-500 dark:text-gray-400",children:r})]})]}),C.jsx("div",{className:"relative",children:C.jsx("button",{onClick:s,className:`
             border-2 border-green-500 text-green-500 rounded-lg 